@@ -0,0 +1,29 @@
+"""add content compression dictionary
+
+Revision ID: 3a5d71c9e2f8
+Revises: f2b6d8e41a97
+Create Date: 2026-10-19 19:32:05.481736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '3a5d71c9e2f8'
+down_revision = 'f2b6d8e41a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('content_compression_dictionary',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('dictionary', sa.LargeBinary(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade() -> None:
+    # Run scripts/compress_thread_message_contents.py decompress first, compressed contents need their dictionary
+    op.drop_table('content_compression_dictionary')
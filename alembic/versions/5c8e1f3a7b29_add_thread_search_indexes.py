@@ -0,0 +1,88 @@
+"""add thread full text and trigram search indexes
+
+Revision ID: 5c8e1f3a7b29
+Revises: 9d2f4b6a8c10
+Create Date: 2026-10-19 20:41:18.902554
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = '5c8e1f3a7b29'
+down_revision = '9d2f4b6a8c10'
+branch_labels = None
+depends_on = None
+
+# Keep in sync with threads/search.py
+SEARCH_CONFIG = 'english'
+MAX_INDEXED_CHARS = 100000
+TRIGRAM_PREFIX_CHARS = 4096
+ENCODED_CONTENT_LIKE = "E'\\x1fzstd:%'"
+
+# index: (method and expression, predicate)
+MESSAGE_INDEXES = {
+    'ix_thread_message_search_vector': ('gin (search_vector)', None),
+    'ix_thread_message_content_trgm': (f'gin (left(content, {TRIGRAM_PREFIX_CHARS}) gin_trgm_ops)',
+                                       f'content NOT LIKE {ENCODED_CONTENT_LIKE}'),
+}
+
+
+def _partitions(table: str) -> list:
+    return op.get_bind().execute(text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = CAST(:table AS regclass) ORDER BY 1"
+    ), {"table": table}).scalars().all()
+
+
+def upgrade() -> None:
+    """
+    Index thread titles and message contents for ranked full text and trigram search.
+
+    A trigger keeps thread_message.search_vector up to date on every write of the
+    content. Compressed contents are indexed by the application, which holds their
+    plain text. Existing messages are indexed afterwards by
+    scripts/backfill_thread_search.py.
+    """
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("ALTER TABLE thread_message ADD COLUMN search_vector tsvector")
+    op.execute(f"""
+        CREATE FUNCTION thread_message_search_vector() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.content IS NULL THEN
+                NEW.search_vector := NULL;
+            ELSIF NEW.content NOT LIKE {ENCODED_CONTENT_LIKE} THEN
+                NEW.search_vector := to_tsvector('{SEARCH_CONFIG}', left(NEW.content, {MAX_INDEXED_CHARS}));
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("CREATE TRIGGER thread_message_search_vector BEFORE INSERT OR UPDATE OF content ON thread_message "
+               "FOR EACH ROW EXECUTE FUNCTION thread_message_search_vector()")
+
+    partitions = _partitions('thread_message')
+    with op.get_context().autocommit_block():
+        op.create_index('ix_thread_title_search', 'thread',
+                        [text(f"to_tsvector('{SEARCH_CONFIG}', coalesce(title, ''))")], postgresql_using='gin',
+                        postgresql_concurrently=True)
+        op.create_index('ix_thread_title_trgm', 'thread', ['title'], postgresql_using='gin',
+                        postgresql_ops={'title': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        # Partitioned tables cannot be indexed concurrently, so each partition is and the parent index adopts them
+        for index, (definition, predicate) in MESSAGE_INDEXES.items():
+            where = f" WHERE {predicate}" if predicate else ""
+            for partition in partitions:
+                op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_{index[3:]} ON {partition} "
+                           f"USING {definition}{where}")
+            op.execute(f"CREATE INDEX IF NOT EXISTS {index} ON ONLY thread_message USING {definition}{where}")
+            for partition in partitions:
+                op.execute(f"ALTER INDEX {index} ATTACH PARTITION {partition}_{index[3:]}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for index in MESSAGE_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {index}")
+        op.drop_index('ix_thread_title_trgm', table_name='thread', postgresql_concurrently=True)
+        op.drop_index('ix_thread_title_search', table_name='thread', postgresql_concurrently=True)
+    op.execute("DROP TRIGGER thread_message_search_vector ON thread_message")
+    op.execute("DROP FUNCTION thread_message_search_vector()")
+    op.execute("ALTER TABLE thread_message DROP COLUMN search_vector")
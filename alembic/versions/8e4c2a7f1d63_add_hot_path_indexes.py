@@ -0,0 +1,37 @@
+"""add hot path indexes
+
+Revision ID: 8e4c2a7f1d63
+Revises: 4b7e2d91c3a5
+Create Date: 2026-10-19 15:41:07.518342
+
+"""
+from alembic import op
+
+revision = '8e4c2a7f1d63'
+down_revision = '4b7e2d91c3a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so the tables stay writable, which cannot run inside the migration transaction.
+    # An interrupted build leaves an INVALID index behind, drop it before running this again.
+    with op.get_context().autocommit_block():
+        # ThreadMessageSummaryDao.get_summaries looks summaries up by a list of message ids
+        op.create_index('ix_thread_message_summary_thread_message_id', 'thread_message_summary',
+                        ['thread_message_id'], unique=False, postgresql_concurrently=True)
+        # MCP configs are listed per user on every chat request
+        op.create_index(op.f('ix_mcp_model_user_id'), 'mcp_model', ['user_id'], unique=False,
+                        postgresql_concurrently=True)
+        # Request logs are scanned per user over a time range, newest first
+        op.create_index('ix_request_logger_user_created_at', 'request_logger', ['user', 'created_at'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_request_logger_user_created_at', table_name='request_logger',
+                      postgresql_concurrently=True)
+        op.drop_index(op.f('ix_mcp_model_user_id'), table_name='mcp_model', postgresql_concurrently=True)
+        op.drop_index('ix_thread_message_summary_thread_message_id', table_name='thread_message_summary',
+                      postgresql_concurrently=True)
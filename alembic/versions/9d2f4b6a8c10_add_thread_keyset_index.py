@@ -0,0 +1,30 @@
+"""add thread keyset pagination index
+
+Revision ID: 9d2f4b6a8c10
+Revises: 3a5d71c9e2f8
+Create Date: 2026-10-19 20:05:52.337190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '9d2f4b6a8c10'
+down_revision = '3a5d71c9e2f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination compares (updated_at, uuid), rows without updated_at would never be listed
+    op.execute("UPDATE thread SET updated_at = coalesce(created_at, now()) WHERE updated_at IS NULL")
+    with op.get_context().autocommit_block():
+        # The sidebar lists a user's threads of a product, most recently updated first
+        op.create_index('ix_thread_user_email_product_updated_at_uuid', 'thread',
+                        ['user_email', 'product', sa.text('updated_at DESC'), sa.text('uuid DESC')], unique=False,
+                        postgresql_where=sa.text('is_deleted IS NOT TRUE'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_thread_user_email_product_updated_at_uuid', table_name='thread',
+                      postgresql_concurrently=True)
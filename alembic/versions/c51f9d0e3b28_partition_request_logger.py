@@ -0,0 +1,95 @@
+"""partition request_logger by month
+
+Revision ID: c51f9d0e3b28
+Revises: 8e4c2a7f1d63
+Create Date: 2026-10-19 17:05:52.904116
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+
+revision = 'c51f9d0e3b28'
+down_revision = '8e4c2a7f1d63'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(month_start: datetime, months: int) -> datetime:
+    month = month_start.month - 1 + months
+    return month_start.replace(year=month_start.year + month // 12, month=month % 12 + 1)
+
+
+def upgrade() -> None:
+    """
+    Turn request_logger into a table range-partitioned by month on created_at.
+
+    The existing table is kept as one partition holding everything before the next
+    month boundary, so no rows are copied. The retention job drops it once all of it
+    is older than the retention period. Its primary key is extended with created_at,
+    as Postgres requires for partitioned tables. Its index is built concurrently
+    first, so the only blocking step is validating created_at, which scans the table
+    without rewriting it. Attaching then reuses the existing indexes.
+    """
+    boundary = _add_months(datetime.now(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0), 1)
+
+    with op.get_context().autocommit_block():
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS request_logger_legacy_id_created_at "
+                   "ON request_logger (id, created_at)")
+
+    op.execute("UPDATE request_logger SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL")
+    # A validated CHECK lets SET NOT NULL and ATTACH PARTITION skip their own full scans
+    op.execute(f"ALTER TABLE request_logger ADD CONSTRAINT request_logger_legacy_range "
+               f"CHECK (created_at IS NOT NULL AND created_at < '{boundary.isoformat()}') NOT VALID")
+    op.execute("ALTER TABLE request_logger VALIDATE CONSTRAINT request_logger_legacy_range")
+    op.execute("ALTER TABLE request_logger ALTER COLUMN created_at SET NOT NULL")
+    # The partition's primary key has to match the one of the partitioned table
+    op.execute("ALTER TABLE request_logger DROP CONSTRAINT request_logger_pkey, "
+               "ADD CONSTRAINT request_logger_legacy_pkey PRIMARY KEY USING INDEX request_logger_legacy_id_created_at")
+
+    op.execute("ALTER TABLE request_logger RENAME TO request_logger_legacy")
+    op.execute("ALTER INDEX ix_request_logger_user_created_at RENAME TO request_logger_legacy_user_created_at")
+
+    op.execute("""
+        CREATE TABLE request_logger (
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITH TIME ZONE,
+            id UUID NOT NULL,
+            "user" VARCHAR,
+            request_type VARCHAR,
+            tokens INTEGER,
+            url VARCHAR,
+            header VARCHAR,
+            body VARCHAR,
+            response VARCHAR,
+            model VARCHAR,
+            meta JSONB,
+            CONSTRAINT request_logger_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('CREATE INDEX ix_request_logger_user_created_at ON request_logger ("user", created_at)')
+
+    op.execute(f"ALTER TABLE request_logger ATTACH PARTITION request_logger_legacy "
+               f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')")
+
+    # No DEFAULT partition: creating a month next to one scans it, and fails once it holds rows of that month.
+    # The maintenance job keeps months ready ahead instead.
+    month_start = boundary
+    for _ in range(MONTHS_AHEAD):
+        month_end = _add_months(month_start, 1)
+        op.execute(f"CREATE TABLE request_logger_p{month_start:%Y%m} PARTITION OF request_logger "
+                   f"FOR VALUES FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')")
+        month_start = month_end
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE request_logger RENAME TO request_logger_partitioned")
+    op.execute("ALTER INDEX ix_request_logger_user_created_at RENAME TO request_logger_partitioned_user_created_at")
+    op.execute("CREATE TABLE request_logger (LIKE request_logger_partitioned INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO request_logger SELECT * FROM request_logger_partitioned")
+    op.execute("DROP TABLE request_logger_partitioned")
+    op.execute("ALTER TABLE request_logger ADD CONSTRAINT request_logger_pkey PRIMARY KEY (id)")
+    op.execute("ALTER TABLE request_logger ALTER COLUMN created_at DROP NOT NULL")
+    op.execute('CREATE INDEX ix_request_logger_user_created_at ON request_logger ("user", created_at)')
@@ -0,0 +1,102 @@
+"""add hash partitioned thread_message shadow tables
+
+Revision ID: e7a93b15c0d4
+Revises: c51f9d0e3b28
+Create Date: 2026-10-19 18:22:40.117925
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 'e7a93b15c0d4'
+down_revision = 'c51f9d0e3b28'
+branch_labels = None
+depends_on = None
+
+PARTITION_COUNT = 16
+
+
+# table: (primary key, {index name: columns})
+SHADOW_TABLES = {
+    'thread_message': ('id', {'ix_thread_message_p_thread_uuid_id': 'thread_uuid, id'}),
+    'thread_message_summary': ('uuid', {'ix_thread_message_summary_p_thread_uuid': 'thread_uuid',
+                                        'ix_thread_message_summary_p_thread_message_id': 'thread_message_id'}),
+}
+
+
+def _create_shadow(table: str, primary_key: str, indexes: dict) -> None:
+    # LIKE keeps the column order, so the mirror trigger can insert NEW.* as is
+    op.execute(f"CREATE TABLE {table}_p (LIKE {table} INCLUDING DEFAULTS) PARTITION BY HASH (thread_uuid)")
+    op.execute(f"ALTER TABLE {table}_p ALTER COLUMN thread_uuid SET NOT NULL")
+    # The partition key has to be part of the primary key
+    op.execute(f"ALTER TABLE {table}_p ADD CONSTRAINT {table}_p_pkey PRIMARY KEY ({primary_key}, thread_uuid)")
+    # Cheap while the table is empty, every copied row is checked on insert
+    op.execute(f"ALTER TABLE {table}_p ADD CONSTRAINT {table}_p_thread_uuid_fkey "
+               f"FOREIGN KEY (thread_uuid) REFERENCES thread (uuid)")
+    for index_name, index_columns in indexes.items():
+        op.execute(f"CREATE INDEX {index_name} ON {table}_p ({index_columns})")
+    for remainder in range(PARTITION_COUNT):
+        op.execute(f"CREATE TABLE {table}_p{remainder:02d} PARTITION OF {table}_p "
+                   f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {remainder})")
+
+
+def _columns(table: str) -> list:
+    return op.get_bind().execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+    ), {"table": table}).scalars().all()
+
+
+def _create_mirror_trigger(table: str, primary_key: str) -> None:
+    # A backfill batch may have inserted the same key and not committed yet, the insert then waits for it and
+    # overwrites the copied row with the new one instead of failing the application's write
+    assignments = ", ".join(f'"{column}" = EXCLUDED."{column}"' for column in _columns(table)
+                            if column not in (primary_key, 'thread_uuid'))
+    op.execute(f"""
+        CREATE FUNCTION mirror_{table}_to_partitions() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                DELETE FROM {table}_p WHERE {primary_key} = OLD.{primary_key} AND thread_uuid = OLD.thread_uuid;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.thread_uuid IS NOT NULL THEN
+                INSERT INTO {table}_p SELECT NEW.*
+                ON CONFLICT ON CONSTRAINT {table}_p_pkey DO UPDATE SET {assignments};
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute(f"CREATE TRIGGER mirror_{table}_to_partitions AFTER INSERT OR UPDATE OR DELETE ON {table} "
+               f"FOR EACH ROW EXECUTE FUNCTION mirror_{table}_to_partitions()")
+
+
+def upgrade() -> None:
+    """
+    First step of moving thread_message and thread_message_summary to hash partitions on thread_uuid.
+
+    Creates partitioned shadow tables and triggers that mirror every write to the
+    old tables into them. Existing rows are copied online afterwards by
+    scripts/backfill_thread_message_partitions.py, and the next migration swaps
+    the tables. The shadow message table takes its ids from the existing sequence.
+    """
+    for table, (primary_key, indexes) in SHADOW_TABLES.items():
+        _create_shadow(table, primary_key, indexes)
+        _create_mirror_trigger(table, primary_key)
+
+    op.execute("""
+        CREATE TABLE partition_backfill_progress (
+            table_name VARCHAR PRIMARY KEY,
+            last_key VARCHAR,
+            completed BOOLEAN NOT NULL DEFAULT false,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE partition_backfill_progress")
+    for table in ('thread_message_summary', 'thread_message'):
+        # Gone already when coming down from the swap
+        op.execute(f"DROP TRIGGER IF EXISTS mirror_{table}_to_partitions ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS mirror_{table}_to_partitions()")
+        op.execute(f"DROP TABLE {table}_p")
@@ -0,0 +1,106 @@
+"""swap in hash partitioned thread_message tables
+
+Revision ID: f2b6d8e41a97
+Revises: e7a93b15c0d4
+Create Date: 2026-10-19 18:47:13.660281
+
+"""
+from alembic import op
+from sqlalchemy import text
+
+revision = 'f2b6d8e41a97'
+down_revision = 'e7a93b15c0d4'
+branch_labels = None
+depends_on = None
+
+# Below this many rows the rest of the copy runs here instead of requiring the backfill script
+INLINE_COPY_MAX_ROWS = 200_000
+
+# table: (primary key, indexes of the old table, indexes of the shadow table)
+TABLES = {
+    'thread_message': ('id', ['ix_thread_message_thread_uuid'], ['ix_thread_message_p_thread_uuid_id']),
+    'thread_message_summary': ('uuid',
+                               ['ix_thread_message_summary_thread_uuid', 'ix_thread_message_summary_thread_message_id'],
+                               ['ix_thread_message_summary_p_thread_uuid',
+                                'ix_thread_message_summary_p_thread_message_id']),
+}
+# Foreign keys into thread_message.id, a partitioned table can only be referenced by its full key
+INNER_FOREIGN_KEYS = {
+    'thread_message_parent_message_id_fkey': ('thread_message', 'parent_message_id'),
+    'thread_message_summary_thread_message_id_fkey': ('thread_message_summary', 'thread_message_id'),
+}
+
+
+def _rename_table(table: str, new_name: str, indexes: list) -> None:
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_pkey TO {new_name}_pkey")
+    op.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {table}_thread_uuid_fkey TO {new_name}_thread_uuid_fkey")
+    for index in indexes:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index.replace(table, new_name, 1)}")
+    op.execute(f"ALTER TABLE {table} RENAME TO {new_name}")
+
+
+def _ensure_copied(connection, table: str, primary_key: str) -> None:
+    orphans = connection.execute(text(f"SELECT count(*) FROM {table} WHERE thread_uuid IS NULL")).scalar()
+    if orphans:
+        raise RuntimeError(f"{table} has {orphans} rows without thread_uuid, which cannot be partitioned. "
+                           f"Delete or reassign them, then run this migration again.")
+
+    completed = connection.execute(text("SELECT completed FROM partition_backfill_progress WHERE table_name = :table"),
+                                   {"table": table}).scalar()
+    if completed:
+        return
+    rows = connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+    if rows > INLINE_COPY_MAX_ROWS:
+        raise RuntimeError(f"{table} has {rows} rows and has not been backfilled. Run "
+                           f"scripts/backfill_thread_message_partitions.py, then run this migration again.")
+    op.execute(f"INSERT INTO {table}_p SELECT * FROM {table} ON CONFLICT DO NOTHING")
+
+
+def upgrade() -> None:
+    """
+    Second step, replace thread_message and thread_message_summary by their partitioned copies.
+
+    Both tables are locked against writes for the checks and renames only, the rows
+    were copied beforehand. The old tables are kept as *_unpartitioned until they
+    are dropped by hand. The foreign keys into thread_message.id are not recreated,
+    the application always writes parents and summaries with their message.
+    """
+    connection = op.get_bind()
+    op.execute("LOCK TABLE thread_message, thread_message_summary IN SHARE ROW EXCLUSIVE MODE")
+    for table, (primary_key, _, _) in TABLES.items():
+        _ensure_copied(connection, table, primary_key)
+
+    for foreign_key, (table, _) in INNER_FOREIGN_KEYS.items():
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {foreign_key}")
+    for table, (_, old_indexes, shadow_indexes) in TABLES.items():
+        op.execute(f"DROP TRIGGER mirror_{table}_to_partitions ON {table}")
+        op.execute(f"DROP FUNCTION mirror_{table}_to_partitions()")
+        _rename_table(table, f"{table}_unpartitioned", old_indexes)
+        _rename_table(f"{table}_p", table, shadow_indexes)
+
+    op.execute("ALTER SEQUENCE thread_message_id_seq OWNED BY thread_message.id")
+    op.execute("DROP TABLE partition_backfill_progress")
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE thread_message_id_seq OWNED BY NONE")
+    for table, (primary_key, old_indexes, shadow_indexes) in TABLES.items():
+        _rename_table(table, f"{table}_p", [index.replace(f"{table}_p", table, 1) for index in shadow_indexes])
+        _rename_table(f"{table}_unpartitioned", table,
+                      [index.replace(table, f"{table}_unpartitioned", 1) for index in old_indexes])
+        # Rows written since the swap only exist in the partitioned table
+        op.execute(f"INSERT INTO {table} SELECT * FROM {table}_p ON CONFLICT ({primary_key}) DO NOTHING")
+    op.execute("ALTER SEQUENCE thread_message_id_seq OWNED BY thread_message.id")
+
+    for foreign_key, (table, column) in INNER_FOREIGN_KEYS.items():
+        op.execute(f"ALTER TABLE {table} ADD CONSTRAINT {foreign_key} "
+                   f"FOREIGN KEY ({column}) REFERENCES thread_message (id)")
+    # The partitioned tables are left without mirror triggers, the previous downgrade drops them
+    op.execute("""
+        CREATE TABLE partition_backfill_progress (
+            table_name VARCHAR PRIMARY KEY,
+            last_key VARCHAR,
+            completed BOOLEAN NOT NULL DEFAULT false,
+            updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+        )
+    """)
@@ -2,6 +2,7 @@ from fastapi.responses import JSONResponse
 from fastapi.routing import APIRouter
 
 from app.routing import CustomRequestRoute
+from integrations.router import integrations_router_v1
 from mcp_configs.router import mcp_config_router_v1
 from surface.router import surface_router_v1
 from surface.v2.router import surface_router_v2
@@ -23,6 +24,7 @@ api_router_v1.include_router(wrapper_router_v1)
 api_router_v1.include_router(threads_router_v1)
 api_router_v1.include_router(mcp_config_router_v1)
 api_router_v1.include_router(surface_router_v1)
+api_router_v1.include_router(integrations_router_v1)
 
 api_router_v2.include_router(threads_router_v2)
 api_router_v2.include_router(surface_router_v2)
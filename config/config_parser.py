@@ -20,8 +20,102 @@ parser.add('--host', help='host')
 parser.add('--debug', help='debug', action="store_true")
 parser.add('--db_url', help='db_url')
 parser.add('--read_db_url', help='read_db_url')
+parser.add('--db_pool_size', help='Connections kept open in the primary database pool', type=int, default=10)
+parser.add('--db_max_overflow', help='Connections opened beyond the primary pool size under load', type=int,
+           default=10)
+parser.add('--db_pool_timeout', help='Seconds to wait for a primary pool connection before failing', type=float,
+           default=5.0)
+parser.add('--db_pool_recycle', help='Seconds after which a primary pool connection is reopened', type=int,
+           default=1800)
+parser.add('--db_statement_timeout_ms', help='Server side statement timeout in ms for the primary database',
+           type=int, default=30000)
+parser.add('--db_prepared_statement_cache_size', help='Prepared statements cached per primary connection, '
+                                                       '0 disables the cache (needed behind pgbouncer)',
+           type=int, default=500)
+parser.add('--read_db_pool_size', help='Connections kept open in the read replica database pool', type=int,
+           default=10)
+parser.add('--read_db_max_overflow', help='Connections opened beyond the read replica pool size under load',
+           type=int, default=10)
+parser.add('--read_db_pool_timeout', help='Seconds to wait for a read replica pool connection before failing',
+           type=float, default=5.0)
+parser.add('--read_db_pool_recycle', help='Seconds after which a read replica pool connection is reopened', type=int,
+           default=1800)
+parser.add('--read_db_statement_timeout_ms', help='Server side statement timeout in ms for the read replica database',
+           type=int, default=15000)
+parser.add('--read_db_prepared_statement_cache_size', help='Prepared statements cached per read replica connection, '
+                                                            '0 disables the cache (needed behind pgbouncer)',
+           type=int, default=500)
+parser.add('--read_your_writes_disabled', help='Always send reads to the read replica, even right after a write',
+           action='store_true')
+parser.add('--read_your_writes_pin_ttl', help='Seconds a user stays pinned to the primary after a write at most',
+           type=float, default=30.0)
+parser.add('--read_your_writes_max_users', help='Maximum number of users tracked for read-your-writes routing',
+           type=int, default=50000)
+parser.add('--replica_lag_poll_interval', help='Seconds between polls of the replica replay position', type=float,
+           default=1.0)
+
+parser.add('--dao_cache_disabled', help='Disable the cache-aside layer for hot DAO lookups', action='store_true')
+parser.add('--dao_cache_l1_ttl', help='Seconds a DAO lookup is cached in process', type=float, default=30.0)
+parser.add('--dao_cache_l2_ttl', help='Seconds a DAO lookup is cached in Redis', type=float, default=300.0)
+parser.add('--dao_cache_max_entries', help='Maximum number of DAO lookups cached in process', type=int,
+           default=20000)
+parser.add('--dao_cache_invalidation_grace', help='Seconds after an invalidation during which lookups are not '
+                                                  'cached, covering replica lag', type=float, default=5.0)
+parser.add('--dao_cache_redis_url', help='Redis URL of the shared DAO cache, in-process only when unset')
+parser.add('--request_log_partitions_ahead', help='Monthly request log partitions created ahead of time', type=int,
+           default=3)
+parser.add('--request_log_retention_months', help='Months of request logs kept, 0 keeps them forever', type=int,
+           default=6)
+parser.add('--request_log_drop_expired_partitions', help='Drop expired request log partitions instead of only '
+                                                         'detaching them', action='store_true')
+parser.add('--request_log_partition_maintenance_interval', help='Seconds between request log partition maintenance '
+                                                                'runs, 0 disables it', type=float, default=21600)
+parser.add('--message_compression_disabled', help='Store new message contents uncompressed', action='store_true')
+parser.add('--message_compression_threshold', help='Message contents of at least this many bytes are compressed',
+           type=int, default=8192)
+parser.add('--message_compression_level', help='zstd level used to compress message contents', type=int, default=3)
+parser.add('--message_compression_dictionary_refresh_interval', help='Seconds between loads of new message '
+                                                                     'compression dictionaries', type=float,
+           default=300)
+parser.add('--message_compression_min_dictionary_age', help='Seconds before a new compression dictionary is used for '
+                                                            'writes, longer than the refresh interval', type=float,
+           default=900)
 
 parser.add('--ingestion_url', help="ingestion_url")
+parser.add('--kb_search_cache_ttl', help='Seconds a knowledge base search result is served without revalidation',
+           type=int, default=300)
+parser.add('--kb_search_cache_stale_ttl', help='Seconds a stale knowledge base search result is served while it is '
+                                               'refreshed in the background', type=int, default=600)
+parser.add('--kb_search_cache_max_entries', help='Maximum number of cached knowledge base searches', type=int,
+           default=2048)
+parser.add('--kb_search_cache_max_bytes', help='Maximum total size of cached knowledge base searches in bytes',
+           type=int, default=64 * 1024 * 1024)
+parser.add('--kb_search_cache_redis_url', help='Redis URL sharing knowledge base search cache invalidations between '
+                                               'workers, per process only when unset')
+parser.add('--kb_search_cache_admin_emails', help='Comma separated emails allowed to invalidate the knowledge base '
+                                                  'search cache', default='')
+parser.add('--kb_search_fanout_enabled', help='Search each knowledge base concurrently and merge with rank fusion',
+           action='store_true')
+parser.add('--kb_search_per_kb_timeout', help='Deadline in seconds for a single knowledge base in fan-out search',
+           type=float, default=4.0)
+parser.add('--kb_search_matching_percentage', help='Minimum similarity percentage for knowledge base search hits',
+           type=float, default=70.0)
+parser.add('--kb_rerank_top_k', help='Number of re-ranked knowledge base hits sent to the model', type=int, default=6)
+parser.add('--kb_rerank_dedup_threshold', help='MinHash similarity above which knowledge base hits are near-duplicates',
+           type=float, default=0.8)
+parser.add('--kb_context_max_tokens', help='Token budget for knowledge base snippets in a KB prompt', type=int,
+           default=6000)
+parser.add('--ingestion_http_timeout', help='Deadline in seconds for a call to the ingestion service, including retries',
+           type=float, default=15.0)
+parser.add('--ingestion_http_connect_timeout', help='Connect timeout in seconds for the ingestion service', type=float,
+           default=3.0)
+parser.add('--ingestion_http_max_retries', help='Retries for transient ingestion service failures', type=int, default=2)
+parser.add('--ingestion_http_backoff_base', help='Base delay in seconds for ingestion retry backoff', type=float,
+           default=0.2)
+parser.add('--ingestion_http_max_connections', help='Maximum connections to the ingestion service', type=int,
+           default=100)
+parser.add('--ingestion_http_max_keepalive_connections', help='Maximum idle keep-alive connections to the ingestion '
+                                                               'service', type=int, default=20)
 parser.add('--groq_key', help="groq_key")
 parser.add('--redis_payments_url', help="redis_payments_url")
 parser.add('--skip_paths_for_restriction', help="skip_paths_for_restriction")
@@ -47,6 +141,55 @@ parser.add('--thread_summary_context_limit',
 parser.add('--use_thread_summaries', help='Enable or disable thread summary use in conversational agent.')
 parser.add('--clerk_secret_key', help='clerk_secret_key')
 parser.add('--kb_agent_enabled', help='kb_agent_enabled')
+parser.add('--thread_reference_batch_size', help='Referenced threads loaded per database query', type=int, default=8)
+parser.add('--thread_message_stream_batch_size', help='Thread messages fetched per round trip when streaming',
+           type=int, default=200)
+parser.add('--thread_export_page_size', help='Threads loaded per query when exporting', type=int, default=100)
+parser.add('--thread_export_checkpoint_every', help='Threads exported between two resumable checkpoints', type=int,
+           default=50)
+parser.add('--thread_export_org_admin_emails', help='Comma separated emails allowed to export the threads of their '
+                                                    'whole organization', default='')
+parser.add('--thread_reference_max_concurrency', help='Concurrent database queries when loading referenced threads',
+           type=int, default=4)
+parser.add('--thread_reference_top_k', help='Turns of referenced threads kept in the prompt, 0 keeps every turn',
+           type=int, default=6)
+parser.add('--thread_reference_embedder', help='Embedder for referenced thread turns: hashing or sentence-transformer',
+           default='hashing')
+parser.add('--thread_reference_embedding_model', help='sentence-transformers model for referenced thread turns',
+           default='all-MiniLM-L6-v2')
+parser.add('--thread_reference_index_type', help='Vector index for referenced thread turns: flat or ivf',
+           default='flat')
+parser.add('--thread_reference_index_ttl', help='Seconds a referenced thread index is kept in memory', type=int,
+           default=600)
+parser.add('--thread_reference_index_max_entries', help='Maximum number of referenced thread indexes kept in memory',
+           type=int, default=256)
+parser.add('--mcp_max_turns', help='Maximum number of model calls in a single MCP agent loop', type=int, default=3)
+parser.add('--mcp_token_budget', help='Total token budget for an MCP agent loop before no more tool calls are allowed',
+           type=int, default=60000)
+parser.add('--mcp_tool_cache_max_entries', help='Maximum number of cached MCP tool results', type=int, default=512)
+parser.add('--mcp_tool_cache_max_bytes', help='Maximum total size of cached MCP tool results in bytes', type=int,
+           default=32 * 1024 * 1024)
+parser.add('--mcp_tool_output_max_tokens', help='Default token budget for a single MCP tool observation', type=int,
+           default=4000)
+parser.add('--mcp_config_cache_ttl', help='Seconds a user MCP config list is cached in process', type=int, default=60)
+parser.add('--mcp_config_cache_max_entries', help='Maximum number of users with cached MCP configs', type=int,
+           default=10000)
+parser.add('--mcp_stdio_enabled', help='Allow user configured stdio MCP servers to be spawned', action='store_true')
+parser.add('--mcp_stdio_allowed_launches', help='Semicolon separated command lines a stdio MCP config must start '
+                                                 'with to run, each optionally followed by "|" and the comma separated '
+                                                 'environment variables users may set, e.g. "npx -y '
+                                                 '@modelcontextprotocol/server-github | GITHUB_PERSONAL_ACCESS_TOKEN"',
+           default='')
+parser.add('--mcp_stdio_max_processes', help='Maximum number of pooled stdio MCP server processes', type=int,
+           default=16)
+parser.add('--mcp_stdio_max_processes_per_user', help='Maximum number of pooled stdio MCP server processes per user',
+           type=int, default=2)
+parser.add('--mcp_stdio_max_calls_per_process', help='Tool calls served by a stdio MCP server before it is recycled',
+           type=int, default=200)
+parser.add('--mcp_stdio_idle_timeout', help='Seconds an idle stdio MCP server process is kept warm', type=int,
+           default=600)
+parser.add('--mcp_stdio_startup_timeout', help='Seconds to wait for a stdio MCP server process to start', type=int,
+           default=20)
 
 arguments = sys.argv
 print(arguments)
@@ -4,7 +4,6 @@ from typing import Optional
 
 from clerk_integration.utils import ClerkAuthHelper
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from sentence_transformers import SentenceTransformer
 
 from config.config_parser import docker_args
 from utils.connection_manager import ConnectionManager
@@ -41,10 +40,59 @@ class Settings(BaseSettings):
     db_url: str = async_db_url(args.db_url)
     read_db_url: str = async_db_url(args.read_db_url)
     db_echo: bool = args.debug
+    db_pool_size: int = int(args.db_pool_size)
+    db_max_overflow: int = int(args.db_max_overflow)
+    db_pool_timeout: float = float(args.db_pool_timeout)
+    db_pool_recycle: int = int(args.db_pool_recycle)
+    db_statement_timeout_ms: int = int(args.db_statement_timeout_ms)
+    db_prepared_statement_cache_size: int = int(args.db_prepared_statement_cache_size)
+    read_db_pool_size: int = int(args.read_db_pool_size)
+    read_db_max_overflow: int = int(args.read_db_max_overflow)
+    read_db_pool_timeout: float = float(args.read_db_pool_timeout)
+    read_db_pool_recycle: int = int(args.read_db_pool_recycle)
+    read_db_statement_timeout_ms: int = int(args.read_db_statement_timeout_ms)
+    read_db_prepared_statement_cache_size: int = int(args.read_db_prepared_statement_cache_size)
+    read_your_writes_enabled: bool = not args.read_your_writes_disabled
+    read_your_writes_pin_ttl: float = float(args.read_your_writes_pin_ttl)
+    read_your_writes_max_users: int = int(args.read_your_writes_max_users)
+    replica_lag_poll_interval: float = float(args.replica_lag_poll_interval)
     redis_payments_url: str = os.getenv("REDIS_PAYMENTS_URL", args.redis_payments_url)
+    dao_cache_disabled: bool = args.dao_cache_disabled
+    dao_cache_l1_ttl: float = float(args.dao_cache_l1_ttl)
+    dao_cache_l2_ttl: float = float(args.dao_cache_l2_ttl)
+    dao_cache_max_entries: int = int(args.dao_cache_max_entries)
+    dao_cache_invalidation_grace: float = float(args.dao_cache_invalidation_grace)
+    dao_cache_redis_url: Optional[str] = args.dao_cache_redis_url
+    request_log_partitions_ahead: int = int(args.request_log_partitions_ahead)
+    request_log_retention_months: int = int(args.request_log_retention_months)
+    request_log_drop_expired_partitions: bool = args.request_log_drop_expired_partitions
+    request_log_partition_maintenance_interval: float = float(args.request_log_partition_maintenance_interval)
+    message_compression_disabled: bool = args.message_compression_disabled
+    message_compression_threshold: int = int(args.message_compression_threshold)
+    message_compression_level: int = int(args.message_compression_level)
+    message_compression_dictionary_refresh_interval: float = float(args.message_compression_dictionary_refresh_interval)
+    message_compression_min_dictionary_age: float = float(args.message_compression_min_dictionary_age)
 
     # External services
     ingestion_url: str = args.ingestion_url
+    kb_search_cache_ttl: int = int(args.kb_search_cache_ttl)
+    kb_search_cache_stale_ttl: int = int(args.kb_search_cache_stale_ttl)
+    kb_search_cache_max_entries: int = int(args.kb_search_cache_max_entries)
+    kb_search_cache_max_bytes: int = int(args.kb_search_cache_max_bytes)
+    kb_search_cache_redis_url: Optional[str] = args.kb_search_cache_redis_url
+    kb_search_cache_admin_emails: str = args.kb_search_cache_admin_emails
+    kb_search_fanout_enabled: bool = args.kb_search_fanout_enabled
+    kb_search_per_kb_timeout: float = float(args.kb_search_per_kb_timeout)
+    kb_search_matching_percentage: float = float(args.kb_search_matching_percentage)
+    kb_rerank_top_k: int = int(args.kb_rerank_top_k)
+    kb_rerank_dedup_threshold: float = float(args.kb_rerank_dedup_threshold)
+    kb_context_max_tokens: int = int(args.kb_context_max_tokens)
+    ingestion_http_timeout: float = float(args.ingestion_http_timeout)
+    ingestion_http_connect_timeout: float = float(args.ingestion_http_connect_timeout)
+    ingestion_http_max_retries: int = int(args.ingestion_http_max_retries)
+    ingestion_http_backoff_base: float = float(args.ingestion_http_backoff_base)
+    ingestion_http_max_connections: int = int(args.ingestion_http_max_connections)
+    ingestion_http_max_keepalive_connections: int = int(args.ingestion_http_max_keepalive_connections)
 
     # API keys and credentials
     openai_key: str = os.getenv("OPENAI_KEY", args.openai_key)
@@ -76,6 +124,32 @@ class Settings(BaseSettings):
     use_thread_summaries: bool = args.use_thread_summaries
     skip_paths_for_restriction: str = args.skip_paths_for_restriction
     kb_agent_enabled: bool = args.kb_agent_enabled
+    thread_reference_batch_size: int = int(args.thread_reference_batch_size)
+    thread_message_stream_batch_size: int = int(args.thread_message_stream_batch_size)
+    thread_export_page_size: int = int(args.thread_export_page_size)
+    thread_export_checkpoint_every: int = int(args.thread_export_checkpoint_every)
+    thread_export_org_admin_emails: str = args.thread_export_org_admin_emails
+    thread_reference_max_concurrency: int = int(args.thread_reference_max_concurrency)
+    thread_reference_top_k: int = int(args.thread_reference_top_k)
+    thread_reference_embedder: str = args.thread_reference_embedder
+    thread_reference_embedding_model: str = args.thread_reference_embedding_model
+    thread_reference_index_type: str = args.thread_reference_index_type
+    thread_reference_index_ttl: int = int(args.thread_reference_index_ttl)
+    thread_reference_index_max_entries: int = int(args.thread_reference_index_max_entries)
+    mcp_max_turns: int = int(args.mcp_max_turns)
+    mcp_token_budget: int = int(args.mcp_token_budget)
+    mcp_tool_cache_max_entries: int = int(args.mcp_tool_cache_max_entries)
+    mcp_tool_cache_max_bytes: int = int(args.mcp_tool_cache_max_bytes)
+    mcp_tool_output_max_tokens: int = int(args.mcp_tool_output_max_tokens)
+    mcp_config_cache_ttl: int = int(args.mcp_config_cache_ttl)
+    mcp_config_cache_max_entries: int = int(args.mcp_config_cache_max_entries)
+    mcp_stdio_enabled: bool = args.mcp_stdio_enabled
+    mcp_stdio_allowed_launches: str = args.mcp_stdio_allowed_launches
+    mcp_stdio_max_processes: int = int(args.mcp_stdio_max_processes)
+    mcp_stdio_max_processes_per_user: int = int(args.mcp_stdio_max_processes_per_user)
+    mcp_stdio_max_calls_per_process: int = int(args.mcp_stdio_max_calls_per_process)
+    mcp_stdio_idle_timeout: int = int(args.mcp_stdio_idle_timeout)
+    mcp_stdio_startup_timeout: int = int(args.mcp_stdio_startup_timeout)
 
     # File paths
     BASE_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,90 @@
+import asyncio
+import random
+from typing import Optional
+
+import httpx
+
+from config.logging import logger
+from config.settings import loaded_config
+
+
+class PooledHTTPClient:
+    """
+    Process wide ``httpx.AsyncClient`` with HTTP/2, connection limits and retries.
+
+    The client is opened on app startup and closed on shutdown, so requests reuse
+    pooled connections instead of paying a new TCP/TLS handshake each time. Transport
+    errors and retryable status codes are retried with exponential backoff and full
+    jitter, and every call is bounded by an overall deadline covering all attempts.
+    """
+
+    RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+    def __init__(self, timeout: float, connect_timeout: float, max_retries: int, backoff_base: float,
+                 max_connections: int, max_keepalive_connections: int):
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections
+                ),
+                headers={'Content-Type': 'application/json'}
+            )
+        return self._client
+
+    def start(self) -> None:
+        # Opening the client eagerly keeps the pool setup off the first request
+        _ = self.client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures until the deadline expires."""
+        return await asyncio.wait_for(self._request_with_retries(method, url, **kwargs), deadline or self.timeout)
+
+    async def _request_with_retries(self, method: str, url: str, **kwargs) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in self.RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    return response
+                logger.warning(f"Retrying {method} {url} after status {response.status_code}")
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"Retrying {method} {url} after {type(e).__name__}: {e}")
+
+            await asyncio.sleep(random.uniform(0, self.backoff_base * 2 ** attempt))
+            attempt += 1
+
+    async def get(self, url: str, deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, deadline=deadline, **kwargs)
+
+    async def post(self, url: str, deadline: Optional[float] = None, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, deadline=deadline, **kwargs)
+
+
+ingestion_http_client = PooledHTTPClient(
+    timeout=loaded_config.ingestion_http_timeout,
+    connect_timeout=loaded_config.ingestion_http_connect_timeout,
+    max_retries=loaded_config.ingestion_http_max_retries,
+    backoff_base=loaded_config.ingestion_http_backoff_base,
+    max_connections=loaded_config.ingestion_http_max_connections,
+    max_keepalive_connections=loaded_config.ingestion_http_max_keepalive_connections
+)
@@ -1,59 +1,87 @@
-from typing import List
-
-import httpx
+import asyncio
+from typing import Any, List, Optional, Tuple
 
+from config.logging import logger
+from config.settings import loaded_config
+from integrations.http_client import ingestion_http_client
+from integrations.rank_fusion import reciprocal_rank_fusion
 from utils.exceptions import SemanticSearchAPIException
 
 
 class SemanticSearch:
     """Class to handle semantic search API calls."""
 
-    def __init__(self, base_url: str):
+    DATA_NOT_FOUND = "Data not found!"
+    TOP_ANSWER_COUNT = 8
+
+    def __init__(self, base_url: str, http_client=ingestion_http_client):
         self.base_url = base_url
+        self.http_client = http_client
 
     async def call_knowledge_base_search(self, query: str, knowledge_base_id: List[int], team_id: str, user_id: str,
-                                         org_id: str):
+                                         org_id: str, top_answer_count: int = TOP_ANSWER_COUNT,
+                                         deadline: Optional[float] = None):
         """Call the updated semantic search API asynchronously."""
         try:
             payload = {
                 "query": query,
                 "knowledge_base_id": knowledge_base_id,
-                "top_answer_count": 8,
-                "matching_percentage": 70.0,
+                "top_answer_count": top_answer_count,
+                "matching_percentage": loaded_config.kb_search_matching_percentage,
                 "team_id": str(team_id or ''),
                 "user_id": str(user_id or ''),
                 "org_id": str(org_id or '')
             }
 
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f'{self.base_url}/v1.0/kb/vector-search',
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                )
+            response = await self.http_client.post(f'{self.base_url}/v1.0/kb/vector-search', json=payload,
+                                                   deadline=deadline)
 
-                if response.status_code != 200:
-                    return "Data not found!"
+            if response.status_code != 200:
+                return self.DATA_NOT_FOUND
 
-                return response.json()["data"]
+            return response.json()["data"]
         except Exception as e:
-            raise SemanticSearchAPIException(str(e))
+            raise SemanticSearchAPIException(str(e) or type(e).__name__)
+
+    async def call_knowledge_base_search_fanout(self, query: str, knowledge_base_id: List[int], team_id: str,
+                                                user_id: str, org_id: str, per_kb_timeout: float,
+                                                top_answer_count: int = TOP_ANSWER_COUNT) -> Tuple[Any, List[int]]:
+        """
+        Search every knowledge base concurrently and merge the hits with rank fusion.
+
+        Each knowledge base gets its own deadline; one that fails or does not answer in
+        time is left out of the answer instead of stalling it. Returns the merged hits
+        and the ids of the knowledge bases left out, so callers can tell a partial answer.
+        """
+        responses = await asyncio.gather(*(
+            self.call_knowledge_base_search(query, [kb_id], team_id, user_id, org_id,
+                                            top_answer_count=top_answer_count, deadline=per_kb_timeout)
+            for kb_id in knowledge_base_id
+        ), return_exceptions=True)
+
+        ranked_lists, skipped = [], []
+        for kb_id, response in zip(knowledge_base_id, responses):
+            if isinstance(response, list):
+                ranked_lists.append(response)
+            else:
+                logger.warning(f"Knowledge base {kb_id} search skipped: {response}")
+                skipped.append(kb_id)
+
+        if not ranked_lists:
+            return self.DATA_NOT_FOUND, skipped
+        return reciprocal_rank_fusion(ranked_lists, limit=top_answer_count), skipped
 
     async def call_folder_structure(self, graph_id: str):
         """Call the updated semantic search API asynchronously."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f'{self.base_url}/v1.0/get-folder-structure/{graph_id}',
-                    headers={'Content-Type': 'application/json'}
-                )
+            response = await self.http_client.get(f'{self.base_url}/v1.0/get-folder-structure/{graph_id}')
 
-                if response.status_code != 200:
-                    return "Data not found!"
+            if response.status_code != 200:
+                return self.DATA_NOT_FOUND
 
-                return response.json()["data"]
+            return response.json()["data"]
         except Exception as e:
-            raise SemanticSearchAPIException(str(e))
+            raise SemanticSearchAPIException(str(e) or type(e).__name__)
 
     async def call_keyword_search(self, keywords: List[str], graph_id: str, files: list = None, folders: list = None):
         """Call the updated semantic search API asynchronously."""
@@ -66,16 +94,11 @@ class SemanticSearch:
                 "folder_paths": folders if folders else [],
                 "entire_workspace": not (files or folders)
             }
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f'{self.base_url}/v1.0/get-keyword-search',
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
-                )
+            response = await self.http_client.post(f'{self.base_url}/v1.0/get-keyword-search', json=payload)
 
-                if response.status_code != 200:
-                    return "Data not found!"
+            if response.status_code != 200:
+                return self.DATA_NOT_FOUND
 
-                return response.json()["data"]
+            return response.json()["data"]
         except Exception as e:
-            raise SemanticSearchAPIException(str(e))
+            raise SemanticSearchAPIException(str(e) or type(e).__name__)
@@ -0,0 +1,86 @@
+import json
+from typing import Any, List, Optional
+
+from integrations.rank_fusion import result_identity, result_text
+from utils.tokenizer import DEFAULT_ENCODING_MODEL, fits_in_tokens, truncate_to_tokens
+
+SOURCE_FIELDS = ("file_path", "file_name", "source", "title", "url")
+SCORE_FIELDS = ("score", "similarity", "matching_percentage")
+
+
+class KnowledgeBaseContextFormatter:
+    """
+    Render knowledge base search hits as compact numbered snippets within a token budget.
+
+    Hits are deduplicated, ordered by score when the search returns one unless the
+    caller ranked them already and passes ``preserve_order``, and written as
+    ``[n] source`` followed by the chunk text without blank lines. Metadata fields
+    are dropped. Snippets are added while they fit the budget, and the first one that
+    does not fit is truncated.
+    """
+
+    SNIPPET_SEPARATOR = "\n\n"
+
+    def __init__(self, max_tokens: int, model_name: str = DEFAULT_ENCODING_MODEL):
+        self.max_tokens = max_tokens
+        self.model_name = model_name
+
+    def render(self, results: Any, preserve_order: bool = False) -> str:
+        if isinstance(results, str):
+            return results
+        if not isinstance(results, list):
+            return json.dumps(results, ensure_ascii=False, separators=(",", ":"), default=str)
+
+        snippets = []
+        remaining = self.max_tokens
+        for hit in self._rank(results, preserve_order):
+            snippet = self._format_hit(len(snippets) + 1, hit)
+            if not snippet:
+                continue
+            tokens = fits_in_tokens(snippet, remaining, self.model_name)
+            if tokens < 0:
+                snippets.append(truncate_to_tokens(snippet, remaining, self.model_name))
+                break
+            snippets.append(snippet)
+            remaining -= tokens
+            if remaining <= 0:
+                break
+        return self.SNIPPET_SEPARATOR.join(snippets)
+
+    @classmethod
+    def _rank(cls, results: List[Any], preserve_order: bool = False) -> List[Any]:
+        unique = {}
+        for hit in results:
+            unique.setdefault(result_identity(hit), hit)
+        hits = list(unique.values())
+        if not preserve_order and any(cls._score(hit) is not None for hit in hits):
+            # Sorting is stable, so hits with equal or missing scores keep the search order
+            hits.sort(key=lambda hit: cls._score(hit) or 0.0, reverse=True)
+        return hits
+
+    @staticmethod
+    def _score(hit: Any) -> Optional[float]:
+        if isinstance(hit, dict):
+            for field in SCORE_FIELDS:
+                if isinstance(hit.get(field), (int, float)):
+                    return float(hit[field])
+        return None
+
+    @staticmethod
+    def _format_hit(number: int, hit: Any) -> str:
+        if not isinstance(hit, dict):
+            return f"[{number}]\n{str(hit).strip()}"
+
+        metadata = hit.get("metadata") if isinstance(hit.get("metadata"), dict) else {}
+        source = next((str(container[field]) for container in (hit, metadata) for field in SOURCE_FIELDS
+                       if container.get(field)), None)
+        content = result_text(hit)
+        if content is None:
+            content = json.dumps(hit, ensure_ascii=False, separators=(",", ":"), default=str)
+
+        # Keep line structure and indentation, code chunks are unreadable without it
+        content = "\n".join(line.rstrip() for line in content.splitlines() if line.strip())
+        if not content:
+            return ""
+        header = f"[{number}] {source}" if source else f"[{number}]"
+        return f"{header}\n{content}"
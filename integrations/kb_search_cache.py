@@ -0,0 +1,174 @@
+import asyncio
+import itertools
+import json
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+from config.logging import logger
+from config.settings import loaded_config
+from utils.ttl_cache import TTLCache
+
+SearchKey = Tuple[str, Tuple[str, ...], str, str, str]
+INVALIDATION_COUNTER_KEY = "catalyst:kb_search:invalidations"
+GENERATION_KEY_PREFIX = "catalyst:kb_search:generation"
+
+
+class SearchResults(NamedTuple):
+    """Results a fetch returns when they may be partial, e.g. a knowledge base timed out."""
+    results: Any
+    complete: bool = True
+
+
+class KnowledgeBaseSearchCache:
+    """
+    Cache of knowledge base search results with stale-while-revalidate.
+
+    Results are keyed by the normalized query, the sorted knowledge base ids, team,
+    user and org, the whole scope the search service is called with. A result is
+    served as is for ``ttl`` seconds. For a further ``stale_ttl`` seconds it is still
+    served, but a background refresh is started. Concurrent lookups for the same key
+    share one in-flight search.
+
+    ``invalidate`` gives a knowledge base a new generation, and results cached under
+    an older one are not served again. With ``redis_url`` the generations live in
+    Redis, read with one MGET per lookup, so an invalidation reaches every worker at
+    once. Without it they are kept per process. A generation expires once no result
+    cached before it can still be alive, so they take no space for long, and each is
+    drawn from a counter, so a later invalidation never repeats an earlier one.
+    Results are not served while Redis cannot be read.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float, max_entries: int, max_bytes: int,
+                 redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.redis_url = redis_url
+        self._entries = TTLCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=self._sizeof)
+        # kb id -> (expires at, generation), for workers without Redis
+        self._generations: Dict[str, Tuple[float, int]] = {}
+        self._invalidations = itertools.count(1)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._redis = None
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            # Imported lazily, most workers run without Redis
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    @property
+    def generation_ttl(self) -> int:
+        # Every result cached before an invalidation expires before its generation does
+        return math.ceil(self.ttl + self.stale_ttl) + 1
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join((query or "").lower().split())
+
+    @classmethod
+    def make_key(cls, query: str, kb_ids: Iterable[Any], team_id: Any, user_id: Any, org_id: Any) -> SearchKey:
+        kb_key = tuple(sorted({str(kb_id) for kb_id in kb_ids or []}))
+        return cls.normalize_query(query), kb_key, str(team_id or ''), str(user_id or ''), str(org_id or '')
+
+    async def get_or_fetch(self, query: str, kb_ids: Iterable[Any], team_id: Any, user_id: Any, org_id: Any,
+                           fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return cached results for the search, calling fetch on a miss or to revalidate.
+
+        ``fetch`` returns the results, or ``SearchResults`` marked incomplete when some
+        knowledge bases are missing from them, which are returned but not cached.
+        """
+        key = self.make_key(query, kb_ids, team_id, user_id, org_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            fresh_until, generations, results = entry
+            if generations == await self._snapshot(key[1]):
+                if fresh_until <= time.monotonic():
+                    self._refresh(key, fetch)
+                return results
+
+        # A cancelled caller must not cancel the search shared with other callers
+        return await asyncio.shield(self._refresh(key, fetch))
+
+    async def invalidate(self, kb_id: Any) -> None:
+        """Stop serving every cached result that includes the knowledge base."""
+        kb_id = str(kb_id)
+        if self.redis is not None:
+            generation = await self.redis.incr(INVALIDATION_COUNTER_KEY)
+            await self.redis.set(self._generation_key(kb_id), generation, ex=self.generation_ttl)
+            return
+        now = time.monotonic()
+        self._generations = {key: value for key, value in self._generations.items() if value[0] > now}
+        self._generations[kb_id] = (now + self.generation_ttl, next(self._invalidations))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    def _refresh(self, key: SearchKey, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._on_loaded(key, done))
+        return task
+
+    async def _load(self, key: SearchKey, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        generations = await self._snapshot(key[1])
+        results, complete = self._unpack(await fetch())
+        # Error responses come back as a message string and are not cached, nor are partial results, which would
+        # keep a knowledge base that was slow once out of every answer to the query
+        if complete and not isinstance(results, str) and generations is not None and \
+                generations == await self._snapshot(key[1]):
+            self._entries.set(key, (time.monotonic() + self.ttl, generations, results), ttl=self.ttl + self.stale_ttl)
+        return results
+
+    def _on_loaded(self, key: SearchKey, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Knowledge base search refresh failed: {task.exception()}")
+
+    @staticmethod
+    def _unpack(fetched) -> Tuple[Any, bool]:
+        if isinstance(fetched, SearchResults):
+            return fetched.results, fetched.complete
+        return fetched, True
+
+    @staticmethod
+    def _generation_key(kb_id: str) -> str:
+        return f"{GENERATION_KEY_PREFIX}:{kb_id}"
+
+    async def _snapshot(self, kb_ids: Tuple[str, ...]) -> Optional[Tuple[int, ...]]:
+        """Current generations of the knowledge bases, None when Redis cannot be read."""
+        if self.redis is not None:
+            if not kb_ids:
+                return ()
+            try:
+                values = await self.redis.mget([self._generation_key(kb_id) for kb_id in kb_ids])
+            except Exception as e:
+                logger.warning(f"Knowledge base search cache generations unavailable: {e}")
+                return None
+            return tuple(int(value or 0) for value in values)
+        now = time.monotonic()
+        return tuple(generation if expires_at > now else 0
+                     for expires_at, generation in (self._generations.get(kb_id, (now, 0)) for kb_id in kb_ids))
+
+    @staticmethod
+    def _sizeof(entry) -> int:
+        return len(json.dumps(entry[2], default=str))
+
+
+kb_search_cache = KnowledgeBaseSearchCache(
+    ttl=loaded_config.kb_search_cache_ttl,
+    stale_ttl=loaded_config.kb_search_cache_stale_ttl,
+    max_entries=loaded_config.kb_search_cache_max_entries,
+    max_bytes=loaded_config.kb_search_cache_max_bytes,
+    redis_url=loaded_config.kb_search_cache_redis_url
+)
@@ -0,0 +1,50 @@
+import json
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+RRF_K = 60
+
+# Fields that identify a search hit, checked in order before falling back to its content
+IDENTITY_FIELDS = ("id", "chunk_id", "document_id")
+CONTENT_FIELDS = ("content", "text", "page_content", "chunk")
+
+
+def result_text(item: Any) -> Optional[str]:
+    """Return the chunk text of a search hit, or None if it has no text field."""
+    if isinstance(item, dict):
+        return next((item[field] for field in CONTENT_FIELDS if isinstance(item.get(field), str)), None)
+    return item if isinstance(item, str) else None
+
+
+def result_identity(item: Any) -> Hashable:
+    """Return a key under which duplicate hits from different knowledge bases collapse."""
+    if isinstance(item, dict):
+        for field in IDENTITY_FIELDS:
+            if item.get(field) is not None:
+                return field, str(item[field])
+        text = result_text(item)
+        if text is not None:
+            return "content", " ".join(text.split())
+    return "item", json.dumps(item, sort_keys=True, default=str)
+
+
+def reciprocal_rank_fusion(ranked_lists: Sequence[List[Any]], k: int = RRF_K, limit: Optional[int] = None) -> List[Any]:
+    """
+    Merge ranked result lists with reciprocal rank fusion.
+
+    Every hit scores ``1 / (k + rank)`` in each list it appears in, duplicates are
+    merged by ``result_identity`` and the first seen copy is kept. Because scores only
+    depend on rank, lists from knowledge bases with different score scales or sizes
+    are merged fairly.
+    """
+    scores: Dict[Hashable, float] = {}
+    items: Dict[Hashable, Any] = {}
+
+    for ranked in ranked_lists:
+        for rank, item in enumerate(ranked, start=1):
+            identity = result_identity(item)
+            scores[identity] = scores.get(identity, 0.0) + 1.0 / (k + rank)
+            items.setdefault(identity, item)
+
+    # Sorting is stable, so ties keep the order hits were first seen in
+    fused = sorted(items, key=lambda identity: scores[identity], reverse=True)
+    return [items[identity] for identity in fused[:limit]]
@@ -0,0 +1,103 @@
+import json
+import re
+import zlib
+from typing import Any, List
+
+import numpy as np
+
+from integrations.rank_fusion import result_text
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Permutations are (a * x + b) mod p with 32-bit a, b and crc32 shingle hashes x, which fits in uint64
+MINHASH_PRIME = np.uint64((1 << 61) - 1)
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LexicalReranker:
+    """
+    Re-rank knowledge base hits with BM25 and drop near-duplicates with MinHash.
+
+    BM25 is computed over the candidate set only, so document frequencies come from
+    the returned chunks rather than from the whole knowledge base. That is enough to
+    order a few dozen candidates by how well they cover the query terms. Hits whose
+    shingle MinHash signature matches an already kept hit on at least
+    ``dedup_threshold`` of the permutations are treated as near-duplicates and
+    dropped. The remaining ``top_k`` hits are returned in ranked order, with ties
+    keeping the order of the search service.
+    """
+
+    def __init__(self, top_k: int, dedup_threshold: float = 0.8, k1: float = 1.2, b: float = 0.75,
+                 shingle_size: int = 3, num_perm: int = 64, seed: int = 7):
+        self.top_k = top_k
+        self.dedup_threshold = dedup_threshold
+        self.k1 = k1
+        self.b = b
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._perm_a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._perm_b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+    def rerank(self, hits: Any, query: str) -> Any:
+        if not isinstance(hits, list) or not hits:
+            return hits
+
+        documents = [tokenize(self._text(hit)) for hit in hits]
+        scores = self.bm25_scores(documents, tokenize(query))
+        # Negated scores with a stable sort keep the service order for ties
+        order = np.argsort(-scores, kind="stable")
+
+        signatures = self.minhash_signatures(documents)
+        kept: List[int] = []
+        for index in order:
+            if kept:
+                similarity = (signatures[kept] == signatures[index]).mean(axis=1)
+                if similarity.max() >= self.dedup_threshold:
+                    continue
+            kept.append(int(index))
+            if len(kept) >= self.top_k:
+                break
+        return [hits[index] for index in kept]
+
+    def bm25_scores(self, documents: List[List[str]], query_terms: List[str]) -> np.ndarray:
+        terms = list(dict.fromkeys(query_terms))
+        if not terms:
+            return np.zeros(len(documents))
+
+        term_index = {term: position for position, term in enumerate(terms)}
+        frequencies = np.zeros((len(documents), len(terms)))
+        for row, tokens in enumerate(documents):
+            for token in tokens:
+                column = term_index.get(token)
+                if column is not None:
+                    frequencies[row, column] += 1
+
+        lengths = np.array([len(tokens) for tokens in documents], dtype=float)
+        average_length = lengths.mean() or 1.0
+        document_frequency = (frequencies > 0).sum(axis=0)
+        idf = np.log((len(documents) - document_frequency + 0.5) / (document_frequency + 0.5) + 1.0)
+        norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        return ((frequencies * (self.k1 + 1)) / (frequencies + norm[:, None]) * idf).sum(axis=1)
+
+    def minhash_signatures(self, documents: List[List[str]]) -> np.ndarray:
+        signatures = np.full((len(documents), len(self._perm_a)), MINHASH_PRIME, dtype=np.uint64)
+        for row, tokens in enumerate(documents):
+            shingles = self._shingle_hashes(tokens)
+            if shingles.size:
+                hashed = (self._perm_a[:, None] * shingles[None, :] + self._perm_b[:, None]) % MINHASH_PRIME
+                signatures[row] = hashed.min(axis=1)
+        return signatures
+
+    def _shingle_hashes(self, tokens: List[str]) -> np.ndarray:
+        size = min(self.shingle_size, len(tokens))
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)} if size else set()
+        return np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles), dtype=np.uint64,
+                           count=len(shingles))
+
+    @staticmethod
+    def _text(hit: Any) -> str:
+        text = result_text(hit)
+        return text if text is not None else json.dumps(hit, default=str)
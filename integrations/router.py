@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+
+from app.routing import CustomRequestRoute
+from integrations.views import KnowledgeBaseCacheView
+
+integrations_router_v1 = APIRouter(route_class=CustomRequestRoute)
+
+integrations_router_v1.add_api_route('/knowledge-bases/{kb_id}/search-cache/invalidate', methods=['POST'],
+                                     endpoint=KnowledgeBaseCacheView.invalidate)
@@ -0,0 +1,33 @@
+from clerk_integration.utils import UserData
+from fastapi import Depends, HTTPException, Path
+
+from config.settings import loaded_config
+from integrations.kb_search_cache import kb_search_cache
+from utils.base_view import BaseView
+from utils.common import UserDataHandler
+
+
+class KnowledgeBaseCacheView(BaseView):
+    SUCCESS_MESSAGE_CACHE_INVALIDATED = "Knowledge base search cache invalidated"
+
+    @classmethod
+    async def invalidate(
+            cls,
+            kb_id: str = Path(description="Knowledge base ID that was re-ingested"),
+            user_data: UserData = Depends(UserDataHandler.get_user_data_from_request)
+    ):
+        """
+        Invalidate cached search results of a knowledge base after it is re-ingested.
+
+        With ``kb_search_cache_redis_url`` set this reaches every worker. Without it the
+        cache lives in each worker, so this only clears the worker that serves the
+        request, and the others keep serving their results until ``kb_search_cache_ttl``
+        plus ``kb_search_cache_stale_ttl`` has passed.
+        """
+        if not UserDataHandler.is_listed_email(user_data.email, loaded_config.kb_search_cache_admin_emails):
+            raise HTTPException(status_code=403, detail="Unauthorized to invalidate the knowledge base search cache.")
+        try:
+            await kb_search_cache.invalidate(kb_id)
+            return cls.construct_success_response(message=cls.SUCCESS_MESSAGE_CACHE_INVALIDATED)
+        except Exception as exp:
+            return cls.construct_error_response(exp)
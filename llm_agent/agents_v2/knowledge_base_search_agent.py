@@ -3,9 +3,12 @@ from typing import List
 
 from config.settings import loaded_config
 from integrations.ingestion import SemanticSearch
+from integrations.kb_context import KnowledgeBaseContextFormatter
+from integrations.kb_search_cache import SearchResults, kb_search_cache
+from integrations.rerank import LexicalReranker
 from llm_agent.base_agent import BaseAgent
 from utils.common import ModelResponseHandler
-from utils.prompts import workspace_query_generator_prompt, workspace_search_prompt
+from utils.prompts import workspace_query_generator_prompt, workspace_search_prompt, workspace_search_system_prompt
 from wrapper.ai_models import UnifiedModel
 
 
@@ -27,6 +30,8 @@ class KnowledgeBaseSearchAgent(BaseAgent):
         self.stream = True
         self.api_client = SemanticSearch(loaded_config.ingestion_url)
         self.kb_ids = kwargs.get('kb_ids', [])
+        self.reranker = LexicalReranker(top_k=loaded_config.kb_rerank_top_k,
+                                        dedup_threshold=loaded_config.kb_rerank_dedup_threshold)
 
     async def process_input(self, input_data: dict, **kwargs):
         """Process the input data and generate search queries."""
@@ -39,6 +44,7 @@ class KnowledgeBaseSearchAgent(BaseAgent):
                                                 kwargs.get("org_id", ""))
 
         yield self.GATHERING_INSIGHTS_MESSAGE
+        tasks = self.reranker.rerank(tasks, query)
         yield self.REFINING_DETAILS_MESSAGE
 
         self.input_messages = self._construct_input_messages(tasks, query)
@@ -61,7 +67,22 @@ class KnowledgeBaseSearchAgent(BaseAgent):
 
     async def _create_search_tasks(self, query: str, knowledge_base_ids: List[int], team_id: str, user_id: str,
                                    org_id: str):
-        # Return a single-element list containing the API call coroutine
+        return await kb_search_cache.get_or_fetch(
+            query, knowledge_base_ids, team_id, user_id, org_id,
+            fetch=lambda: self._search(query, knowledge_base_ids, team_id, user_id, org_id)
+        )
+
+    async def _search(self, query: str, knowledge_base_ids: List[int], team_id: str, user_id: str, org_id: str):
+        if loaded_config.kb_search_fanout_enabled and len(knowledge_base_ids) > 1:
+            results, skipped = await self.api_client.call_knowledge_base_search_fanout(
+                query=query,
+                knowledge_base_id=knowledge_base_ids,
+                team_id=team_id,
+                user_id=user_id,
+                org_id=org_id,
+                per_kb_timeout=loaded_config.kb_search_per_kb_timeout
+            )
+            return SearchResults(results, complete=not skipped)
         return await self.api_client.call_knowledge_base_search(
             query=query,
             knowledge_base_id=knowledge_base_ids,
@@ -73,9 +94,12 @@ class KnowledgeBaseSearchAgent(BaseAgent):
     @staticmethod
     def _construct_input_messages(results: list, query: str) -> list:
         """Construct input messages for the LLM."""
+        # The hits come re-ranked, the service scores would undo that order
+        context = KnowledgeBaseContextFormatter(loaded_config.kb_context_max_tokens).render(results,
+                                                                                            preserve_order=True)
         return [
-            {"role": "system", "content": workspace_search_prompt.template},
-            {"role": "user", "content": workspace_search_prompt.substitute(files=results, query=query)}
+            {"role": "system", "content": workspace_search_system_prompt},
+            {"role": "user", "content": workspace_search_prompt.substitute(files=context, query=query)}
         ]
 
     async def execute(self, **kwargs):
@@ -3,15 +3,16 @@ from typing import AsyncGenerator, Dict, List, Any, Optional, Union
 
 from openai.types.chat import ChatCompletionChunk
 
+from config.settings import loaded_config
 from mcp_client.chunks import OpenAICompatibleChunk, create_llm_chunk, AnthropicCompatibleChunk
 from mcp_client.client_manager import MultipleMCPClientManager
-from mcp_client.constants import BUILTIN_MCP_SERVERS
+from mcp_client.constants import BUILTIN_MCP_SERVERS, STDIO_SERVER_TYPE
 from mcp_client.helper import MCPHelper
 from mcp_client.streams import CustomAsyncStream
-from mcp_configs.service import MCPService
+from mcp_configs.cache import mcp_config_cache
+from mcp_configs.stdio_allowlist import stdio_launch_allowlist
 from surface.constants import MessageType
 from utils.base_view import BaseView
-from utils.connection_handler import execute_db_operation
 
 
 class MCPChatProcessor:
@@ -26,7 +27,8 @@ class MCPChatProcessor:
             temperature: Optional[float] = None,
             stream_options: Optional[Dict] = None,
             system_message: Optional[str] = None,
-            max_tokens: Optional[int] = None
+            max_tokens: Optional[int] = None,
+            token_budget: Optional[int] = None
     ):
         self.model = model
         self.messages = messages
@@ -42,18 +44,26 @@ class MCPChatProcessor:
         self.chat_messages = None
         self.system_message = system_message
         self.max_tokens = max_tokens
+        self.token_budget = token_budget
+        self.tokens_used = 0
 
     async def setup_client(self, provider: str = 'openai') -> None:
         """Set up the MCP client and retrieve available tools."""
-        stdio_server_map = {}
-
         # Get user-specific MCP servers
-        user_sse_server_map = await execute_db_operation(MCPService.get_mcps_by_user_operation, self.user_data)
+        user_servers = await mcp_config_cache.get_active_mcps(self.user_data)
+        user_id = getattr(self.user_data, "userId", None)
+
+        # Stdio servers run as local processes, so they are only spawned when explicitly enabled and allowlisted
+        stdio_server_map = []
+        if loaded_config.mcp_stdio_enabled and user_id:
+            stdio_server_map = [mcp for mcp in user_servers if mcp.type == STDIO_SERVER_TYPE
+                                and stdio_launch_allowlist.is_allowed(mcp.command, mcp.args, mcp.env_vars)]
+        user_sse_server_map = [mcp for mcp in user_servers if mcp.type != STDIO_SERVER_TYPE and mcp.sse_url]
 
         # Combine user servers with default servers (user servers take precedence)
         sse_server_map = BUILTIN_MCP_SERVERS + user_sse_server_map
 
-        self.client_manager = MultipleMCPClientManager(stdio_server_map, sse_server_map)
+        self.client_manager = MultipleMCPClientManager(stdio_server_map, sse_server_map, user_id=user_id)
         await self.client_manager.initialize()
 
         self.tool_map, tool_objects = await self.client_manager.list_tools()
@@ -77,7 +87,10 @@ class MCPChatProcessor:
                 tool_name, tool_args, self.tool_map
             )
 
-            tool_result_message = MCPHelper.create_tool_result_message(tool_call["id"], str(observation), provider)
+            if observation is None:
+                observation = f"Tool {tool_name} returned no result."
+
+            tool_result_message = MCPHelper.create_tool_result_message(tool_call["id"], observation, provider)
             self.chat_messages.append(tool_result_message)
 
             yield create_llm_chunk(MessageType.PROGRESS, f"Tool {tool_name} execution complete.",
@@ -97,9 +110,10 @@ class MCPChatProcessor:
         - stream: bool - Whether to stream the response
         - stream_options: Dict - Options for streaming
         - client: Any - The OpenAI client
-        - max_turns: int (optional) - Maximum number of tool call turns (default: 3)
+        - max_turns: int (optional) - Maximum number of model calls in the agent loop (default: 3)
         - user_data: Dict (optional) - User data for MCP client (default: {})
         - temperature: float (optional) - Temperature for model generation (default: None)
+        - token_budget: int (optional) - Tokens after which no more tool calls are allowed (default: None)
 
         Returns:
         - CustomAsyncStream[ChatCompletionChunk] - A stream of chat completion chunks
@@ -116,9 +130,10 @@ class MCPChatProcessor:
         - model: str - The model to use for chat completions
         - messages: List[Dict] - The messages to process
         - client: Any - The OpenAI client
-        - max_turns: int (optional) - Maximum number of tool call turns (default: 3)
+        - max_turns: int (optional) - Maximum number of model calls in the agent loop (default: 3)
         - user_data: Dict (optional) - User data for MCP client (default: {})
         - temperature: float (optional) - Temperature for model generation (default: None)
+        - token_budget: int (optional) - Tokens after which no more tool calls are allowed (default: None)
 
         Returns:
         - The final chat completion response
@@ -126,37 +141,82 @@ class MCPChatProcessor:
         processor = cls(**kwargs, stream=False, stream_options={})
         return processor.process_openai_non_stream_chat()
 
+    def _tools_allowed(self, turn: int) -> bool:
+        """
+        Decide whether the model call for this turn may call tools.
+
+        The last allowed turn, or any turn after the token budget is spent, may not,
+        so the model has to produce its final answer. The tools are still sent with
+        such a call, since the history may hold tool calls and results already.
+        """
+        if turn >= self.max_turns - 1:
+            return False
+        if self.token_budget and self.tokens_used >= self.token_budget:
+            return False
+        return True
+
+    def _openai_completion_params(self, turn: int) -> Dict:
+        completion_params = {
+            "model": self.model,
+            "messages": self.chat_messages,
+            "stream": self.stream
+        }
+        if self.stream:
+            completion_params["stream_options"] = self.stream_options
+        if self.tools:
+            completion_params["tools"] = self.tools
+            if not self._tools_allowed(turn):
+                completion_params["tool_choice"] = "none"
+
+        # Only add temperature if it's provided
+        if self.temperature is not None:
+            completion_params["temperature"] = self.temperature
+        return completion_params
+
+    def _anthropic_completion_params(self, turn: int) -> Dict:
+        completion_params = {
+            "model": self.model,
+            "messages": self.chat_messages,
+            "max_tokens": self.max_tokens,
+            "system": self.system_message
+        }
+        if self.tools:
+            # Anthropic rejects tool_use and tool_result blocks in the history of a call without tools
+            completion_params["tools"] = self.tools
+            if not self._tools_allowed(turn):
+                completion_params["tool_choice"] = {"type": "none"}
+        return completion_params
+
+    def _track_openai_usage(self, usage) -> None:
+        if usage is not None:
+            self.tokens_used += usage.total_tokens or 0
+
+    def _track_anthropic_usage(self, event) -> None:
+        if event.type == "message_start":
+            self.tokens_used += event.message.usage.input_tokens or 0
+        elif event.type == "message_delta":
+            self.tokens_used += event.usage.output_tokens or 0
+
     async def process_openai_stream_chat(self) -> AsyncGenerator[OpenAICompatibleChunk, None]:
-        """Process the chat with MCP tools."""
+        """Run the MCP agent loop: one model call per turn until no tool calls come back."""
         try:
             yield create_llm_chunk(MessageType.PROGRESS, "Warming up the thinking engine...",
                                    provider='openai')
             await self.setup_client()
 
             for turn in range(self.max_turns):
-                # Create initial completion with tools
                 if turn == 0:
                     yield create_llm_chunk(MessageType.PROGRESS,
                                            "Analyzing your question and determining next steps...",
                                            provider='openai')
-                completion_params = {
-                    "model": self.model,
-                    "messages": self.chat_messages,
-                    "tools": self.tools,
-                    "stream": self.stream,
-                    "stream_options": self.stream_options
-                }
 
-                # Only add temperature if it's provided
-                if self.temperature is not None:
-                    completion_params["temperature"] = self.temperature
-
-                stream_response = await self.client.chat.completions.create(**completion_params)
+                stream_response = await self.client.chat.completions.create(**self._openai_completion_params(turn))
 
                 # Collect tool calls while streaming response
                 final_tool_calls = {}
                 async for chunk in stream_response:
                     try:
+                        self._track_openai_usage(getattr(chunk, 'usage', None))
                         if hasattr(chunk, 'choices') and chunk.choices and hasattr(chunk.choices[0], 'delta'):
                             delta = chunk.choices[0].delta
                             if hasattr(delta, 'tool_calls') and delta.tool_calls:
@@ -178,118 +238,86 @@ class MCPChatProcessor:
                     except IndexError as e:
                         BaseView.construct_error_response(f"Index error in stream processing: {str(e)}")
 
-                # Process tool calls from the response
-                if final_tool_calls:
-
-                    yield create_llm_chunk(MessageType.PROGRESS,
-                                           "Using MCP tools to gather information...",
-                                           provider='openai')
-
-                    self.chat_messages.append(
-                        {"role": "assistant", "content": None,
-                         "tool_calls": MCPHelper.convert_to_openai_tool_format(final_tool_calls)}
-                    )
-
-                    async for tool_progress in self.process_tool_calls(final_tool_calls, provider='openai'):
-                        yield tool_progress
-
-                    yield create_llm_chunk(MessageType.PROGRESS,
-                                           "Information gathered. Formulating complete response...",
-                                           provider='openai')
+                if not final_tool_calls:
+                    # No tool calls, so the model has answered
+                    break
 
-                    follow_up_params = {
-                        "model": self.model,
-                        "messages": self.chat_messages,
-                        "stream": self.stream,
-                        "stream_options": self.stream_options
-                    }
+                yield create_llm_chunk(MessageType.PROGRESS,
+                                       "Using MCP tools to gather information...",
+                                       provider='openai')
 
-                    # Only add temperature if it's provided
-                    if self.temperature is not None:
-                        follow_up_params["temperature"] = self.temperature
+                self.chat_messages.append(
+                    {"role": "assistant", "content": None,
+                     "tool_calls": MCPHelper.convert_to_openai_tool_format(final_tool_calls)}
+                )
 
-                    result = await self.client.chat.completions.create(**follow_up_params)
+                async for tool_progress in self.process_tool_calls(final_tool_calls, provider='openai'):
+                    yield tool_progress
 
-                    async for chunk in result:
-                        yield chunk
-                else:
-                    # No tool calls, so we're done
-                    break
-
-            await self.client_manager.close()
+                yield create_llm_chunk(MessageType.PROGRESS,
+                                       "Information gathered. Formulating complete response...",
+                                       provider='openai')
         except Exception as e:
             BaseView.construct_error_response(e)
+        finally:
+            if self.client_manager:
+                await self.client_manager.close()
 
     async def process_openai_non_stream_chat(self) -> Any:
-        """Process the chat with MCP tools without streaming."""
+        """Run the MCP agent loop without streaming and return the final completion."""
         try:
             await self.setup_client()
 
-            for _ in range(self.max_turns):
-                # Create initial completion with tools
-                completion_params = {
-                    "model": self.model,
-                    "messages": self.chat_messages,
-                    "tools": self.tools,
-                    "stream": False
-                }
-
-                # Only add temperature if it's provided
-                if self.temperature is not None:
-                    completion_params["temperature"] = self.temperature
-
-                # First LLM call to determine which tool to use
-                response = await self.client.chat.completions.create(**completion_params)
+            response = None
+            for turn in range(self.max_turns):
+                response = await self.client.chat.completions.create(**self._openai_completion_params(turn))
+                self._track_openai_usage(getattr(response, 'usage', None))
 
-                # Check if the model wants to use tools
                 message = response.choices[0].message
-                if message.tool_calls:
-                    # Convert tool calls to the format expected by process_tool_calls
-                    final_tool_calls = {
-                        i: tool_call for i, tool_call in enumerate(message.tool_calls)
-                    }
-
-                    # Process tool calls and update chat messages
-                    await self.process_tool_calls(final_tool_calls)
-
-                    follow_up_params = {
-                        "model": self.model,
-                        "messages": self.chat_messages,
-                        "stream": False
-                    }
-
-                    # Only add temperature if it's provided
-                    if self.temperature is not None:
-                        follow_up_params["temperature"] = self.temperature
-
-                    response = await self.client.chat.completions.create(**follow_up_params)
-                return response
-            await self.client_manager.close()
+                if not message.tool_calls:
+                    break
+
+                final_tool_calls = {
+                    index: {
+                        "id": tool_call.id,
+                        "type": tool_call.type,
+                        "function": {
+                            "name": tool_call.function.name,
+                            "arguments": tool_call.function.arguments
+                        }
+                    } for index, tool_call in enumerate(message.tool_calls)
+                }
+                self.chat_messages.append(
+                    {"role": "assistant", "content": message.content,
+                     "tool_calls": MCPHelper.convert_to_openai_tool_format(final_tool_calls)}
+                )
+
+                # Progress chunks are only meaningful for streaming clients
+                async for _ in self.process_tool_calls(final_tool_calls):
+                    pass
+            return response
         except Exception as e:
             return BaseView.construct_error_response(e)
+        finally:
+            if self.client_manager:
+                await self.client_manager.close()
 
     async def process_anthropic_stream_chat(self) -> AsyncGenerator[AnthropicCompatibleChunk, None]:
-        """Process the chat with MCP tools."""
+        """Run the MCP agent loop: one model call per turn until no tool calls come back."""
         try:
             yield create_llm_chunk(MessageType.PROGRESS, "Warming up the thinking engine...",
                                    provider='anthropic')
             await self.setup_client(provider="anthropic")
 
             for turn in range(self.max_turns):
-                # Create initial completion with tools
                 if turn == 0:
                     yield create_llm_chunk(MessageType.PROGRESS,
                                            "Analyzing your question and determining next steps...",
                                            provider='anthropic')
-                completion_params = {
-                    "model": self.model,
-                    "messages": self.chat_messages,
-                    "tools": self.tools,
-                    "max_tokens": self.max_tokens,
-                    "system": self.system_message
-                }
 
-                stream_response = await self.client.messages.stream(**completion_params).__aenter__()
+                stream_response = await self.client.messages.stream(
+                    **self._anthropic_completion_params(turn)
+                ).__aenter__()
 
                 # Collect tool calls while streaming response
                 final_tool_calls = {}
@@ -300,6 +328,7 @@ class MCPChatProcessor:
                     try:
                         # Anthropic format
                         if hasattr(chunk, 'type'):
+                            self._track_anthropic_usage(chunk)
                             if chunk.type == "content_block_start" and chunk.content_block.type == "tool_use":
                                 # Start a new tool
                                 index = tool_index
@@ -324,41 +353,29 @@ class MCPChatProcessor:
                     except IndexError as e:
                         BaseView.construct_error_response(f"Index error in stream processing: {str(e)}")
 
-                # Process tool calls from the response
-                if final_tool_calls:
-                    self.chat_messages.append({
-                        "role": "assistant",
-                        "content": MCPHelper.convert_to_anthropic_tool_format(final_tool_calls)
-                    })
-
-                    yield create_llm_chunk(MessageType.PROGRESS,
-                                           "Using MCP tools to gather information...",
-                                           provider='anthropic')
-                    async for tool_progress in self.process_tool_calls(final_tool_calls, provider='anthropic'):
-                        yield tool_progress
-
-                    yield create_llm_chunk(MessageType.PROGRESS,
-                                           "Information gathered. Formulating complete response...",
-                                           provider='anthropic')
-
-                    follow_up_params = {
-                        "model": self.model,
-                        "messages": self.chat_messages,
-                        "max_tokens": self.max_tokens,
-                        "system": self.system_message
-                    }
+                if not final_tool_calls:
+                    # No tool calls, so the model has answered
+                    break
 
-                    result = await self.client.messages.stream(**follow_up_params).__aenter__()
+                self.chat_messages.append({
+                    "role": "assistant",
+                    "content": MCPHelper.convert_to_anthropic_tool_format(final_tool_calls)
+                })
 
-                    async for chunk in result:
-                        yield chunk
-                else:
-                    # No tool calls, so we're done
-                    break
+                yield create_llm_chunk(MessageType.PROGRESS,
+                                       "Using MCP tools to gather information...",
+                                       provider='anthropic')
+                async for tool_progress in self.process_tool_calls(final_tool_calls, provider='anthropic'):
+                    yield tool_progress
 
-            await self.client_manager.close()
+                yield create_llm_chunk(MessageType.PROGRESS,
+                                       "Information gathered. Formulating complete response...",
+                                       provider='anthropic')
         except Exception as e:
             BaseView.construct_error_response(e)
+        finally:
+            if self.client_manager:
+                await self.client_manager.close()
 
     @classmethod
     def create_anthropic_stream(cls, **kwargs) -> CustomAsyncStream[AnthropicCompatibleChunk]:
@@ -371,9 +388,10 @@ class MCPChatProcessor:
         - stream: bool - Whether to stream the response
         - stream_options: Dict - Options for streaming
         - client: Any - The OpenAI client
-        - max_turns: int (optional) - Maximum number of tool call turns (default: 3)
+        - max_turns: int (optional) - Maximum number of model calls in the agent loop (default: 3)
         - user_data: Dict (optional) - User data for MCP client (default: {})
         - temperature: float (optional) - Temperature for model generation (default: None)
+        - token_budget: int (optional) - Tokens after which no more tool calls are allowed (default: None)
 
         Returns:
         - CustomAsyncStream[AnthropicCompatibleChunk] - A stream of chat completion chunks
@@ -2,30 +2,34 @@ from contextlib import AsyncExitStack
 
 from mcp import ClientSession
 from mcp.client.sse import sse_client
-from mcp.client.stdio import stdio_client
 
 from config.logging import logger
+from config.settings import loaded_config
+from mcp_client.observations import ToolObservationFormatter
+from mcp_client.stdio_pool import stdio_server_pool
+from mcp_client.tool_cache import tool_result_cache
 
 
 class MultipleMCPClientManager:
-    def __init__(self, stdio_server_map, sse_server_map):
+    def __init__(self, stdio_server_map, sse_server_map, user_id=None):
         self.stdio_server_map = stdio_server_map
         self.sse_server_map = sse_server_map
+        self.user_id = user_id
         self.sessions = {}
+        self.server_configs = {mcp.mcp_name: mcp for mcp in sse_server_map + stdio_server_map}
         self.exit_stack = AsyncExitStack()
 
     async def initialize(self):
-        # Initialize stdio connections
-        for server_name, params in self.stdio_server_map.items():
-            stdio_transport = await self.exit_stack.enter_async_context(
-                stdio_client(params)
-            )
-            read, write = stdio_transport
-            session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
-            )
-            await session.initialize()
-            self.sessions[server_name] = session
+        # Lease stdio servers from the warm pool, they are returned to it on close
+        for mcp in self.stdio_server_map:
+            try:
+                session = await self.exit_stack.enter_async_context(
+                    stdio_server_pool.lease(self.user_id, mcp)
+                )
+            except Exception as e:
+                logger.warning(f"Skipping stdio MCP server '{mcp.mcp_name}': {e}")
+                continue
+            self.sessions[mcp.mcp_name] = session
 
         # Initialize SSE connections
         for mcp in self.sse_server_map:
@@ -60,11 +64,29 @@ class MultipleMCPClientManager:
             logger.error(f"Tool '{tool_name}' not found.")
             return
 
+        server_config = self.server_configs.get(server_name)
+        cached_observation = tool_result_cache.get(server_config, tool_name, arguments)
+        if cached_observation is not None:
+            logger.info(f"Serving tool '{tool_name}' from cache.")
+            return cached_observation
+
         session = self.sessions.get(server_name)
         if session:
             result = await session.call_tool(tool_name, arguments=arguments)
-            return result.content[0].text
+            observation = ToolObservationFormatter(
+                self.get_output_budget(server_config, tool_name)
+            ).render(result.content)
+            if not result.isError:
+                tool_result_cache.set(server_config, tool_name, arguments, observation)
+            return observation
         return
 
+    @staticmethod
+    def get_output_budget(server_config, tool_name):
+        policy = server_config.get_tool_policy(tool_name) if server_config else None
+        if policy and policy.max_output_tokens:
+            return policy.max_output_tokens
+        return loaded_config.mcp_tool_output_max_tokens
+
     async def close(self):
         await self.exit_stack.aclose()
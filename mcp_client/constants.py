@@ -1,7 +1,9 @@
 import datetime
 import uuid
 
-from mcp_configs.serializers import MCPModelClass
+from mcp_configs.serializers import MCPModelClass, MCPToolPolicy
+
+STDIO_SERVER_TYPE = "stdio"
 
 # Default SSE servers configuration as MCPModel instances
 BUILTIN_MCP_SERVERS = [
@@ -16,6 +18,7 @@ BUILTIN_MCP_SERVERS = [
         args=None,
         env_vars=None,
         source="system",
+        tool_policies={"*": MCPToolPolicy(cache_ttl=600)},
         created_at=datetime.datetime.now(),
         updated_at=datetime.datetime.now(),
     ),
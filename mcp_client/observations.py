@@ -0,0 +1,86 @@
+import json
+import re
+from typing import Any, Iterator, List
+
+from utils.tokenizer import DEFAULT_ENCODING_MODEL, fits_in_tokens, truncate_to_tokens
+
+SECTION_SEPARATOR = "\n\n"
+SECTION_BOUNDARY = re.compile(r"\n\s*\n|\n(?=#{1,6} )")
+
+
+class ToolObservationFormatter:
+    """
+    Render MCP tool result content into an observation that fits a token budget.
+
+    All content parts are rendered, not just the first one. Text is split into sections
+    (JSON array items, markdown headings or paragraphs) and the leading sections are kept
+    while they fit; the first section that does not fit is truncated and the rest are
+    replaced by a short notice. Binary parts are represented by a placeholder.
+    """
+
+    TRUNCATION_NOTICE = "[... {omitted} section(s) truncated or omitted to fit the {budget}-token budget]"
+
+    def __init__(self, max_tokens: int, model_name: str = DEFAULT_ENCODING_MODEL):
+        self.max_tokens = max_tokens
+        self.model_name = model_name
+
+    def render(self, content_parts: List[Any]) -> str:
+        pieces = []
+        remaining = self.max_tokens
+        omitted = 0
+
+        for section in self._iter_sections(content_parts):
+            if remaining <= 0:
+                omitted += 1
+                continue
+
+            tokens = fits_in_tokens(section, remaining, self.model_name)
+            if tokens >= 0:
+                pieces.append(section)
+                remaining -= tokens
+            else:
+                pieces.append(truncate_to_tokens(section, remaining, self.model_name))
+                remaining = 0
+                omitted += 1
+
+        if omitted:
+            pieces.append(self.TRUNCATION_NOTICE.format(omitted=omitted, budget=self.max_tokens))
+        return SECTION_SEPARATOR.join(pieces)
+
+    def _iter_sections(self, content_parts: List[Any]) -> Iterator[str]:
+        for part in content_parts or []:
+            part_type = getattr(part, "type", None)
+            if part_type == "text":
+                yield from self._split_text(part.text)
+            elif part_type == "resource":
+                resource = part.resource
+                text = getattr(resource, "text", None)
+                if text is not None:
+                    yield from self._split_text(text)
+                else:
+                    yield f"[binary resource: {resource.uri} ({resource.mimeType or 'unknown type'})]"
+            elif part_type == "image":
+                yield f"[image: {part.mimeType}]"
+            elif part is not None:
+                yield str(part)
+
+    @staticmethod
+    def _split_text(text: str) -> Iterator[str]:
+        stripped = text.lstrip()
+        if stripped.startswith("["):
+            try:
+                items = json.loads(text)
+            except ValueError:
+                items = None
+            if isinstance(items, list):
+                for item in items:
+                    yield json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+                return
+
+        start = 0
+        for boundary in SECTION_BOUNDARY.finditer(text):
+            if boundary.start() > start:
+                yield text[start:boundary.start()]
+            start = boundary.end()
+        if start < len(text):
+            yield text[start:]
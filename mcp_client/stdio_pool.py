@@ -0,0 +1,292 @@
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Set, Tuple
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+
+from config.logging import logger
+from config.settings import loaded_config
+from mcp_configs.exceptions import MCPServerPoolExhaustedException
+from mcp_configs.serializers import MCPModelClass
+from mcp_configs.stdio_allowlist import stdio_launch_allowlist
+
+PoolKey = Tuple[str, str, str]
+
+
+class StdioServerProcess:
+    """
+    A pre-spawned stdio MCP server and its initialized client session.
+
+    The stdio transport and session are entered and exited by a dedicated background
+    task, so the process can outlive the request that spawned it and be shut down from
+    any other task.
+    """
+
+    def __init__(self, key: PoolKey, params: StdioServerParameters):
+        self.key = key
+        self.params = params
+        self.session: Optional[ClientSession] = None
+        self.calls = 0
+        self.in_use = False
+        self.broken = False
+        self.retired = False
+        self.last_used = time.monotonic()
+        self._ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def user_id(self) -> str:
+        return self.key[0]
+
+    @property
+    def mcp_id(self) -> str:
+        return self.key[1]
+
+    @property
+    def alive(self) -> bool:
+        return not self.broken and self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float) -> None:
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+        except Exception:
+            await self.stop()
+            raise
+
+    async def _run(self) -> None:
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set_result(session)
+                    await self._stop.wait()
+        except Exception as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            else:
+                logger.warning(f"stdio MCP server {self.params.command} exited: {e}")
+        finally:
+            self.session = None
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except Exception:
+            self._task.cancel()
+
+
+class PooledSession:
+    """Session handed out by the pool; counts tool calls and flags crashed servers."""
+
+    def __init__(self, process: StdioServerProcess):
+        self._process = process
+
+    async def list_tools(self):
+        return await self._guard(self._process.session.list_tools())
+
+    async def call_tool(self, name, arguments=None):
+        self._process.calls += 1
+        return await self._guard(self._process.session.call_tool(name, arguments=arguments))
+
+    async def _guard(self, request):
+        try:
+            return await request
+        except McpError:
+            # The server answered with an error, it is still healthy
+            raise
+        except Exception:
+            self._process.broken = True
+            raise
+
+
+class StdioServerPool:
+    """
+    Warm pool of stdio MCP server processes.
+
+    Processes are keyed by user, MCP config id and a hash of the launch parameters, so
+    a process is only ever reused by the user that owns the config. A leased process is
+    used by one chat at a time, is recycled after ``max_calls_per_process`` tool calls
+    or when it crashes, and is stopped after ``idle_timeout`` seconds without use.
+    Only launches on the admin allowlist are spawned, whatever was saved in the config.
+    """
+
+    def __init__(self, max_processes: int, max_processes_per_user: int, max_calls_per_process: int,
+                 idle_timeout: float, startup_timeout: float):
+        self.max_processes = max_processes
+        self.max_processes_per_user = max_processes_per_user
+        self.max_calls_per_process = max_calls_per_process
+        self.idle_timeout = idle_timeout
+        self.startup_timeout = startup_timeout
+        self._processes: List[StdioServerProcess] = []
+        self._spawning = 0
+        self._released = asyncio.Condition()
+        self._reaper: Optional[asyncio.Task] = None
+        # Strong references to the background prewarm and stop tasks, the loop only keeps weak ones
+        self._tasks: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_key(user_id: str, mcp: MCPModelClass) -> PoolKey:
+        launch = json.dumps([mcp.command, mcp.args or [], mcp.env_vars or {}], sort_keys=True)
+        return str(user_id), str(mcp.id), hashlib.sha256(launch.encode()).hexdigest()
+
+    @staticmethod
+    def make_params(mcp: MCPModelClass) -> StdioServerParameters:
+        stdio_launch_allowlist.check(mcp.command, mcp.args, mcp.env_vars)
+        return StdioServerParameters(command=mcp.command, args=mcp.args or [], env=mcp.env_vars or None)
+
+    @asynccontextmanager
+    async def lease(self, user_id: str, mcp: MCPModelClass):
+        process = await self._acquire(user_id, mcp)
+        try:
+            yield PooledSession(process)
+        finally:
+            await self._release(process, mcp)
+
+    async def prewarm(self, user_id: str, mcp: MCPModelClass) -> None:
+        """Spawn an idle process for the config unless one is already available."""
+        key = self.make_key(user_id, mcp)
+        if any(p.key == key and not p.in_use and p.alive for p in self._processes):
+            return
+        if not self._has_capacity(key[0]):
+            return
+        self._spawning += 1
+        try:
+            await self._spawn(key, mcp)
+        except Exception as e:
+            logger.warning(f"Failed to prewarm stdio MCP server {mcp.mcp_name}: {e}")
+        finally:
+            self._spawning -= 1
+
+    def schedule_prewarm(self, user_id: str, mcp: MCPModelClass) -> None:
+        self._in_background(self.prewarm(user_id, mcp))
+
+    def evict(self, user_id: str, mcp_id: str) -> None:
+        """Stop the processes of a deleted or deactivated config, leased ones once they are released."""
+        for process in [p for p in self._processes if p.user_id == str(user_id) and p.mcp_id == str(mcp_id)]:
+            process.retired = True
+            if not process.in_use:
+                self._remove(process)
+
+    def _in_background(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _acquire(self, user_id: str, mcp: MCPModelClass) -> StdioServerProcess:
+        key = self.make_key(user_id, mcp)
+        deadline = time.monotonic() + self.startup_timeout
+
+        async with self._released:
+            while True:
+                self._discard_dead()
+                for process in self._processes:
+                    if process.key == key and not process.in_use:
+                        process.in_use = True
+                        return process
+
+                if self._has_capacity(key[0]) or self._evict_idle(key[0]):
+                    break
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise MCPServerPoolExhaustedException()
+                try:
+                    await asyncio.wait_for(self._released.wait(), remaining)
+                except asyncio.TimeoutError:
+                    raise MCPServerPoolExhaustedException()
+            self._spawning += 1
+
+        try:
+            process = await self._spawn(key, mcp, in_use=True)
+        finally:
+            self._spawning -= 1
+        return process
+
+    async def _spawn(self, key: PoolKey, mcp: MCPModelClass, in_use: bool = False) -> StdioServerProcess:
+        process = StdioServerProcess(key, self.make_params(mcp))
+        process.in_use = in_use
+        await process.start(self.startup_timeout)
+        self._processes.append(process)
+        return process
+
+    async def _release(self, process: StdioServerProcess, mcp: MCPModelClass) -> None:
+        process.in_use = False
+        process.last_used = time.monotonic()
+
+        if process.retired:
+            self._remove(process)
+        elif not process.alive or process.calls >= self.max_calls_per_process:
+            self._remove(process)
+            # Keep the config warm for the next request
+            self.schedule_prewarm(process.user_id, mcp)
+
+        async with self._released:
+            self._released.notify_all()
+
+    def _has_capacity(self, user_id: str) -> bool:
+        user_processes = sum(1 for p in self._processes if p.user_id == user_id)
+        total = len(self._processes) + self._spawning
+        return total < self.max_processes and user_processes < self.max_processes_per_user
+
+    def _evict_idle(self, user_id: str) -> bool:
+        """Stop the least recently used idle process that frees a slot for the user."""
+        user_processes = [p for p in self._processes if p.user_id == user_id]
+        if len(user_processes) >= self.max_processes_per_user:
+            candidates = [p for p in user_processes if not p.in_use]
+        else:
+            candidates = [p for p in self._processes if not p.in_use]
+        if not candidates:
+            return False
+        self._remove(min(candidates, key=lambda p: p.last_used))
+        return True
+
+    def _discard_dead(self) -> None:
+        for process in [p for p in self._processes if not p.in_use and not p.alive]:
+            self._remove(process)
+
+    def _remove(self, process: StdioServerProcess) -> None:
+        if process in self._processes:
+            self._processes.remove(process)
+        self._in_background(process.stop())
+
+    async def _reap_idle(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 1))
+            now = time.monotonic()
+            for process in list(self._processes):
+                if not process.in_use and (not process.alive or now - process.last_used > self.idle_timeout):
+                    self._remove(process)
+
+    def start(self) -> None:
+        if self._reaper is None:
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def shutdown(self) -> None:
+        if self._reaper:
+            self._reaper.cancel()
+            self._reaper = None
+        processes, self._processes = self._processes, []
+        tasks, self._tasks = list(self._tasks), set()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, *(process.stop() for process in processes), return_exceptions=True)
+
+
+stdio_server_pool = StdioServerPool(
+    max_processes=loaded_config.mcp_stdio_max_processes,
+    max_processes_per_user=loaded_config.mcp_stdio_max_processes_per_user,
+    max_calls_per_process=loaded_config.mcp_stdio_max_calls_per_process,
+    idle_timeout=loaded_config.mcp_stdio_idle_timeout,
+    startup_timeout=loaded_config.mcp_stdio_startup_timeout
+)
@@ -0,0 +1,50 @@
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from config.settings import loaded_config
+from mcp_configs.serializers import MCPModelClass
+from utils.ttl_cache import TTLCache
+
+
+class MCPToolResultCache:
+    """
+    Opt-in cache for results of idempotent MCP tools.
+
+    A tool is cacheable when its MCP config declares a ``cache_ttl`` for it in
+    ``tool_policies`` (or for ``"*"`` to cover every tool on the server). Entries are
+    keyed by server id, tool name and the canonicalized call arguments, so user-owned
+    servers never share entries with each other.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._cache = TTLCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    @staticmethod
+    def get_ttl(mcp: Optional[MCPModelClass], tool_name: str) -> Optional[int]:
+        """Return the cache TTL declared for the tool, or None if it is not cacheable."""
+        policy = mcp.get_tool_policy(tool_name) if mcp else None
+        if not policy or not policy.cache_ttl:
+            return None
+        return policy.cache_ttl
+
+    @staticmethod
+    def make_key(mcp: MCPModelClass, tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str, str]:
+        canonical_arguments = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"), default=str)
+        return str(mcp.id), tool_name, canonical_arguments
+
+    def get(self, mcp: MCPModelClass, tool_name: str, arguments: Dict[str, Any]) -> Optional[str]:
+        if self.get_ttl(mcp, tool_name) is None:
+            return None
+        return self._cache.get(self.make_key(mcp, tool_name, arguments))
+
+    def set(self, mcp: MCPModelClass, tool_name: str, arguments: Dict[str, Any], observation: str) -> None:
+        ttl = self.get_ttl(mcp, tool_name)
+        if ttl is None:
+            return
+        self._cache.set(self.make_key(mcp, tool_name, arguments), observation, ttl=ttl)
+
+
+tool_result_cache = MCPToolResultCache(
+    max_entries=loaded_config.mcp_tool_cache_max_entries,
+    max_bytes=loaded_config.mcp_tool_cache_max_bytes
+)
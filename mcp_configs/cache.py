@@ -0,0 +1,55 @@
+from typing import List
+
+from clerk_integration.utils import UserData
+
+from config.settings import loaded_config
+from mcp_configs.serializers import MCPModelClass
+from mcp_configs.service import MCPService
+from utils.connection_handler import execute_read_db_operation
+from utils.ttl_cache import TTLCache
+
+
+class UserMCPConfigCache:
+    """
+    In-process cache of the MCP configs owned by each user.
+
+    Lookups are served from the read replica and cached for ``ttl`` seconds. The MCP
+    CRUD views invalidate a user's entry after committing. Other workers pick the
+    change up when their entry expires. Right after a write the read router sends the
+    user's lookups to the primary, so replica lag cannot put a stale list back in the
+    cache.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self._configs = TTLCache(max_entries=max_entries, default_ttl=ttl)
+        self._generation = 0
+
+    async def get_mcps(self, user_data: UserData) -> List[MCPModelClass]:
+        """Return every MCP config of the user, including inactive ones."""
+        user_id = str(user_data.userId)
+        mcps = self._configs.get(user_id)
+        if mcps is not None:
+            return mcps
+
+        generation = self._generation
+        mcps = await execute_read_db_operation(MCPService.get_mcps_by_user_operation, user_data)
+
+        # Do not cache a list that was loaded while an invalidation happened
+        if generation == self._generation:
+            self._configs.set(user_id, mcps)
+        return mcps
+
+    async def get_active_mcps(self, user_data: UserData) -> List[MCPModelClass]:
+        """Return the MCP configs of the user that are not marked inactive."""
+        return [mcp for mcp in await self.get_mcps(user_data) if not mcp.inactive]
+
+    def invalidate(self, user_id: str) -> None:
+        user_id = str(user_id)
+        self._generation += 1
+        self._configs.delete(user_id)
+
+
+mcp_config_cache = UserMCPConfigCache(
+    ttl=loaded_config.mcp_config_cache_ttl,
+    max_entries=loaded_config.mcp_config_cache_max_entries
+)
@@ -41,3 +41,15 @@ class MCPToggleInactiveException(MCPException):
     """Exception raised when toggling inactive status fails."""
     error_code = 5106
     message = "Failed to toggle inactive status."
+
+
+class MCPServerPoolExhaustedException(MCPException):
+    """Exception raised when no stdio MCP server process can be leased in time."""
+    error_code = 5107
+    message = "Too many MCP servers are running, please try again shortly."
+
+
+class MCPStdioLaunchNotAllowedException(MCPException):
+    """Exception raised when a stdio MCP config launches a command that is not allowlisted."""
+    error_code = 5108
+    message = "This MCP server command is not allowed to run on the server."
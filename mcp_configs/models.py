@@ -22,6 +22,7 @@ class MCPModel(TimestampMixin, Base):
     - args: Arguments for the command (stored as JSON)
     - env_vars: Environment variables (stored as JSON)
     - source: Origin of the MCP configuration (e.g., 'vscode', 'website')
+    - tool_policies: Per-tool policies such as result cache TTLs (stored as JSON)
     - created_at: Timestamp for creation (from TimestampMixin)
     - updated_at: Timestamp for updates (from TimestampMixin)
     """
@@ -30,10 +31,11 @@ class MCPModel(TimestampMixin, Base):
     id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     mcp_name: Mapped[str] = Column(String, nullable=False)
     sse_url: Mapped[str] = Column(String, nullable=True)
-    user_id: Mapped[str] = Column(String, nullable=False)
+    user_id: Mapped[str] = Column(String, nullable=False, index=True)
     inactive: Mapped[bool] = Column(Boolean, default=False)
     type: Mapped[str] = Column(String, nullable=False)
     command: Mapped[str] = Column(String, nullable=True)
     args: Mapped[dict] = Column(JSON, nullable=True)
     env_vars: Mapped[dict] = Column(JSON, nullable=True)
     source: Mapped[str] = Column(String, nullable=True)
+    tool_policies: Mapped[dict] = Column(JSON, nullable=True)
@@ -4,7 +4,7 @@ from fastapi import HTTPException, Depends
 from mcp_configs.exceptions import MCPNotFoundException, MCPUnauthorizedException
 from mcp_configs.service import MCPService
 from utils.common import UserDataHandler
-from utils.connection_handler import ConnectionHandler, get_connection_handler_for_app
+from utils.connection_handler import ConnectionHandler, get_routed_read_connection_handler_for_app
 
 
 class MCPOwnershipService:
@@ -49,7 +49,7 @@ class MCPOwnershipService:
 async def verify_mcp_ownership(
         mcp_id: str,
         user_data: UserData = Depends(UserDataHandler.get_user_data_from_request),
-        connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app)
+        connection_handler: ConnectionHandler = Depends(get_routed_read_connection_handler_for_app)
 ):
     """
     Dependency for verifying MCP record ownership.
@@ -5,16 +5,24 @@ from uuid import UUID
 from pydantic import BaseModel, Field, ConfigDict
 
 
+class MCPToolPolicy(BaseModel):
+    """Per-tool execution policy declared on an MCP config."""
+    cache_ttl: Optional[int] = Field(None, ge=0, description="Seconds a tool result may be served from cache")
+    max_output_tokens: Optional[int] = Field(None, ge=1, description="Token budget for the tool observation")
+
+
 class MCPCreateRequest(BaseModel):
     """Request model for creating a new MCP record."""
     mcp_name: str = Field(..., description="Name of the MCP")
-    sse_url: str = Field(..., description="URL for Server-Sent Events")
+    sse_url: Optional[str] = Field(None, description="URL for Server-Sent Events")
     inactive: Optional[bool] = Field(False, description="Inactive status flag")
     type: str = Field(..., description="Type of MCP server")
     command: Optional[str] = Field(None, description="Command to run the server")
     args: Optional[List[str]] = Field(None, description="Arguments for the command")
     env_vars: Optional[Dict[str, str]] = Field(None, description="Environment variables")
     source: Optional[str] = Field(None, description="Origin of the MCP configuration")
+    tool_policies: Optional[Dict[str, MCPToolPolicy]] = Field(
+        None, description="Per-tool policies keyed by tool name, '*' applies to every tool")
 
 
 class MCPUpdateRequest(BaseModel):
@@ -27,6 +35,8 @@ class MCPUpdateRequest(BaseModel):
     args: Optional[List[str]] = Field(None, description="Arguments for the command")
     env_vars: Optional[Dict[str, str]] = Field(None, description="Environment variables")
     source: Optional[str] = Field(None, description="Origin of the MCP configuration")
+    tool_policies: Optional[Dict[str, MCPToolPolicy]] = Field(
+        None, description="Per-tool policies keyed by tool name, '*' applies to every tool")
 
 
 class MCPToggleInactiveRequest(BaseModel):
@@ -38,7 +48,7 @@ class MCPModelClass(BaseModel):
     """Response model for MCP operations."""
     id: UUID
     mcp_name: str
-    sse_url: str
+    sse_url: Optional[str] = None
     user_id: str
     inactive: bool
     type: str
@@ -46,11 +56,18 @@ class MCPModelClass(BaseModel):
     args: Optional[List[str]] = None
     env_vars: Optional[Dict[str, str]] = None
     source: Optional[str] = None
+    tool_policies: Optional[Dict[str, MCPToolPolicy]] = None
     created_at: datetime
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+    def get_tool_policy(self, tool_name: str) -> Optional[MCPToolPolicy]:
+        """Return the policy declared for the tool, falling back to the '*' policy."""
+        if not self.tool_policies:
+            return None
+        return self.tool_policies.get(tool_name) or self.tool_policies.get("*")
+
 
 class MCPListResponse(BaseModel):
     """Response model for listing MCP records."""
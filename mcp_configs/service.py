@@ -3,6 +3,8 @@ from typing import List, Dict, Any
 from clerk_integration.utils import UserData
 
 from config.logging import get_logger
+from config.settings import loaded_config
+from mcp_client.constants import STDIO_SERVER_TYPE
 from mcp_configs.dao import MCPDao
 from mcp_configs.exceptions import (
     MCPNotFoundException,
@@ -10,9 +12,11 @@ from mcp_configs.exceptions import (
     MCPCreationException,
     MCPUpdateException,
     MCPDeletionException,
-    MCPToggleInactiveException
+    MCPToggleInactiveException,
+    MCPStdioLaunchNotAllowedException
 )
 from mcp_configs.serializers import MCPModelClass
+from mcp_configs.stdio_allowlist import stdio_launch_allowlist
 from utils.connection_handler import ConnectionHandler
 
 logger = get_logger(__name__)
@@ -25,10 +29,18 @@ class MCPService:
         self.connection_handler = connection_handler
         self.mcp_dao = MCPDao(session=self.connection_handler.session)
 
+    @staticmethod
+    def check_stdio_launch(type: str, command: str, args: List[str], env_vars: Dict[str, str]) -> None:
+        """Refuse stdio configs the API host would run but the admins have not allowlisted."""
+        if loaded_config.mcp_stdio_enabled and type == STDIO_SERVER_TYPE:
+            stdio_launch_allowlist.check(command, args, env_vars)
+
     async def create_mcp(self, mcp_name: str, sse_url: str, user_data: UserData,
                          inactive: bool = False, type: str = None, command: str = None,
-                         args: List[str] = None, env_vars: Dict[str, str] = None, source: str = None):
+                         args: List[str] = None, env_vars: Dict[str, str] = None, source: str = None,
+                         tool_policies: Dict[str, Dict[str, Any]] = None):
         """Create a new MCP record."""
+        self.check_stdio_launch(type, command, args, env_vars)
         try:
             user_id = str(user_data.userId)
             mcp = self.mcp_dao.add_object(
@@ -40,7 +52,8 @@ class MCPService:
                 command=command,
                 args=args,
                 env_vars=env_vars,
-                source=source
+                source=source,
+                tool_policies=tool_policies
             )
             return mcp
         except Exception as e:
@@ -85,12 +98,16 @@ class MCPService:
                 raise MCPNotFoundException()
 
             # Filter out any fields that shouldn't be updated
-            valid_fields = {"mcp_name", "sse_url", "inactive", "type", "command", "args", "env_vars", "source"}
+            valid_fields = {"mcp_name", "sse_url", "inactive", "type", "command", "args", "env_vars", "source",
+                            "tool_policies"}
             filtered_data = {k: v for k, v in update_data.items() if k in valid_fields}
+            launch = {field: filtered_data.get(field, getattr(existing_mcp, field))
+                      for field in ("type", "command", "args", "env_vars")}
+            self.check_stdio_launch(**launch)
 
             updated_mcp = await self.mcp_dao.update_mcp(mcp_id, filtered_data)
             return updated_mcp
-        except (MCPNotFoundException, MCPUnauthorizedException) as e:
+        except (MCPNotFoundException, MCPUnauthorizedException, MCPStdioLaunchNotAllowedException) as e:
             raise
         except Exception as e:
             logger.error(f"Error in update_mcp service: {e}")
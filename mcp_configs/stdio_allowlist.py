@@ -0,0 +1,53 @@
+import shlex
+from typing import Dict, FrozenSet, List, NamedTuple, Optional
+
+from config.settings import loaded_config
+from mcp_configs.exceptions import MCPStdioLaunchNotAllowedException
+
+
+class StdioLaunch(NamedTuple):
+    tokens: List[str]
+    env_names: FrozenSet[str]
+
+
+class StdioLaunchAllowlist:
+    """
+    Launch prefixes of the stdio MCP servers the API host may spawn, set by admins.
+
+    Entries are separated by ``;``. Each is a command line, optionally followed by ``|``
+    and the comma separated names of the environment variables users may set for it,
+    e.g. ``npx -y @modelcontextprotocol/server-github | GITHUB_PERSONAL_ACCESS_TOKEN``
+    or ``docker run -i --rm mcp/fetch``. A config is allowed when its command followed
+    by its args starts with every token of an entry and each of its environment
+    variables is named by that entry, so the entry pins the executable, its flags and
+    the package or image, users only add trailing arguments, and no variable can
+    point the launcher at other code, e.g. ``npm_config_registry`` or ``HOME``.
+    """
+
+    def __init__(self, entries: List[StdioLaunch]):
+        self.entries = [entry for entry in entries if entry.tokens]
+
+    @classmethod
+    def parse(cls, value: str) -> "StdioLaunchAllowlist":
+        entries = []
+        for entry in value.split(";"):
+            command_line, _, env_names = entry.partition("|")
+            entries.append(StdioLaunch(shlex.split(command_line),
+                                       frozenset(name.strip() for name in env_names.split(",") if name.strip())))
+        return cls(entries)
+
+    def is_allowed(self, command: Optional[str], args: Optional[List[str]] = None,
+                   env_vars: Optional[Dict[str, str]] = None) -> bool:
+        if not command:
+            return False
+        launch = [command, *(args or [])]
+        return any(launch[:len(entry.tokens)] == entry.tokens and entry.env_names.issuperset(env_vars or {})
+                   for entry in self.entries)
+
+    def check(self, command: Optional[str], args: Optional[List[str]] = None,
+              env_vars: Optional[Dict[str, str]] = None) -> None:
+        if not self.is_allowed(command, args, env_vars):
+            raise MCPStdioLaunchNotAllowedException()
+
+
+stdio_launch_allowlist = StdioLaunchAllowlist.parse(loaded_config.mcp_stdio_allowed_launches)
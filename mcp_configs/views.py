@@ -1,9 +1,14 @@
 from clerk_integration.utils import UserData
 from fastapi import Depends, Path, Body
 
+from config.settings import loaded_config
+from mcp_client.constants import STDIO_SERVER_TYPE
+from mcp_client.stdio_pool import stdio_server_pool
+from mcp_configs.cache import mcp_config_cache
 from mcp_configs.exceptions import (
     MCPCreationException,
     MCPDeletionException,
+    MCPStdioLaunchNotAllowedException,
     MCPToggleInactiveException
 )
 from mcp_configs.models import MCPModel
@@ -49,15 +54,21 @@ class MCPViews(BaseView):
                 command=request.command,
                 args=request.args,
                 env_vars=request.env_vars,
-                source=request.source
+                source=request.source,
+                tool_policies=request.model_dump(include={"tool_policies"}, exclude_none=True).get("tool_policies")
             )
 
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
+            mcp_config_cache.invalidate(user_data.userId)
+            mcp = MCPModelClass.model_validate(result)
+            if loaded_config.mcp_stdio_enabled and mcp.type == STDIO_SERVER_TYPE and mcp.command and not mcp.inactive:
+                # Warm the server up so the first chat using it does not pay the spawn cost
+                stdio_server_pool.schedule_prewarm(str(user_data.userId), mcp)
             return cls.construct_success_response(
-                data=MCPModelClass.model_validate(result),
+                data=mcp,
                 message=cls.SUCCESS_MESSAGE_MCP_CREATED
             )
-        except MCPCreationException as e:
+        except (MCPCreationException, MCPStdioLaunchNotAllowedException) as e:
             await connection_handler.session.rollback()
             return cls.construct_error_response(exp=e)
         except Exception as e:
@@ -120,7 +131,9 @@ class MCPViews(BaseView):
             # We don't need to pass user_data since ownership is already verified
             result = await mcp_service.delete_mcp(mcp_id)
 
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
+            mcp_config_cache.invalidate(user_data.userId)
+            stdio_server_pool.evict(str(user_data.userId), mcp_id)
             return cls.construct_success_response(
                 message=cls.SUCCESS_MESSAGE_MCP_DELETED
             )
@@ -147,7 +160,10 @@ class MCPViews(BaseView):
             # We don't need to pass user_data since ownership is already verified
             result = await mcp_service.toggle_inactive(mcp_id, request.inactive)
 
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
+            mcp_config_cache.invalidate(user_data.userId)
+            if request.inactive:
+                stdio_server_pool.evict(str(user_data.userId), mcp_id)
             return cls.construct_success_response(
                 data=result.rowcount,
                 message=cls.SUCCESS_MESSAGE_MCP_INACTIVE_TOGGLED
@@ -1,16 +1,24 @@
 import uuid
+from datetime import datetime
 
-from sqlalchemy import String, Column, Integer
+from sqlalchemy import String, Column, Integer, Index, DateTime
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped
 
-from utils.sqlalchemy import TimestampMixin, Base
+from utils.sqlalchemy import TimestampMixin, Base, get_current_time
 
 
 class RequestLogger(TimestampMixin, Base):
     __tablename__ = "request_logger"
+    __table_args__ = (
+        Index("ix_request_logger_user_created_at", "user", "created_at"),
+        # Monthly partitions are created and dropped by request_logger.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[uuid.UUID] = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # The partition key has to be part of the primary key
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), primary_key=True, default=get_current_time)
     user: Mapped[str] = Column(String, unique=False)
     request_type: Mapped[str] = Column(String, unique=False)
     tokens: Mapped[int] = Column(Integer)
@@ -0,0 +1,137 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from config.logging import logger
+from config.settings import loaded_config
+
+PARENT_TABLE = "request_logger"
+# Arbitrary application-wide key, so only one worker maintains partitions at a time
+MAINTENANCE_LOCK_KEY = 7_351_202_604
+RANGE_BOUND_PATTERN = re.compile(r"FROM \((?:MINVALUE|'([^']+)')\) TO \((?:MAXVALUE|'([^']+)')\)")
+
+PARTITIONS_QUERY = text("""
+    SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :parent
+""")
+
+
+def month_start(moment: datetime, months: int = 0) -> datetime:
+    month = moment.month - 1 + months
+    return datetime(moment.year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT_TABLE}_p{start:%Y%m}"
+
+
+def parse_timestamp(value: Optional[str], unbounded: datetime) -> datetime:
+    if value is None:
+        return unbounded
+    # Postgres prints offsets as +00, which fromisoformat only accepts as +00:00
+    value = re.sub(r"([+-]\d{2})$", r"\1:00", value)
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+def range_bounds(bound_expression: str) -> Optional[Tuple[datetime, datetime]]:
+    """Lower and upper bound of a range partition, None for any other bound, e.g. ``DEFAULT``."""
+    match = RANGE_BOUND_PATTERN.search(bound_expression or "")
+    if not match:
+        return None
+    return (parse_timestamp(match.group(1), datetime.min.replace(tzinfo=timezone.utc)),
+            parse_timestamp(match.group(2), datetime.max.replace(tzinfo=timezone.utc)))
+
+
+class RequestLogPartitionManager:
+    """
+    Keep the monthly partitions of ``request_logger`` in shape.
+
+    Every run creates the partitions of the current month and ``months_ahead`` months
+    after it. It detaches, or drops, partitions that only hold rows older than
+    ``retention_months``. Dropping a partition frees its space at once, with no
+    DELETE, vacuum or index bloat. Runs take a transaction-level advisory lock, so
+    workers starting together do not race each other.
+
+    The table has no DEFAULT partition, which would make creating a month slow and
+    fail once it held rows of that month. Logs of a month without a partition fail to
+    insert instead, so ``months_ahead`` is how long maintenance may stall.
+    """
+
+    def __init__(self, months_ahead: int, retention_months: int, drop_expired: bool, interval: float):
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+        self.drop_expired = drop_expired
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        async with loaded_config.connection_manager.engine.begin() as connection:
+            locked = await connection.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"),
+                                             {"key": MAINTENANCE_LOCK_KEY})
+            if not locked:
+                return
+            partitions = (await connection.execute(PARTITIONS_QUERY, {"parent": PARENT_TABLE})).all()
+            for statement in self._create_statements(now, partitions):
+                await connection.execute(text(statement))
+            for statement in self._retention_statements(now, partitions):
+                await connection.execute(text(statement))
+
+    def _create_statements(self, now: datetime, partitions: List[Tuple[str, str]]) -> List[str]:
+        ranges = [bounds for bounds in (range_bounds(expression) for _, expression in partitions) if bounds]
+        statements = []
+        for offset in range(self.months_ahead + 1):
+            start, end = month_start(now, offset), month_start(now, offset + 1)
+            # e.g. the partition of the pre-partitioning rows covers the month the migration ran in
+            if not any(start < upper and end > lower for lower, upper in ranges):
+                statements.append(f"CREATE TABLE IF NOT EXISTS {partition_name(start)} PARTITION OF {PARENT_TABLE} "
+                                  f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+        return statements
+
+    def _retention_statements(self, now: datetime, partitions: List[Tuple[str, str]]) -> List[str]:
+        if self.retention_months <= 0:
+            return []
+        cutoff = month_start(now, -self.retention_months)
+        statements = []
+        for name, bound_expression in partitions:
+            bounds = range_bounds(bound_expression)
+            if bounds is None or bounds[1] > cutoff:
+                continue
+            statements.append(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}")
+            if self.drop_expired:
+                statements.append(f"DROP TABLE {name}")
+            logger.info(f"Request log partition {name} expired, {'dropping' if self.drop_expired else 'detaching'}")
+        return statements
+
+    async def _run_periodically(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Request log partition maintenance failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def shutdown(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+request_log_partition_manager = RequestLogPartitionManager(
+    months_ahead=loaded_config.request_log_partitions_ahead,
+    retention_months=loaded_config.request_log_retention_months,
+    drop_expired=loaded_config.request_log_drop_expired_partitions,
+    interval=loaded_config.request_log_partition_maintenance_interval
+)
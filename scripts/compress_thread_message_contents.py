@@ -0,0 +1,184 @@
+"""
+Thread Message Content Compression
+
+Maintenance commands for the zstd compressed ``thread_message.content`` values, see
+threads/content_compression.py:
+
+    train       trains a dictionary on a sample of large contents and stores it
+    backfill    compresses the existing large contents, resumable with --after-id
+    decompress  restores every compressed content to plain text, e.g. before a downgrade
+    benchmark   compares write and read throughput and size of plain, zstd and zstd with dictionary
+
+The backfill only uses a dictionary once it is older than --min-dictionary-age, the
+same rule the application applies, so every worker can decode the rows it writes.
+Each batch is a short transaction that locks its rows, concurrent edits are not lost.
+
+Usage:
+    python scripts/compress_thread_message_contents.py train --db-url postgresql://localhost:5432/catalyst
+    python scripts/compress_thread_message_contents.py backfill --batch-size 500 --pause 0.05
+    python scripts/compress_thread_message_contents.py benchmark --samples 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import zlib
+
+import asyncpg
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.content_codec import ENCODED_PREFIX, ContentCodec, train_dictionary  # noqa: E402
+
+LARGE_CONTENTS_QUERY = """
+    SELECT content FROM thread_message TABLESAMPLE SYSTEM ($1)
+    WHERE octet_length(content) >= $2 AND left(content, $3) <> $4
+    LIMIT $5
+"""
+
+
+async def load_codec(connection, threshold: int, level: int, min_dictionary_age: float) -> ContentCodec:
+    codec = ContentCodec(threshold=threshold, level=level)
+    rows = await connection.fetch("""
+        SELECT id, dictionary, created_at <= now() - make_interval(secs => $1) AS usable
+        FROM content_compression_dictionary ORDER BY id
+    """, min_dictionary_age)
+    for row in rows:
+        codec.add_dictionary(row["id"], row["dictionary"])
+        if row["usable"]:
+            codec.encoding_dictionary_id = row["id"]
+    return codec
+
+
+async def sample_contents(connection, threshold: int, samples: int):
+    # Sample a growing share of the table until there are enough large contents
+    contents = []
+    for percent in (1, 10, 100):
+        contents = [row["content"] for row in await connection.fetch(
+            LARGE_CONTENTS_QUERY, percent, threshold, len(ENCODED_PREFIX), ENCODED_PREFIX, samples)]
+        if len(contents) >= samples:
+            break
+    return contents
+
+
+async def train(connection, args):
+    contents = await sample_contents(connection, args.threshold, args.samples)
+    if len(contents) < 10:
+        raise SystemExit(f"Only {len(contents)} contents of at least {args.threshold} bytes, too few to train on")
+    dictionary = train_dictionary(contents, args.dictionary_size)
+    dictionary_id = await connection.fetchval(
+        "INSERT INTO content_compression_dictionary (dictionary, sample_count) VALUES ($1, $2) RETURNING id",
+        dictionary, len(contents))
+    print(f"Stored dictionary {dictionary_id} ({len(dictionary)} bytes) trained on {len(contents)} contents. "
+          f"It is used for writes after {args.min_dictionary_age:.0f} seconds.")
+
+
+async def rewrite(connection, args, transform, selection: str):
+    """Apply ``transform`` to the contents matched by ``selection`` in id order, one batch per transaction."""
+    last_id, rewritten, saved, started = args.after_id, 0, 0, time.monotonic()
+    while True:
+        async with connection.transaction():
+            rows = await connection.fetch(f"""
+                SELECT id, thread_uuid, content FROM thread_message
+                WHERE id > $1 AND {selection}
+                ORDER BY id LIMIT $2 FOR UPDATE
+            """, last_id, args.batch_size)
+            if not rows:
+                break
+            updates = [(row["id"], row["thread_uuid"], transform(row["content"])) for row in rows]
+            updates = [(row, update) for row, update in zip(rows, updates) if update[2] != row["content"]]
+            # thread_uuid lets each update prune to its hash partition
+            await connection.executemany("UPDATE thread_message SET content = $3 WHERE id = $1 AND thread_uuid = $2",
+                                         [update for _, update in updates])
+        last_id = rows[-1]["id"]
+        rewritten += len(updates)
+        saved += sum(len(row["content"]) - len(update[2]) for row, update in updates)
+        print(f"up to id {last_id}: {rewritten} contents rewritten, {saved / 2 ** 20:.1f} MB saved "
+              f"({rewritten / (time.monotonic() - started):.0f} rows/s)")
+        if args.pause:
+            await asyncio.sleep(args.pause)
+
+
+async def backfill(connection, args):
+    codec = await load_codec(connection, args.threshold, args.level, args.min_dictionary_age)
+    print(f"Compressing with dictionary {codec.encoding_dictionary_id or 'none'}")
+    await rewrite(connection, args, codec.encode,
+                  f"octet_length(content) >= {int(args.threshold)} AND left(content, {len(ENCODED_PREFIX)}) <> "
+                  f"'{ENCODED_PREFIX}'")
+
+
+async def decompress(connection, args):
+    codec = await load_codec(connection, args.threshold, args.level, args.min_dictionary_age)
+    await rewrite(connection, args, codec.decode, f"left(content, {len(ENCODED_PREFIX)}) = '{ENCODED_PREFIX}'")
+
+
+def measure(name: str, contents, encode, decode):
+    started = time.perf_counter()
+    encoded = [encode(content) for content in contents]
+    encode_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    for value in encoded:
+        decode(value)
+    decode_seconds = time.perf_counter() - started
+    plain_mb = sum(len(content.encode("utf-8")) for content in contents) / 2 ** 20
+    stored_mb = sum(len(value) for value in encoded) / 2 ** 20
+    print(f"{name:>22}: ratio {plain_mb / stored_mb:5.2f}  write {plain_mb / encode_seconds:8.1f} MB/s  "
+          f"read {plain_mb / decode_seconds:8.1f} MB/s")
+
+
+async def benchmark(connection, args):
+    contents = await sample_contents(connection, args.threshold, args.samples)
+    if len(contents) < 20:
+        raise SystemExit(f"Only {len(contents)} contents of at least {args.threshold} bytes, too few to benchmark")
+    # Train on one half and measure on the other, like a dictionary meeting new contents
+    training, contents = contents[::2], contents[1::2]
+    plain = ContentCodec(threshold=args.threshold, level=args.level)
+    with_dictionary = ContentCodec(threshold=args.threshold, level=args.level)
+    with_dictionary.add_dictionary(1, train_dictionary(training, args.dictionary_size))
+    with_dictionary.encoding_dictionary_id = 1
+
+    print(f"{len(contents)} contents of at least {args.threshold} bytes, zstd level {args.level}")
+    measure("pglz-like (zlib 1)", contents, lambda content: zlib.compress(content.encode("utf-8"), 1),
+            lambda value: zlib.decompress(value).decode("utf-8"))
+    measure("zstd", contents, plain.encode, plain.decode)
+    measure("zstd with dictionary", contents, with_dictionary.encode, with_dictionary.decode)
+
+
+COMMANDS = {"train": train, "backfill": backfill, "decompress": decompress, "benchmark": benchmark}
+
+
+async def run(db_url: str, args):
+    connection = await asyncpg.connect(db_url)
+    try:
+        await COMMANDS[args.command](connection, args)
+    finally:
+        await connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compress large thread message contents with zstd")
+    parser.add_argument("command", choices=COMMANDS)
+    parser.add_argument("--db-url", default=os.getenv("DB_URL"), help="Postgres URL, defaults to $DB_URL")
+    parser.add_argument("--threshold", type=int, default=8192, help="Contents of at least this many bytes are "
+                                                                     "compressed, match message_compression_threshold")
+    parser.add_argument("--level", type=int, default=3, help="zstd level, match message_compression_level")
+    parser.add_argument("--min-dictionary-age", type=float, default=900,
+                        help="Seconds before a dictionary is used, match message_compression_min_dictionary_age")
+    parser.add_argument("--samples", type=int, default=5000, help="Contents sampled to train or benchmark on")
+    parser.add_argument("--dictionary-size", type=int, default=112_640, help="Size of a trained dictionary in bytes")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows rewritten per transaction")
+    parser.add_argument("--after-id", type=int, default=0, help="Resume after this message id")
+    parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+    if not args.db_url:
+        raise SystemExit("Pass --db-url or set DB_URL")
+
+    db_url = args.db_url.replace("postgresql+asyncpg://", "postgresql://")
+    asyncio.run(run(db_url, args))
+
+
+if __name__ == "__main__":
+    main()
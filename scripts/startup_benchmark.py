@@ -0,0 +1,90 @@
+"""
+Worker Startup Benchmark
+
+Measures how long it takes to import and build the FastAPI application and how much
+resident memory the worker holds afterwards, using ``python -X importtime`` in a fresh
+interpreter. Optionally fails when a budget is exceeded or when a module that should be
+imported lazily is loaded at startup, so CI can catch import-time regressions.
+
+Usage:
+    python scripts/startup_benchmark.py
+    python scripts/startup_benchmark.py --budget-ms 4000 --budget-rss-mb 400 --forbid torch langchain
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+from app.application import get_app
+get_app()
+elapsed_ms = (time.perf_counter() - started) * 1000
+# ru_maxrss is reported in kilobytes on Linux
+rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print("STARTUP_BENCHMARK " + json.dumps({"elapsed_ms": elapsed_ms, "rss_mb": rss_mb, "modules": sorted(sys.modules)}))
+"""
+
+
+def parse_importtime(stderr: str):
+    """Return (module, self_us, cumulative_us) for every top-level import in the importtime log."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Nested imports are indented by two extra spaces per level under the module that triggered them
+        if len(name) - len(name.lstrip()) == 1:
+            imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return imports
+
+
+def run_probe():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    marker = next((line for line in result.stdout.splitlines() if line.startswith("STARTUP_BENCHMARK ")), None)
+    if result.returncode != 0 or marker is None:
+        print(result.stdout)
+        print(result.stderr[-5000:], file=sys.stderr)
+        raise SystemExit("Application import failed")
+    return json.loads(marker[len("STARTUP_BENCHMARK "):]), parse_importtime(result.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker import time and memory")
+    parser.add_argument("--budget-ms", type=float, help="Fail if importing and building the app takes longer")
+    parser.add_argument("--budget-rss-mb", type=float, help="Fail if resident memory after startup is higher")
+    parser.add_argument("--forbid", nargs="*", default=[], help="Top-level modules that must not be imported")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to report")
+    args = parser.parse_args()
+
+    stats, imports = run_probe()
+    print(f"Startup: {stats['elapsed_ms']:.0f} ms, max RSS: {stats['rss_mb']:.0f} MB")
+    print("Slowest top-level imports (cumulative):")
+    for name, _, cumulative_us in sorted(imports, key=lambda item: item[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+
+    failures = []
+    if args.budget_ms and stats["elapsed_ms"] > args.budget_ms:
+        failures.append(f"startup took {stats['elapsed_ms']:.0f} ms, budget is {args.budget_ms:.0f} ms")
+    if args.budget_rss_mb and stats["rss_mb"] > args.budget_rss_mb:
+        failures.append(f"RSS is {stats['rss_mb']:.0f} MB, budget is {args.budget_rss_mb:.0f} MB")
+    loaded = {module.split(".")[0] for module in stats["modules"]}
+    for module in args.forbid:
+        if module in loaded:
+            failures.append(f"{module} is imported at startup, it should be imported lazily")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
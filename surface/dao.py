@@ -4,6 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from surface.models import UserPreference
 from utils.dao import BaseDao
+from utils.dao_cache import cache_aside, invalidates
+
+USER_TAGS_CACHE_NAMESPACE = "user_tags"
 
 
 class UserPreferenceDao(BaseDao):
@@ -12,12 +15,14 @@ class UserPreferenceDao(BaseDao):
         super().__init__(session=session, db_model=UserPreference)
 
     # @db_query_latency()
+    @cache_aside(USER_TAGS_CACHE_NAMESPACE, UserPreference, key=lambda self, user_email: user_email, cache_none=True)
     async def get_user_tags(self, user_email: str):
         query = select(UserPreference).where(UserPreference.user_email == user_email)
         result = await self._execute_query(query)
         return result.unique().scalar()
 
     # @db_query_latency()
+    @invalidates(USER_TAGS_CACHE_NAMESPACE, key=lambda self, user_email, tags: user_email)
     async def update_tags(self, user_email: str, tags: list):
         insert_query = insert(UserPreference).values(
             user_email=user_email,
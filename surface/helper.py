@@ -4,7 +4,6 @@ from uuid import UUID
 
 import anthropic
 import openai
-from bs4 import BeautifulSoup
 from chat_threads.threads.dao import ThreadDao
 
 from config.settings import loaded_config
@@ -41,7 +40,8 @@ class SurfaceHelper:
         if references.get('thread', []):
             thread_meta = references.get('thread', [])
             surface_request.data = await append_thread_data(thread_meta,
-                                                            surface_request.data)
+                                                            surface_request.data,
+                                                            query=references.get("query", ""))
 
         last_content = references.get("query", '')
         command = references.get('commands', [])
@@ -51,8 +51,12 @@ class SurfaceHelper:
                 command = [{"command": "@web"}]
 
         html_query = references.get("questionDOM", '').replace("&nbsp;", " ")
-        soup = BeautifulSoup(html_query, 'html.parser')
-        highlighted_words = [span.text.strip() for span in soup.find_all('span', class_='selected-command')]
+        highlighted_words = []
+        if html_query:
+            # Imported lazily, it is only needed when the question carries its DOM
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(html_query, 'html.parser')
+            highlighted_words = [span.text.strip() for span in soup.find_all('span', class_='selected-command')]
 
         for word in highlighted_words:
             last_content = last_content.replace(word, ' ')
@@ -27,6 +27,7 @@ from utils.connection_handler import ConnectionHandler, execute_db_operation, ex
 from utils.exceptions import SurfaceRequestException
 from utils.stream_handler import StreamConfig, StreamHandlerFactory
 from utils.stream_strategy import StreamStrategyType
+from utils.unit_of_work import checkpoint
 
 
 class SurfaceService:
@@ -48,6 +49,9 @@ class SurfaceService:
                                                                                        agent.llm.config.slug)
         last_message = copy.deepcopy(surface_request.data["messages"][-1])
 
+        # Do not hold database connections while the model generates
+        await checkpoint()
+
         # Handle the request
         response = await agent.handle(
             surface_request.data,
@@ -112,6 +116,8 @@ class SurfaceService:
                     {"last_message_id": self.last_thread_message_id},
                     raise_exc=True
                 )
+                # The thread id is only handed to the client once the message is committed
+                await checkpoint()
                 yield handler.format_output(str(self.thread_id), msg_type=MessageType.THREAD_UUID)
                 yield handler.format_output(str(self.last_thread_message_id), msg_type=MessageType.LAST_USER_MESSAGE_ID)
                 yield handler.format_output(
@@ -154,6 +160,8 @@ class SurfaceService:
             else:
                 await process_result
 
+            # Do not hold database connections while the model streams
+            await checkpoint()
             yield handler.format_output("", msg_type=MessageType.STREAM_START)
 
             execution_count = 1
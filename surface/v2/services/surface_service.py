@@ -22,6 +22,7 @@ from utils.base_view import BaseView
 from utils.connection_handler import execute_db_operation, ConnectionHandler
 from utils.stream_handler import StreamConfig, StreamHandlerFactory
 from utils.stream_strategy import StreamStrategyType
+from utils.unit_of_work import checkpoint
 
 
 class SurfaceServiceV2:
@@ -49,6 +50,8 @@ class SurfaceServiceV2:
             last_message = surface_request.data["messages"][-1]
             if not last_message.get('regenerate', False):
                 await self._create_and_update_thread_message(surface_request, last_message, user_data.orgId)
+                # The thread id is only handed to the client once the message is committed
+                await checkpoint()
                 yield handler.format_output(str(self.thread_id), msg_type=MessageType.THREAD_UUID)
 
             else:
@@ -94,6 +97,8 @@ class SurfaceServiceV2:
             else:
                 await process_result
 
+            # Do not hold database connections while the model streams
+            await checkpoint()
             yield handler.format_output('', msg_type=MessageType.STREAM_START)
 
             execution_count = 1
@@ -185,6 +190,8 @@ class SurfaceServiceV2:
                                                                            agent.llm.config.slug)
             last_message = copy.deepcopy(surface_request.data["messages"][-1])
 
+            # Do not hold database connections while the model generates
+            await checkpoint()
             response = await agent.handle(
                 surface_request.data,
                 api_key=surface_request.metadata.get("api_key", ""),
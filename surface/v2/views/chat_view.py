@@ -14,6 +14,7 @@ from surface.v2.services.surface_service import SurfaceServiceV2
 from surface.views import ChatView as SurfaceChatView
 from utils.base_view import BaseView
 from utils.common import UserDataHandler
+from utils.unit_of_work import stream_with_unit_of_work, unit_of_work
 
 
 class ChatView(BaseView):
@@ -62,11 +63,11 @@ class ChatView(BaseView):
             surface_service = SurfaceServiceV2()
             return StreamingResponse(
                 track_streaming_generator(
-                    surface_service.process_surface_request_stream_v2(
+                    stream_with_unit_of_work(surface_service.process_surface_request_stream_v2(
                         surface_request=surface_request,
                         background_tasks=background_tasks,
                         user_data=user_data
-                    ),
+                    )),
                     endpoint="handle_streaming_chat_request_v2"
                 ),
                 media_type="text/event-stream"
@@ -86,8 +87,9 @@ class ChatView(BaseView):
         try:
             surface_service = SurfaceServiceV2()
 
-            response_data = await surface_service.process_surface_request_v2(surface_request, background_tasks,
-                                                                             user_data)
+            async with unit_of_work():
+                response_data = await surface_service.process_surface_request_v2(surface_request, background_tasks,
+                                                                                 user_data)
 
             return cls.construct_success_response(data=response_data)
         except Exception as e:
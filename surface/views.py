@@ -12,6 +12,7 @@ from surface.serializers import SurfaceRequest
 from surface.services import SurfaceService
 from utils.base_view import BaseView
 from utils.exceptions import ModelFetchException
+from utils.unit_of_work import stream_with_unit_of_work, unit_of_work
 from wrapper.ai_models import ModelRegistry
 
 
@@ -31,11 +32,11 @@ class ChatView(BaseView):
             # Log the surface request asynchronously (non-blocking)
             return StreamingResponse(
                 track_streaming_generator(
-                    surface_service.process_surface_request_stream_v1(
+                    stream_with_unit_of_work(surface_service.process_surface_request_stream_v1(
                         surface_request=surface_request,
                         background_tasks=background_tasks,
                         user_data=user_data
-                    ),
+                    )),
                     endpoint="handle_streaming_chat_request_v1"
                 ),
                 media_type="text/event-stream"
@@ -49,7 +50,8 @@ class ChatView(BaseView):
         try:
             surface_service = SurfaceService()
 
-            response_data = await surface_service.process_surface_request_v2(surface_request=surface_request)
+            async with unit_of_work():
+                response_data = await surface_service.process_surface_request_v2(surface_request=surface_request)
 
             return cls.construct_success_response(data=response_data)
         except Exception as e:
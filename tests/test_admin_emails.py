@@ -0,0 +1,53 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+# The views and utils.common build their clients from the app settings on import
+pytest.importorskip("clerk_integration")
+
+from fastapi import HTTPException  # noqa: E402
+
+from config.settings import loaded_config  # noqa: E402
+from integrations import views as integration_views  # noqa: E402
+from integrations.views import KnowledgeBaseCacheView  # noqa: E402
+from utils.common import UserDataHandler  # noqa: E402
+
+
+@pytest.mark.parametrize("user_email, emails, listed", [
+    ("admin@example.com", "admin@example.com", True),
+    (" Admin@Example.com ", "ops@example.com, admin@example.com", True),
+    ("user@example.com", "admin@example.com", False),
+    ("", "", False),
+    (None, "", False),
+    ("", "admin@example.com,", False),
+    (None, ",admin@example.com", False),
+    ("admin@example.com", None, False),
+])
+def test_is_listed_email(user_email, emails, listed):
+    assert UserDataHandler.is_listed_email(user_email, emails) is listed
+
+
+@pytest.mark.parametrize("admin_emails, email", [("", ""), ("", None), ("admin@example.com,", ""),
+                                                 ("admin@example.com", "user@example.com")])
+def test_kb_cache_invalidation_is_refused_to_non_admins(monkeypatch, admin_emails, email):
+    monkeypatch.setattr(loaded_config, "kb_search_cache_admin_emails", admin_emails)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(KnowledgeBaseCacheView.invalidate(kb_id="kb-1", user_data=SimpleNamespace(email=email)))
+
+    assert error.value.status_code == 403
+
+
+def test_kb_cache_invalidation_by_an_admin(monkeypatch):
+    invalidated = []
+
+    async def invalidate(kb_id):
+        invalidated.append(kb_id)
+
+    monkeypatch.setattr(loaded_config, "kb_search_cache_admin_emails", "admin@example.com")
+    monkeypatch.setattr(integration_views.kb_search_cache, "invalidate", invalidate)
+
+    asyncio.run(KnowledgeBaseCacheView.invalidate(kb_id="kb-1", user_data=SimpleNamespace(email="admin@example.com")))
+
+    assert invalidated == ["kb-1"]
@@ -0,0 +1,61 @@
+import base64
+import os
+
+import pytest
+
+zstandard = pytest.importorskip("zstandard")
+
+from utils.content_codec import ENCODED_PREFIX, ContentCodec, ContentDecodingError, train_dictionary  # noqa: E402
+
+CONTENT = "The deployment pipeline builds the image, runs the tests and pushes the image. " * 20
+
+
+def test_short_contents_stay_plain():
+    codec = ContentCodec(threshold=1024)
+
+    assert codec.encode("short answer") == "short answer"
+    assert codec.encode(None) is None
+    assert codec.decode("short answer") == "short answer"
+
+
+def test_round_trip_without_a_dictionary():
+    codec = ContentCodec(threshold=64)
+    encoded = codec.encode(CONTENT)
+
+    assert encoded.startswith(f"{ENCODED_PREFIX}0:")
+    assert len(encoded) < len(CONTENT)
+    assert codec.encode(encoded) == encoded
+    assert codec.decode(encoded) == CONTENT
+
+
+def test_round_trip_with_a_dictionary():
+    samples = [f"Message {number}: the deployment of service {number} finished in {number * 3} seconds "
+               f"with status ok and no warnings." * 4 for number in range(300)]
+    codec = ContentCodec(threshold=64)
+    codec.add_dictionary(1, train_dictionary(samples, dictionary_size=4096))
+    codec.encoding_dictionary_id = 1
+    encoded = codec.encode(samples[0])
+
+    assert encoded.startswith(f"{ENCODED_PREFIX}1:")
+    assert codec.decode(encoded) == samples[0]
+
+    reader = ContentCodec(threshold=64)
+    with pytest.raises(ContentDecodingError):
+        reader.decode(encoded)
+
+
+def test_incompressible_contents_stay_plain():
+    content = base64.b64encode(os.urandom(1024)).decode("ascii")
+
+    assert ContentCodec(threshold=64).encode(content) == content
+
+
+@pytest.mark.parametrize("content", [f"{ENCODED_PREFIX}x:abc", f"{ENCODED_PREFIX}0:bm90IHpzdGQ="])
+def test_malformed_contents_raise(content):
+    with pytest.raises(ContentDecodingError):
+        ContentCodec(threshold=64).decode(content)
+
+
+def test_dictionary_ids_start_at_one():
+    with pytest.raises(ValueError):
+        ContentCodec(threshold=64).add_dictionary(0, b"")
@@ -0,0 +1,98 @@
+import asyncio
+import enum
+import pickle
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+# utils.dao_cache builds its cache from the app settings on import
+pytest.importorskip("clerk_integration")
+
+from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, Integer, Numeric, String  # noqa: E402
+from sqlalchemy.dialects.postgresql import UUID  # noqa: E402
+from sqlalchemy.orm import declarative_base  # noqa: E402
+
+from utils.dao_cache import DaoCache, dump_columns, load_columns  # noqa: E402
+
+Base = declarative_base()
+
+
+class Plan(enum.Enum):
+    FREE = "free"
+    PRO = "pro"
+
+
+class Account(Base):
+    __tablename__ = "account"
+
+    id = Column(Integer, primary_key=True)
+    uuid = Column(UUID(as_uuid=True))
+    name = Column(String)
+    active = Column(Boolean)
+    plan = Column(Enum(Plan))
+    balance = Column(Numeric)
+    meta = Column(JSON)
+    created_at = Column(DateTime(timezone=True))
+
+
+def make_account(account_id=1):
+    return Account(id=account_id, uuid=uuid.uuid4(), name="acme", active=True, plan=Plan.PRO,
+                   balance=Decimal("12.50"), meta={"tags": ["a"], "nested": {"n": 1}},
+                   created_at=datetime(2024, 5, 1, 10, 30, tzinfo=timezone.utc))
+
+
+def columns(account):
+    return {key: getattr(account, key) for key in ("id", "uuid", "name", "active", "plan", "balance", "meta",
+                                                   "created_at")}
+
+
+def test_rows_round_trip_through_json():
+    account = make_account()
+    payload = dump_columns(Account, account)
+    loaded = load_columns(Account, payload)
+
+    assert payload.startswith(b"{")
+    assert loaded is not account
+    assert columns(loaded) == columns(account)
+    assert isinstance(loaded.uuid, uuid.UUID) and loaded.plan is Plan.PRO
+
+
+def test_lists_and_none_round_trip():
+    accounts = [make_account(1), make_account(2)]
+
+    assert [columns(row) for row in load_columns(Account, dump_columns(Account, accounts))] == \
+        [columns(row) for row in accounts]
+    assert load_columns(Account, dump_columns(Account, None)) is None
+
+
+class FakeRedis:
+    def __init__(self, value):
+        self.value = value
+        self.writes = {}
+
+    async def get(self, key):
+        return self.value
+
+    async def set(self, key, value, ex=None):
+        self.writes[key] = value
+
+
+def test_unreadable_l2_payloads_are_misses():
+    account = make_account()
+    cache = DaoCache(enabled=True, l1_ttl=60, l2_ttl=60, max_entries=10, invalidation_grace=0)
+    cache.register("accounts", Account)
+    cache._redis = FakeRedis(pickle.dumps({"id": 1}))
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return account
+
+    loaded = asyncio.run(cache.get_or_load("accounts", 1, load))
+
+    assert loads == [1]
+    assert columns(loaded) == columns(account)
+    assert list(cache._redis.writes.values()) == [dump_columns(Account, account)]
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+# The cache reads the app settings on import
+pytest.importorskip("clerk_integration")
+
+from integrations import kb_search_cache as kb_search_cache_module  # noqa: E402
+from integrations.kb_search_cache import KnowledgeBaseSearchCache  # noqa: E402
+
+
+class FakeRedis:
+    """The part of a shared Redis the cache uses, expiry left out."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    async def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+
+class BrokenRedis(FakeRedis):
+    async def mget(self, keys):
+        raise ConnectionError("redis is down")
+
+
+def make_cache(redis=None):
+    cache = KnowledgeBaseSearchCache(ttl=60, stale_ttl=60, max_entries=10, max_bytes=10 ** 6)
+    cache._redis = redis
+    return cache
+
+
+class Search:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return [{"id": self.calls}]
+
+
+def search(cache, fetch, kb_ids=("kb-1", "kb-2"), user_id="user"):
+    return asyncio.run(cache.get_or_fetch("Query", list(kb_ids), "team", user_id, "org", fetch))
+
+
+def test_results_are_cached_per_user():
+    cache, fetch = make_cache(), Search()
+
+    assert search(cache, fetch) == search(cache, fetch) == [{"id": 1}]
+    assert search(cache, fetch, user_id="other") == [{"id": 2}]
+    assert fetch.calls == 2
+
+
+def test_invalidation_in_process():
+    cache, fetch = make_cache(), Search()
+    search(cache, fetch)
+
+    asyncio.run(cache.invalidate("kb-2"))
+
+    assert search(cache, fetch) == [{"id": 2}]
+    assert search(cache, fetch, kb_ids=("kb-1", "kb-2")) == [{"id": 2}]
+
+
+def test_invalidation_reaches_every_worker_through_redis():
+    redis = FakeRedis()
+    first_worker, second_worker, fetch = make_cache(redis), make_cache(redis), Search()
+    search(first_worker, fetch)
+    search(second_worker, fetch)
+
+    asyncio.run(first_worker.invalidate("kb-1"))
+
+    assert search(second_worker, fetch) == [{"id": 3}]
+    assert search(second_worker, fetch) == [{"id": 3}]
+
+
+def test_results_are_not_served_or_cached_while_redis_is_down():
+    cache, fetch = make_cache(BrokenRedis()), Search()
+
+    assert search(cache, fetch) == [{"id": 1}]
+    assert search(cache, fetch) == [{"id": 2}]
+
+
+def test_generations_expire_once_older_results_have(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(kb_search_cache_module.time, "monotonic", lambda: now[0])
+    cache, fetch = make_cache(), Search()
+    asyncio.run(cache.invalidate("kb-1"))
+    search(cache, fetch)
+
+    now[0] += cache.generation_ttl
+    asyncio.run(cache.invalidate("kb-2"))
+
+    assert list(cache._generations) == ["kb-2"]
+    assert search(cache, fetch) == [{"id": 2}]
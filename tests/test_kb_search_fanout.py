@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("httpx")
+# The search client and the cache read the app settings on import
+pytest.importorskip("clerk_integration")
+
+from integrations.ingestion import SemanticSearch  # noqa: E402
+from integrations.kb_search_cache import KnowledgeBaseSearchCache, SearchResults  # noqa: E402
+
+
+class FakeSemanticSearch(SemanticSearch):
+    def __init__(self, responses):
+        super().__init__(base_url="http://ingestion", http_client=None)
+        self.responses = responses
+
+    async def call_knowledge_base_search(self, query, knowledge_base_id, *args, **kwargs):
+        response = self.responses[knowledge_base_id[0]]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def fanout(responses):
+    return asyncio.run(FakeSemanticSearch(responses).call_knowledge_base_search_fanout(
+        "query", list(responses), team_id="team", user_id="user", org_id="org", per_kb_timeout=1.0))
+
+
+def test_fanout_reports_the_knowledge_bases_left_out():
+    results, skipped = fanout({1: [{"id": "a"}], 2: TimeoutError("slow"), 3: SemanticSearch.DATA_NOT_FOUND})
+
+    assert results == [{"id": "a"}]
+    assert skipped == [2, 3]
+
+
+def test_fanout_of_answering_knowledge_bases_is_complete():
+    results, skipped = fanout({1: [{"id": "a"}], 2: [{"id": "b"}]})
+
+    assert [hit["id"] for hit in results] == ["a", "b"]
+    assert skipped == []
+
+
+def test_fanout_without_any_answer():
+    assert fanout({1: TimeoutError("slow")}) == (SemanticSearch.DATA_NOT_FOUND, [1])
+
+
+def test_partial_results_are_returned_but_not_cached():
+    cache = KnowledgeBaseSearchCache(ttl=60, stale_ttl=60, max_entries=10, max_bytes=10 ** 6)
+    fetched = []
+
+    async def fetch():
+        fetched.append(1)
+        return SearchResults([{"id": "a"}], complete=len(fetched) > 1)
+
+    async def search():
+        return await cache.get_or_fetch("query", [1, 2], "team", "user", "org", fetch)
+
+    assert asyncio.run(search()) == [{"id": "a"}]
+    assert asyncio.run(search()) == [{"id": "a"}]
+    assert asyncio.run(search()) == [{"id": "a"}]
+    assert len(fetched) == 2
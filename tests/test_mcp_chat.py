@@ -0,0 +1,43 @@
+import pytest
+
+# The chat processor reads the app settings and the MCP client on import
+pytest.importorskip("mcp")
+pytest.importorskip("clerk_integration")
+
+from mcp_client.chat import MCPChatProcessor  # noqa: E402
+
+TOOLS = [{"name": "search", "description": "Search the docs", "input_schema": {"type": "object"}}]
+
+
+def make_processor(tools=TOOLS, max_turns=3, token_budget=None, tokens_used=0):
+    processor = MCPChatProcessor(model="model", messages=[], stream=False, client=None, max_turns=max_turns,
+                                 max_tokens=1024, token_budget=token_budget)
+    processor.tools = tools
+    processor.chat_messages = []
+    processor.tokens_used = tokens_used
+    return processor
+
+
+def test_tools_may_be_called_before_the_last_turn():
+    params = make_processor()._anthropic_completion_params(turn=0)
+
+    assert params["tools"] == TOOLS
+    assert "tool_choice" not in params
+
+
+@pytest.mark.parametrize("processor", [make_processor(), make_processor(token_budget=100, tokens_used=100)])
+def test_final_answers_keep_the_tools_but_allow_no_calls(processor):
+    turn = 2 if processor.token_budget is None else 0
+
+    anthropic_params = processor._anthropic_completion_params(turn)
+    openai_params = processor._openai_completion_params(turn)
+
+    assert anthropic_params["tools"] == openai_params["tools"] == TOOLS
+    assert anthropic_params["tool_choice"] == {"type": "none"}
+    assert openai_params["tool_choice"] == "none"
+
+
+def test_calls_without_tools_send_no_tool_params():
+    params = make_processor(tools=[])._anthropic_completion_params(turn=2)
+
+    assert "tools" not in params and "tool_choice" not in params
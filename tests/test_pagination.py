@@ -0,0 +1,24 @@
+import pytest
+
+# utils.exceptions binds the error message to the structlog context
+pytest.importorskip("structlog")
+
+from utils.pagination import InvalidCursorException, decode_cursor, encode_cursor  # noqa: E402
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-05-01T10:00:00+00:00", "0f0c3a52-1d2e-4d4c-9a3b-5b1f7e2a9c10", 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 3) == ["2024-05-01T10:00:00+00:00", "0f0c3a52-1d2e-4d4c-9a3b-5b1f7e2a9c10", 42]
+
+
+def test_cursor_of_any_padding_length_decodes():
+    for value in ("a", "ab", "abc", "abcd"):
+        assert decode_cursor(encode_cursor(value), 1) == [value]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor!", encode_cursor("a", "b"), "e30", ""])
+def test_invalid_cursors_are_rejected(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor, 1)
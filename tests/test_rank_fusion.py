@@ -0,0 +1,40 @@
+from integrations.rank_fusion import reciprocal_rank_fusion, result_identity, result_text
+
+
+def test_hits_ranked_high_in_several_lists_come_first():
+    first = [{"id": 1}, {"id": 2}, {"id": 3}]
+    second = [{"id": 3}, {"id": 4}]
+
+    fused = reciprocal_rank_fusion([first, second])
+
+    assert [hit["id"] for hit in fused] == [3, 1, 2, 4]
+
+
+def test_duplicates_keep_the_first_seen_copy():
+    first = [{"id": 7, "content": "from the first knowledge base"}]
+    second = [{"id": 7, "content": "from the second knowledge base"}]
+
+    assert reciprocal_rank_fusion([first, second]) == first
+
+
+def test_ties_keep_the_order_hits_were_first_seen_in():
+    fused = reciprocal_rank_fusion([[{"id": "a"}], [{"id": "b"}], [{"id": "c"}]])
+
+    assert [hit["id"] for hit in fused] == ["a", "b", "c"]
+
+
+def test_limit_and_empty_input():
+    assert len(reciprocal_rank_fusion([[{"id": n} for n in range(10)]], limit=3)) == 3
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_result_identity_falls_back_to_normalized_content():
+    assert result_identity({"chunk_id": 5, "content": "x"}) == ("chunk_id", "5")
+    assert result_identity({"content": "same  text\n"}) == result_identity({"text": "same text"})
+    assert result_identity({"score": 1}) == result_identity({"score": 1})
+
+
+def test_result_text_reads_the_first_content_field():
+    assert result_text({"page_content": "chunk", "metadata": {}}) == "chunk"
+    assert result_text("plain hit") == "plain hit"
+    assert result_text({"score": 0.5}) is None
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+# utils.read_routing builds its router from the app settings on import
+pytest.importorskip("clerk_integration")
+
+from utils.read_routing import ReadRouter, parse_lsn  # noqa: E402
+
+
+def make_router(monkeypatch, primary_lsn=100):
+    router = ReadRouter(enabled=True, poll_interval=1, pin_ttl=60, max_entries=10)
+
+    async def current_primary_lsn():
+        return primary_lsn
+
+    monkeypatch.setattr(router, "_primary_lsn", current_primary_lsn)
+    return router
+
+
+def test_parse_lsn_orders_wal_positions():
+    assert parse_lsn("0/16B3748") == 0x16B3748
+    assert parse_lsn("16/B374D848") > parse_lsn("15/FFFFFFFF")
+
+
+def test_reads_go_to_the_replica_without_writes(monkeypatch):
+    router = make_router(monkeypatch)
+
+    async def request():
+        router.bind_user("user-1")
+        return await router.use_primary()
+
+    assert asyncio.run(request()) is False
+
+
+def test_writes_pin_the_user_until_the_replica_catches_up(monkeypatch):
+    router = make_router(monkeypatch, primary_lsn=100)
+
+    async def write():
+        router.bind_user("user-1")
+        router.note_write()
+        return await router.use_primary()
+
+    async def read(user_id="user-1"):
+        router.bind_user(user_id)
+        return await router.use_primary()
+
+    router._replica_lsn = 50
+    assert asyncio.run(write()) is True
+    assert asyncio.run(read()) is True
+    assert asyncio.run(read("user-2")) is False
+
+    router._replica_lsn = 100
+    assert asyncio.run(read()) is False
+
+
+def test_unknown_replica_position_keeps_pinned_reads_on_the_primary(monkeypatch):
+    router = make_router(monkeypatch)
+
+    async def write_then_read():
+        router.bind_user("user-1")
+        router.note_write()
+        return await router.use_primary()
+
+    router._replica_lsn = None
+    assert asyncio.run(write_then_read()) is True
+
+
+def test_disabled_router_never_uses_the_primary(monkeypatch):
+    router = make_router(monkeypatch)
+    router.enabled = False
+
+    async def write_then_read():
+        router.bind_user("user-1")
+        router.note_write()
+        return await router.use_primary()
+
+    assert asyncio.run(write_then_read()) is False
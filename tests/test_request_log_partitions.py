@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+# request_logger.partitions builds its manager from the app settings on import
+pytest.importorskip("clerk_integration")
+
+from request_logger.partitions import RequestLogPartitionManager, month_start, range_bounds  # noqa: E402
+
+UTC = timezone.utc
+
+
+def test_range_bounds_parses_postgres_timestamps():
+    bounds = range_bounds("FOR VALUES FROM ('2024-05-01 00:00:00+00') TO ('2024-06-01 02:00:00+02')")
+
+    assert bounds == (datetime(2024, 5, 1, tzinfo=UTC), datetime(2024, 6, 1, tzinfo=UTC))
+
+
+def test_range_bounds_of_unbounded_and_default_partitions():
+    lower, upper = range_bounds("FOR VALUES FROM (MINVALUE) TO ('2024-05-01 00:00:00+00')")
+
+    assert lower == datetime.min.replace(tzinfo=UTC)
+    assert upper == datetime(2024, 5, 1, tzinfo=UTC)
+    assert range_bounds("DEFAULT") is None
+    assert range_bounds(None) is None
+
+
+def test_month_start_wraps_years():
+    moment = datetime(2024, 11, 17, 8, 30, tzinfo=UTC)
+
+    assert month_start(moment) == datetime(2024, 11, 1, tzinfo=UTC)
+    assert month_start(moment, 2) == datetime(2025, 1, 1, tzinfo=UTC)
+    assert month_start(moment, -11) == datetime(2023, 12, 1, tzinfo=UTC)
+
+
+def test_maintenance_creates_missing_months_and_expires_old_ones():
+    manager = RequestLogPartitionManager(months_ahead=1, retention_months=2, drop_expired=True, interval=0)
+    now = datetime(2024, 5, 10, tzinfo=UTC)
+    partitions = [
+        ("request_logger_legacy", "FOR VALUES FROM (MINVALUE) TO ('2024-03-01 00:00:00+00')"),
+        ("request_logger_p202405", "FOR VALUES FROM ('2024-05-01 00:00:00+00') TO ('2024-06-01 00:00:00+00')"),
+    ]
+
+    created = manager._create_statements(now, partitions)
+    expired = manager._retention_statements(now, partitions)
+
+    assert len(created) == 1 and "request_logger_p202406" in created[0]
+    assert expired == ["ALTER TABLE request_logger DETACH PARTITION request_logger_legacy",
+                       "DROP TABLE request_logger_legacy"]
@@ -0,0 +1,49 @@
+from integrations.rerank import LexicalReranker, tokenize
+
+
+def hit(hit_id, content):
+    return {"id": hit_id, "content": content}
+
+
+def test_hits_covering_the_query_terms_move_up():
+    hits = [
+        hit(1, "Release notes for the mobile app"),
+        hit(2, "Rotate the database password with the vault job, the database restarts afterwards"),
+        hit(3, "The database backup runs nightly"),
+    ]
+
+    ranked = LexicalReranker(top_k=3).rerank(hits, "rotate database password")
+
+    assert [item["id"] for item in ranked] == [2, 3, 1]
+
+
+def test_ties_keep_the_service_order():
+    hits = [hit(1, "alpha beta"), hit(2, "gamma delta"), hit(3, "epsilon zeta")]
+
+    assert LexicalReranker(top_k=3).rerank(hits, "unrelated query") == hits
+
+
+def test_near_duplicates_are_dropped():
+    text = "the deployment pipeline builds the image, runs the tests and pushes the image to the registry"
+    hits = [hit(1, text), hit(2, text + " again"), hit(3, "an entirely different chunk about billing invoices")]
+
+    ranked = LexicalReranker(top_k=3, dedup_threshold=0.5).rerank(hits, "deployment pipeline")
+
+    assert [item["id"] for item in ranked] == [1, 3]
+
+
+def test_top_k_limits_the_hits():
+    hits = [hit(n, f"chunk number {n}") for n in range(10)]
+
+    assert len(LexicalReranker(top_k=4).rerank(hits, "chunk")) == 4
+
+
+def test_non_list_results_pass_through():
+    reranker = LexicalReranker(top_k=3)
+
+    assert reranker.rerank("Data not found!", "query") == "Data not found!"
+    assert reranker.rerank([], "query") == []
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Rotate the DB-password!") == ["rotate", "the", "db", "password"]
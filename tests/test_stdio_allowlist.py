@@ -0,0 +1,44 @@
+import pytest
+
+# mcp_configs.stdio_allowlist builds its allowlist from the app settings on import
+pytest.importorskip("clerk_integration")
+
+from mcp_configs.exceptions import MCPStdioLaunchNotAllowedException  # noqa: E402
+from mcp_configs.stdio_allowlist import StdioLaunchAllowlist  # noqa: E402
+
+ALLOWLIST = StdioLaunchAllowlist.parse(
+    "npx -y @modelcontextprotocol/server-github | GITHUB_PERSONAL_ACCESS_TOKEN, GITHUB_HOST; "
+    "docker run -i --rm mcp/fetch"
+)
+
+
+def test_launches_must_start_with_an_entry():
+    assert ALLOWLIST.is_allowed("npx", ["-y", "@modelcontextprotocol/server-github"])
+    assert ALLOWLIST.is_allowed("docker", ["run", "-i", "--rm", "mcp/fetch", "--ignore-robots-txt"])
+    assert not ALLOWLIST.is_allowed("npx", ["-y", "@evil/server-github"])
+    assert not ALLOWLIST.is_allowed("npx", ["-y"])
+    assert not ALLOWLIST.is_allowed("bash", ["-c", "npx -y @modelcontextprotocol/server-github"])
+    assert not ALLOWLIST.is_allowed(None)
+
+
+def test_only_the_env_vars_of_the_matching_entry_are_allowed():
+    args = ["-y", "@modelcontextprotocol/server-github"]
+
+    assert ALLOWLIST.is_allowed("npx", args, {"GITHUB_PERSONAL_ACCESS_TOKEN": "token", "GITHUB_HOST": "ghe"})
+    assert not ALLOWLIST.is_allowed("docker", ["run", "-i", "--rm", "mcp/fetch"], {"GITHUB_HOST": "ghe"})
+
+
+@pytest.mark.parametrize("name", ["npm_config_registry", "NPM_CONFIG_USERCONFIG", "HOME", "PIP_INDEX_URL",
+                                  "UV_INDEX_URL", "LD_PRELOAD", "github_personal_access_token"])
+def test_env_vars_not_named_by_the_entry_are_refused(name):
+    env_vars = {"GITHUB_PERSONAL_ACCESS_TOKEN": "token", name: "https://attacker.example"}
+
+    assert not ALLOWLIST.is_allowed("npx", ["-y", "@modelcontextprotocol/server-github"], env_vars)
+
+
+def test_empty_allowlist_refuses_everything():
+    allowlist = StdioLaunchAllowlist.parse("")
+
+    assert allowlist.entries == []
+    with pytest.raises(MCPStdioLaunchNotAllowedException):
+        allowlist.check("npx", ["-y", "@modelcontextprotocol/server-github"])
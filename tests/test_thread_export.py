@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+import pytest
+
+# threads.export reads the app settings and the chat_threads models on import
+pytest.importorskip("clerk_integration")
+pytest.importorskip("chat_threads")
+
+from fastapi import HTTPException  # noqa: E402
+
+from config.settings import loaded_config  # noqa: E402
+from threads.export import ORG_SCOPE, USER_SCOPE, ExportPosition, ThreadExporter  # noqa: E402
+from utils.pagination import InvalidCursorException  # noqa: E402
+
+
+def user(email, org_id="org-1"):
+    return SimpleNamespace(email=email, orgId=org_id)
+
+
+@pytest.mark.parametrize("admin_emails, user_data", [
+    ("", user("")),
+    ("", user(None)),
+    (",admin@example.com", user("")),
+    ("admin@example.com", user("member@example.com")),
+    ("admin@example.com", user("admin@example.com", org_id=None)),
+])
+def test_org_exports_are_refused_to_non_admins(monkeypatch, admin_emails, user_data):
+    monkeypatch.setattr(loaded_config, "thread_export_org_admin_emails", admin_emails)
+
+    with pytest.raises(HTTPException) as error:
+        ThreadExporter.for_request(ORG_SCOPE, user_data)
+
+    assert error.value.status_code == 403
+
+
+def test_org_export_by_an_admin_and_user_exports(monkeypatch):
+    monkeypatch.setattr(loaded_config, "thread_export_org_admin_emails", "admin@example.com")
+
+    assert ThreadExporter.for_request(ORG_SCOPE, user("Admin@example.com")).scope == ORG_SCOPE
+    assert ThreadExporter.for_request(USER_SCOPE, user("")).scope == USER_SCOPE
+
+
+def test_checkpoints_resume_exports_of_the_same_kind_only():
+    exporter = ThreadExporter(USER_SCOPE, user("member@example.com"), product="chat")
+    checkpoint = exporter.checkpoint(ExportPosition(last_thread_id=42, threads=10, messages=250))
+
+    assert exporter.resume_after(checkpoint) == ExportPosition(42, 10, 250)
+    with pytest.raises(InvalidCursorException):
+        ThreadExporter(ORG_SCOPE, user("member@example.com"), product="chat").resume_after(checkpoint)
+    with pytest.raises(InvalidCursorException):
+        ThreadExporter(USER_SCOPE, user("member@example.com")).resume_after(checkpoint)
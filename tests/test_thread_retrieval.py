@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+# threads.retrieval builds its retriever from the app settings on import
+pytest.importorskip("clerk_integration")
+
+from threads.retrieval import ThreadHistoryRetriever, group_turns  # noqa: E402
+from threads.vector_index import HashingEmbedder  # noqa: E402
+
+
+def turn(question, answer):
+    return [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+
+
+def make_retriever(top_k, index_type="flat"):
+    return ThreadHistoryRetriever(HashingEmbedder(), index_type=index_type, top_k=top_k, cache_ttl=60,
+                                  cache_max_entries=8)
+
+
+THREADS = [{"uuid": "thread-a", "last_message_id": 6}, {"uuid": "thread-b", "last_message_id": 4}]
+THREAD_MESSAGES = [
+    turn("How do I rotate the database password?", "Use the vault rotation job.")
+    + turn("What is the lunch menu today?", "Pasta and salad.")
+    + turn("Which port does the database listen on?", "The database listens on 5432."),
+    turn("Plan the team offsite", "Lisbon in May.")
+    + turn("Back up the database before rotating the password", "Snapshots run nightly.")
+]
+
+
+def test_group_turns_starts_a_turn_at_every_user_message():
+    messages = [{"role": "system", "content": "s"}] + turn("a", "b") + [{"role": "user", "content": "c"}]
+
+    assert [[message["content"] for message in group] for group in group_turns(messages)] == [
+        ["s"], ["a", "b"], ["c"]
+    ]
+
+
+def test_select_keeps_the_best_turns_in_thread_order():
+    messages = asyncio.run(make_retriever(top_k=2).select(THREADS, THREAD_MESSAGES, "rotate the database password"))
+
+    assert [message["content"] for message in messages] == [
+        "How do I rotate the database password?", "Use the vault rotation job.",
+        "Back up the database before rotating the password", "Snapshots run nightly.",
+    ]
+
+
+@pytest.mark.parametrize("top_k, query", [(0, "database password"), (2, ""), (5, "database password")])
+def test_select_keeps_every_turn_when_there_is_nothing_to_drop(top_k, query):
+    messages = asyncio.run(make_retriever(top_k=top_k).select(THREADS, THREAD_MESSAGES, query))
+
+    assert messages == [message for thread in THREAD_MESSAGES for message in thread]
+
+
+def test_select_reuses_the_cached_index_of_a_thread():
+    retriever = make_retriever(top_k=1, index_type="ivf")
+    first = asyncio.run(retriever.select(THREADS, THREAD_MESSAGES, "lunch menu"))
+    second = asyncio.run(retriever.select(THREADS, THREAD_MESSAGES, "lunch menu"))
+
+    assert first == second == turn("What is the lunch menu today?", "Pasta and salad.")
+    assert len(retriever._indexes) == 2
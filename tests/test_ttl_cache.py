@@ -0,0 +1,76 @@
+import pytest
+
+from utils import ttl_cache
+from utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_entries_expire_after_their_ttl(clock):
+    cache = TTLCache(default_ttl=10)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=1)
+
+    clock[0] += 5
+    assert cache.get("default") == 1
+    assert cache.get("short") is None
+    assert "short" not in cache
+
+    clock[0] += 5
+    assert cache.get("default", "missing") == "missing"
+    assert len(cache) == 0
+
+
+def test_non_positive_ttl_is_not_cached(clock):
+    cache = TTLCache()
+    cache.set("key", 1, ttl=0)
+
+    assert "key" not in cache
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+
+
+def test_size_bound_evicts_until_the_entries_fit(clock):
+    cache = TTLCache(max_bytes=10, sizeof=len)
+    cache.set("a", "xxxx")
+    cache.set("b", "yyyy")
+    cache.set("c", "zzzz")
+
+    assert "a" not in cache
+    assert cache.get("b") == "yyyy" and cache.get("c") == "zzzz"
+
+    # A value larger than the whole cache is not stored and evicts nothing
+    cache.set("huge", "x" * 11)
+    assert "huge" not in cache
+    assert len(cache) == 2
+
+
+def test_replacing_and_deleting_keep_the_size_accounting(clock):
+    cache = TTLCache(max_bytes=10, sizeof=len)
+    cache.set("a", "xxxxxxxx")
+    cache.set("a", "xx")
+    cache.set("b", "yyyyyyyy")
+
+    assert cache.get("a") == "xx" and cache.get("b") == "yyyyyyyy"
+
+    cache.delete("a")
+    cache.delete("missing")
+    cache.set("c", "zz")
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
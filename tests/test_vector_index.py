@@ -0,0 +1,98 @@
+import numpy as np
+
+from threads.vector_index import FlatIndex, HashingEmbedder, IVFIndex, build_index
+
+
+def random_unit_vectors(count, dimension, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_hashing_embedder_is_deterministic_and_normalized():
+    embedder = HashingEmbedder(dimension=64)
+    first = embedder.embed(["Deploy the API to staging", "rotate the database password"])
+    second = embedder.embed(["Deploy the API to staging", "rotate the database password"])
+
+    assert first.shape == (2, 64)
+    assert first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert np.allclose(np.linalg.norm(first, axis=1), 1.0)
+
+
+def test_hashing_embedder_ranks_overlapping_texts_closer():
+    embedder = HashingEmbedder()
+    query, related, unrelated = embedder.embed(["database password rotation",
+                                                "how do I rotate the database password",
+                                                "the weather in Lisbon is sunny"])
+
+    assert query @ related > query @ unrelated
+
+
+def test_hashing_embedder_maps_empty_text_to_zero_vector():
+    assert not HashingEmbedder(dimension=16).embed([""]).any()
+
+
+def test_flat_index_returns_best_matches_first():
+    vectors = random_unit_vectors(10, 8)
+    index = FlatIndex(8)
+    index.add(vectors, range(100, 110))
+
+    hits = index.search(vectors[3], k=3)
+
+    assert hits[0][0] == 103
+    assert len(hits) == 3
+    assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+
+def test_flat_index_grows_past_its_initial_capacity():
+    vectors = random_unit_vectors(50, 4)
+    index = FlatIndex(4, initial_capacity=2)
+    for start in range(0, 50, 7):
+        index.add(vectors[start:start + 7], range(start, min(start + 7, 50)))
+
+    assert len(index) == 50
+    for position in (0, 1, 2, 49):
+        assert index.search(vectors[position], k=1)[0][0] == position
+
+
+def test_flat_index_search_edge_cases():
+    index = FlatIndex(4)
+    assert index.search(np.ones(4, dtype=np.float32), k=3) == []
+
+    index.add(random_unit_vectors(2, 4), [0, 1])
+    assert index.search(np.ones(4, dtype=np.float32), k=0) == []
+    assert len(index.search(np.ones(4, dtype=np.float32), k=5)) == 2
+
+
+def test_ivf_index_searches_exhaustively_until_trained():
+    vectors = random_unit_vectors(20, 8)
+    ivf, flat = IVFIndex(8, n_lists=4, train_size=100), FlatIndex(8)
+    ivf.add(vectors, range(20))
+    flat.add(vectors, range(20))
+
+    assert ivf.centroids is None
+    assert len(ivf) == 20
+    assert ivf.search(vectors[5], k=4) == flat.search(vectors[5], k=4)
+
+
+def test_ivf_index_trains_once_train_size_is_reached():
+    vectors = random_unit_vectors(80, 8)
+    index = IVFIndex(8, n_lists=4, n_probe=4, train_size=64)
+    index.add(vectors[:40], range(40))
+    assert index.centroids is None
+
+    index.add(vectors[40:64], range(40, 64))
+    assert index.centroids.shape == (4, 8)
+    assert np.allclose(np.linalg.norm(index.centroids, axis=1), 1.0)
+    assert len(index) == 64
+
+    # Vectors added after training go to the list of their nearest centroid
+    index.add(vectors[64:], range(64, 80))
+    assert len(index) == 80
+    for position in (0, 63, 64, 79):
+        assert index.search(vectors[position], k=1)[0][0] == position
+
+
+def test_build_index_picks_the_index_type():
+    assert isinstance(build_index("ivf", 8), IVFIndex)
+    assert isinstance(build_index("flat", 8), FlatIndex)
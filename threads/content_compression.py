@@ -0,0 +1,121 @@
+import asyncio
+from typing import Optional
+
+from chat_threads.threads.models import ThreadMessage
+from sqlalchemy import event, text
+from sqlalchemy.orm import attributes
+
+from config.logging import logger
+from config.settings import loaded_config
+from threads.search import SEARCH_VECTOR_UPDATE
+from utils.content_codec import ContentCodec
+
+DICTIONARIES_QUERY = text("""
+    SELECT id, CASE WHEN id = ANY(CAST(:loaded AS integer[])) THEN NULL ELSE dictionary END,
+        created_at <= now() - make_interval(secs => :min_age) AS usable
+    FROM content_compression_dictionary
+    ORDER BY id
+""")
+
+
+class ThreadMessageContentCompression:
+    """
+    Store large ``thread_message.content`` values zstd compressed, transparently to the ORM.
+
+    Mapper events encode the content before a message is inserted or updated and
+    decode it when a message is loaded, so the DAOs and everything above them keep
+    working with plain text. Queries that select the column without the model need
+    ``codec.decode``.
+
+    Dictionaries are trained by scripts/compress_thread_message_contents.py and
+    read from ``content_compression_dictionary`` at startup, before any message is
+    loaded, and then every ``refresh_interval`` seconds.
+    A dictionary is only used for encoding once it is ``min_dictionary_age`` seconds
+    old, by when every worker has loaded it and can decode what it produces.
+    """
+
+    def __init__(self, codec: ContentCodec, enabled: bool, refresh_interval: float, min_dictionary_age: float):
+        self.codec = codec
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self.min_dictionary_age = min_dictionary_age
+        self._task: Optional[asyncio.Task] = None
+
+    def install(self, model) -> None:
+        event.listen(model, "before_insert", self._encode)
+        event.listen(model, "before_update", self._encode)
+        event.listen(model, "after_insert", self._restore)
+        event.listen(model, "after_update", self._restore)
+        event.listen(model, "load", self._decode)
+        event.listen(model, "refresh", self._decode)
+
+    def _encode(self, mapper, connection, target) -> None:
+        if not self.enabled or not attributes.get_history(target, "content").has_changes():
+            return
+        plain = target.content
+        encoded = self.codec.encode(plain)
+        if encoded is not plain:
+            target._plain_content = plain
+            target.content = encoded
+
+    @staticmethod
+    def _restore(mapper, connection, target) -> None:
+        plain = target.__dict__.pop("_plain_content", None)
+        if plain is None:
+            return
+        # Callers keep reading the text they wrote, not the encoded value
+        attributes.set_committed_value(target, "content", plain)
+        # The search trigger cannot read compressed contents
+        connection.execute(SEARCH_VECTOR_UPDATE, {"content": plain, "id": target.id, "thread_uuid": target.thread_uuid})
+
+    def _decode(self, target, context, attrs=None) -> None:
+        content = target.__dict__.get("content")
+        if self.codec.is_encoded(content):
+            attributes.set_committed_value(target, "content", self.codec.decode(content))
+
+    async def refresh_dictionaries(self) -> None:
+        async with loaded_config.read_connection_manager.engine.connect() as connection:
+            rows = (await connection.execute(DICTIONARIES_QUERY, {
+                "min_age": self.min_dictionary_age, "loaded": list(self.codec.dictionary_ids)
+            })).all()
+        for dictionary_id, dictionary, usable in rows:
+            if dictionary is not None:
+                self.codec.add_dictionary(dictionary_id, bytes(dictionary))
+                logger.info(f"Loaded message compression dictionary {dictionary_id}")
+            if usable:
+                self.codec.encoding_dictionary_id = dictionary_id
+
+    async def _try_refresh(self) -> None:
+        try:
+            await self.refresh_dictionaries()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Loading message compression dictionaries failed: {e}")
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self._try_refresh()
+
+    async def start(self) -> None:
+        # Decoding needs the dictionaries even when writing compressed contents is disabled, and compressed rows
+        # can only be read once they are loaded
+        if self._task is None:
+            await self._try_refresh()
+            self._task = asyncio.create_task(self._refresh_periodically())
+
+    async def shutdown(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+
+thread_message_content_compression = ThreadMessageContentCompression(
+    codec=ContentCodec(threshold=loaded_config.message_compression_threshold,
+                       level=loaded_config.message_compression_level),
+    enabled=not loaded_config.message_compression_disabled,
+    refresh_interval=loaded_config.message_compression_dictionary_refresh_interval,
+    min_dictionary_age=loaded_config.message_compression_min_dictionary_age
+)
+thread_message_content_compression.install(ThreadMessage)
@@ -0,0 +1,147 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+
+from chat_threads.threads.models import Thread, ThreadMessage
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from threads.search import ENCODED_CONTENT_LIKE, SEARCH_CONFIG, TRIGRAM_PREFIX_CHARS, contains_pattern
+from utils.dao import BaseDao
+
+# Enough for the sidebar, leaves out meta and the other wide columns
+SLIM_THREAD_COLUMNS = (Thread.uuid, Thread.title, Thread.created_at, Thread.updated_at)
+
+# Threads of a user whose title or messages match, best first. Titles weigh double, trigram (substring)
+# matches rank by title similarity. The indexed expressions must stay as in migration 5c8e1f3a7b29.
+SEARCH_THREADS_QUERY = f"""
+    WITH search AS (SELECT websearch_to_tsquery('{SEARCH_CONFIG}', :search) AS query),
+    user_threads AS (
+        SELECT {{columns}} FROM thread
+        WHERE user_email = :user_email AND product = :product AND is_deleted IS NOT TRUE {{org_filter}}
+    ),
+    message_hits AS (
+        SELECT message.thread_uuid, max(ts_rank(message.search_vector, search.query)) AS rank
+        FROM thread_message message, search
+        WHERE message.thread_uuid IN (SELECT uuid FROM user_threads) AND message.is_deleted IS NOT TRUE
+        AND (message.search_vector @@ search.query
+             OR (left(message.content, {TRIGRAM_PREFIX_CHARS}) ILIKE :pattern
+                 AND message.content NOT LIKE {ENCODED_CONTENT_LIKE}))
+        GROUP BY message.thread_uuid
+    ),
+    ranked AS (
+        SELECT user_threads.*, greatest(
+            2 * ts_rank(to_tsvector('{SEARCH_CONFIG}', coalesce(user_threads.title, '')), search.query),
+            similarity(coalesce(user_threads.title, ''), :search),
+            coalesce(message_hits.rank, 0)
+        )::float8 AS rank
+        FROM user_threads CROSS JOIN search
+        LEFT JOIN message_hits ON message_hits.thread_uuid = user_threads.uuid
+        WHERE message_hits.thread_uuid IS NOT NULL
+        OR to_tsvector('{SEARCH_CONFIG}', coalesce(user_threads.title, '')) @@ search.query
+        OR user_threads.title ILIKE :pattern
+    )
+    SELECT * FROM ranked {{after_filter}} ORDER BY rank DESC, uuid DESC LIMIT :limit
+"""
+
+
+class ThreadListDao(BaseDao):
+    """Keyset paginated thread listing, served by ix_thread_user_email_product_updated_at_uuid."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session=session, db_model=Thread)
+
+    async def get_threads_after(self, user_email: str, product: str, limit: int,
+                                after: Optional[Tuple[datetime, UUID]] = None, org_id: Optional[str] = None,
+                                slim: bool = False) -> List[dict]:
+        """
+        Threads most recently updated first, starting after the (updated_at, uuid) key ``after``.
+
+        Returns up to ``limit + 1`` rows as dicts, the extra row tells the caller that
+        there is a next page.
+        """
+        columns = SLIM_THREAD_COLUMNS if slim else tuple(Thread.__table__.columns)
+        query = (
+            select(*columns)
+            .where(Thread.user_email == user_email, Thread.product == product, Thread.is_deleted.isnot(True))
+            .order_by(Thread.updated_at.desc(), Thread.uuid.desc())
+            .limit(limit + 1)
+        )
+        if org_id:
+            query = query.where(Thread.org_id == org_id)
+        if after:
+            query = query.where(tuple_(Thread.updated_at, Thread.uuid) < tuple_(*after))
+        result = await self._execute_query(query)
+        return [dict(row) for row in result.mappings().all()]
+
+    async def search_threads_after(self, user_email: str, product: str, search: str, limit: int,
+                                   after: Optional[Tuple[float, UUID]] = None, org_id: Optional[str] = None,
+                                   slim: bool = False) -> List[dict]:
+        """
+        Threads whose title or messages match ``search``, by descending rank, starting after the (rank, uuid) key
+        ``after``.
+
+        Like ``get_threads_after`` it returns up to ``limit + 1`` rows, each with its ``rank``.
+        """
+        query = SEARCH_THREADS_QUERY.format(
+            columns=", ".join(column.name for column in SLIM_THREAD_COLUMNS) if slim else "*",
+            org_filter="AND org_id = :org_id" if org_id else "",
+            after_filter="WHERE (rank, uuid) < (:after_rank, :after_uuid)" if after else ""
+        )
+        params = {"search": search, "pattern": contains_pattern(search), "user_email": user_email,
+                  "product": product, "limit": limit + 1}
+        if org_id:
+            params["org_id"] = org_id
+        if after:
+            params["after_rank"], params["after_uuid"] = after
+        result = await self._execute_query(text(query).bindparams(**params))
+        return [dict(row) for row in result.mappings().all()]
+
+    async def get_threads_by_id(self, limit: int, after_id: int = 0, user_email: Optional[str] = None,
+                                org_id: Optional[str] = None, product: Optional[str] = None) -> List[Thread]:
+        """Threads of a user or of an organization in id order, a stable order for exports."""
+        query = select(Thread).where(Thread.id > after_id, Thread.is_deleted.isnot(True))
+        if user_email:
+            query = query.where(Thread.user_email == user_email)
+        if org_id:
+            query = query.where(Thread.org_id == org_id)
+        if product:
+            query = query.where(Thread.product == product)
+        result = await self._execute_query(query.order_by(Thread.id).limit(limit))
+        return result.scalars().all()
+
+
+class ThreadMessageListDao(BaseDao):
+    """Messages of a thread in id order, served by ix_thread_message_thread_uuid_id."""
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session=session, db_model=ThreadMessage)
+
+    @staticmethod
+    def _messages_query(thread_uuid: UUID, after_id: Optional[int] = None):
+        query = (
+            select(ThreadMessage)
+            .where(ThreadMessage.thread_uuid == thread_uuid, ThreadMessage.is_deleted.isnot(True))
+            .order_by(ThreadMessage.id)
+        )
+        if after_id:
+            query = query.where(ThreadMessage.id > after_id)
+        return query
+
+    async def get_messages_after(self, thread_uuid: UUID, limit: int, after_id: Optional[int] = None):
+        """Up to ``limit + 1`` messages after ``after_id``, the extra one tells the caller there is a next page."""
+        result = await self._execute_query(self._messages_query(thread_uuid, after_id).limit(limit + 1))
+        return result.scalars().all()
+
+    async def stream_messages(self, thread_uuid: UUID, batch_size: int,
+                              after_id: Optional[int] = None) -> AsyncIterator[ThreadMessage]:
+        """
+        Every message after ``after_id`` through a server-side cursor, ``batch_size`` rows per fetch.
+
+        Loaded messages are only weakly referenced by the session, so memory stays at
+        about one batch however long the thread is.
+        """
+        query = self._messages_query(thread_uuid, after_id).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(query)
+        async for message in result:
+            yield message
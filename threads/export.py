@@ -0,0 +1,127 @@
+import json
+import zlib
+from typing import AsyncIterator, NamedTuple, Optional
+
+from clerk_integration.utils import UserData
+from fastapi import HTTPException
+
+from config.settings import loaded_config
+from threads.dao import ThreadListDao, ThreadMessageListDao
+from threads.services import serialize_thread_message
+from utils.common import UserDataHandler
+from utils.connection_handler import gandalf_read_connection_handler
+from utils.pagination import InvalidCursorException, decode_cursor, encode_cursor
+
+EXPORT_FORMAT_VERSION = 1
+USER_SCOPE = "user"
+ORG_SCOPE = "org"
+
+
+class ExportPosition(NamedTuple):
+    """Where an export stands: the id of the last thread written and the records written so far."""
+    last_thread_id: int = 0
+    threads: int = 0
+    messages: int = 0
+
+
+def serialize_thread(thread) -> dict:
+    return {
+        "uuid": thread.uuid,
+        "title": thread.title,
+        "product": getattr(thread.product, "value", thread.product),
+        "user_email": thread.user_email,
+        "org_id": thread.org_id,
+        "meta": thread.meta,
+        "last_message_id": thread.last_message_id,
+        "created_at": thread.created_at,
+        "updated_at": thread.updated_at
+    }
+
+
+class ThreadExporter:
+    """
+    Stream every thread of a user or an organization, with its messages, as gzip compressed NDJSON.
+
+    Each line is a record: a ``thread``, followed by its ``message`` lines in id order,
+    a ``checkpoint`` every ``checkpoint_every`` threads and after the last one, and a
+    final ``end``. The gzip stream is flushed at every checkpoint, so a client holds
+    every line up to the last checkpoint it received and can pass that token to resume
+    after a dropped connection. Checkpoints carry the counts so far, so the ``end`` of
+    a resumed export counts every thread and message of the whole export.
+
+    Threads are read in pages ordered by id and messages through a server-side cursor,
+    so memory stays constant. The read transaction ends after every page, which keeps
+    replica snapshots short on long exports.
+    """
+
+    def __init__(self, scope: str, user_data: UserData, product: Optional[str] = None):
+        self.scope = scope
+        self.user_data = user_data
+        self.product = product
+
+    @classmethod
+    def for_request(cls, scope: str, user_data: UserData, product: Optional[str] = None) -> "ThreadExporter":
+        if scope == ORG_SCOPE:
+            if not user_data.orgId or \
+                    not UserDataHandler.is_listed_email(user_data.email, loaded_config.thread_export_org_admin_emails):
+                raise HTTPException(status_code=403, detail="Unauthorized to export the threads of this organization.")
+        return cls(scope, user_data, product)
+
+    def checkpoint(self, position: ExportPosition) -> str:
+        return encode_cursor(EXPORT_FORMAT_VERSION, self.scope, self.product or "", *position)
+
+    def resume_after(self, checkpoint: str) -> ExportPosition:
+        """Position of ``checkpoint``, which must come from an export of the same kind."""
+        version, scope, product, *position = decode_cursor(checkpoint, size=6)
+        if (version, scope, product) != (EXPORT_FORMAT_VERSION, self.scope, self.product or "") or \
+                not all(isinstance(value, int) for value in position):
+            raise InvalidCursorException()
+        return ExportPosition(*position)
+
+    def _owner_filter(self) -> dict:
+        if self.scope == ORG_SCOPE:
+            return {"org_id": self.user_data.orgId}
+        return {"user_email": self.user_data.email}
+
+    async def records(self, after: ExportPosition = ExportPosition()) -> AsyncIterator[dict]:
+        last_thread_id, threads_exported, messages_exported = after
+        checkpointed = True
+        async with gandalf_read_connection_handler() as connection_handler:
+            session = connection_handler.session
+            thread_list_dao = ThreadListDao(session=session)
+            message_list_dao = ThreadMessageListDao(session=session)
+            while True:
+                threads = await thread_list_dao.get_threads_by_id(
+                    limit=loaded_config.thread_export_page_size, after_id=last_thread_id, product=self.product,
+                    **self._owner_filter())
+                for thread in threads:
+                    yield {"type": "thread", "thread": serialize_thread(thread)}
+                    async for message in message_list_dao.stream_messages(
+                            thread.uuid, loaded_config.thread_message_stream_batch_size):
+                        messages_exported += 1
+                        yield {"type": "message", "message": serialize_thread_message(message)}
+                    threads_exported += 1
+                    last_thread_id = thread.id
+                    checkpointed = threads_exported % loaded_config.thread_export_checkpoint_every == 0
+                    if checkpointed:
+                        yield {"type": "checkpoint", "checkpoint": self.checkpoint(
+                            ExportPosition(last_thread_id, threads_exported, messages_exported))}
+                # Ends the read transaction and hands the connection back until the next page
+                await session.rollback()
+                if len(threads) < loaded_config.thread_export_page_size:
+                    break
+        if not checkpointed:
+            yield {"type": "checkpoint", "checkpoint": self.checkpoint(
+                ExportPosition(last_thread_id, threads_exported, messages_exported))}
+        yield {"type": "end", "threads": threads_exported, "messages": messages_exported}
+
+    async def gzip_stream(self, after: ExportPosition = ExportPosition()) -> AsyncIterator[bytes]:
+        # wbits 31 writes a gzip header and trailer, the output is a regular .gz file
+        compressor = zlib.compressobj(level=6, wbits=31)
+        async for record in self.records(after):
+            chunk = compressor.compress(json.dumps(record, default=str).encode("utf-8") + b"\n")
+            if record["type"] == "checkpoint":
+                chunk += compressor.flush(zlib.Z_SYNC_FLUSH)
+            if chunk:
+                yield chunk
+        yield compressor.flush()
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from config.settings import loaded_config
+from threads.vector_index import Embedder, HashingEmbedder, SentenceTransformerEmbedder, build_index
+from utils.ttl_cache import TTLCache
+
+
+def message_text(message: Dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+def group_turns(messages: List[Dict]) -> List[List[Dict]]:
+    """Group messages into turns, each starting at a user message and holding the replies to it."""
+    turns: List[List[Dict]] = []
+    for message in messages:
+        if message.get("role") == "user" or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+class ThreadHistoryRetriever:
+    """
+    Select the turns of referenced threads that are most relevant to the current query.
+
+    Each referenced thread is split into turns (a user message and the replies to it)
+    and the turns are embedded into a vector index, cached per thread and last message
+    id. Only the ``top_k`` best matching turns across all referenced threads are kept.
+    They stay in their original order, so roles still alternate in the prompt.
+    """
+
+    def __init__(self, embedder: Embedder, index_type: str, top_k: int, cache_ttl: float, cache_max_entries: int):
+        self.embedder = embedder
+        self.index_type = index_type
+        self.top_k = top_k
+        self._indexes = TTLCache(max_entries=cache_max_entries, default_ttl=cache_ttl)
+
+    async def select(self, threads: List[Dict], thread_messages: List[List[Dict]], query: str) -> List[Dict]:
+        """Return the relevant messages of the threads, in thread order, for prepending to the prompt."""
+        thread_turns = [group_turns(messages) for messages in thread_messages]
+        total_turns = sum(len(turns) for turns in thread_turns)
+        if not query or self.top_k <= 0 or total_turns <= self.top_k:
+            return [message for turns in thread_turns for turn in turns for message in turn]
+
+        # Embedding is CPU bound, keep it off the event loop
+        query_vector = (await asyncio.to_thread(self.embedder.embed, [query]))[0]
+        scored = []
+        for position, (thread, turns) in enumerate(zip(threads, thread_turns)):
+            index = await self._get_index(thread, turns)
+            scored.extend((score, position, turn_id) for turn_id, score in index.search(query_vector, self.top_k))
+
+        selected = sorted(scored, reverse=True)[:self.top_k]
+        keep = sorted((position, turn_id) for _, position, turn_id in selected)
+        return [message for position, turn_id in keep for message in thread_turns[position][turn_id]]
+
+    async def _get_index(self, thread: Dict, turns: List[List[Dict]]):
+        key = (str(thread["uuid"]), thread.get("last_message_id"), len(turns))
+        index = self._indexes.get(key)
+        if index is None:
+            texts = [" ".join(message_text(message) for message in turn) for turn in turns]
+            vectors = await asyncio.to_thread(self.embedder.embed, texts)
+            index = build_index(self.index_type, vectors.shape[1])
+            index.add(vectors, list(range(len(turns))))
+            self._indexes.set(key, index)
+        return index
+
+
+def build_embedder(name: str, model_name: Optional[str] = None) -> Embedder:
+    if name == "sentence-transformer":
+        return SentenceTransformerEmbedder(model_name)
+    return HashingEmbedder()
+
+
+thread_history_retriever = ThreadHistoryRetriever(
+    embedder=build_embedder(loaded_config.thread_reference_embedder, loaded_config.thread_reference_embedding_model),
+    index_type=loaded_config.thread_reference_index_type,
+    top_k=loaded_config.thread_reference_top_k,
+    cache_ttl=loaded_config.thread_reference_index_ttl,
+    cache_max_entries=loaded_config.thread_reference_index_max_entries
+)
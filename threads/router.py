@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 
 from app.routing import CustomRequestRoute
-from threads.views import ThreadView, ThreadMessageView
+from threads.views import ThreadView, ThreadMessageView, ThreadExportView
 
 threads_router_v1 = APIRouter(route_class=CustomRequestRoute, prefix='/threads')
 
@@ -17,6 +17,7 @@ threads_router_v1.add_api_route('/{thread_id}/messages/', methods=['PATCH'],
 threads_router_v1.add_api_route('/thread/{thread_id}/messages/', methods=['GET'],
                                 endpoint=ThreadMessageView.get_v1)
 threads_router_v1.add_api_route('/search', methods=['GET'], endpoint=ThreadMessageView.search_messages_v1)
+threads_router_v1.add_api_route('/export/', methods=['GET'], endpoint=ThreadExportView.get_v1)
 
 threads_router_v2.add_api_route('/', methods=['GET'], endpoint=ThreadView.get_v2)
 threads_router_v2.add_api_route('/thread/{thread_id}/messages/', methods=['GET'],
@@ -0,0 +1,26 @@
+from sqlalchemy import text
+
+from utils.content_codec import ENCODED_PREFIX
+
+# Chat is mostly English prose, stemming lets "deploying" find "deployment"
+SEARCH_CONFIG = "english"
+# Contents are indexed up to here, a tsvector cannot exceed 1 MB and pasted files rarely matter past their start
+MAX_INDEXED_CHARS = 100_000
+# Trigram matching only looks at the start of a message, which keeps its index small
+TRIGRAM_PREFIX_CHARS = 4096
+
+# Compressed contents cannot be indexed by the database trigger, their writer indexes the plain text
+SEARCH_VECTOR_UPDATE = text(f"""
+    UPDATE thread_message SET search_vector = to_tsvector('{SEARCH_CONFIG}', left(:content, {MAX_INDEXED_CHARS}))
+    WHERE id = :id AND thread_uuid = :thread_uuid
+""")
+
+# SQL literal of the LIKE pattern of compressed contents. Inlined rather than bound, so the planner can
+# match it against the predicate of the partial trigram index.
+ENCODED_CONTENT_LIKE = "E'" + ENCODED_PREFIX.replace("\x1f", "\\x1f") + "%'"
+
+
+def contains_pattern(search: str) -> str:
+    """ILIKE pattern matching ``search`` anywhere, with its wildcards escaped."""
+    escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -8,4 +8,9 @@ class ThreadQueryParams(BaseModel):
     product: str = Field(..., description="The product to filter the threads")
     page: int = Field(default=1, ge=1, description="Page number for pagination")
     page_size: int = Field(10, ge=1, le=100, description="Number of items per page")
-    search: Optional[str] = Field(None, description="Search query for thread messages")
+    search: Optional[str] = Field(None, description="Search query for thread titles and messages, ranked with "
+                                                   "cursor pagination")
+    pagination: Literal["page", "cursor"] = Field("page", description="Paginate by page number or by cursor")
+    cursor: Optional[str] = Field(None, description="next_cursor of the previous page, for cursor pagination")
+    fields: Literal["full", "slim"] = Field("full", description="slim returns only uuid, title and timestamps, "
+                                                                "for cursor pagination")
@@ -1,21 +1,35 @@
 import uuid
+from datetime import datetime
+from typing import Optional
 
+from chat_threads.threads.models import Thread
 from chat_threads.threads.services import ThreadService
 from clerk_integration.utils import UserData
 from fastapi import HTTPException
 
+from threads.dao import ThreadListDao, ThreadMessageListDao
+from threads.serializers import ThreadQueryParams
 from utils.connection_handler import ConnectionHandler
+from utils.dao_cache import cache_aside
+from utils.pagination import InvalidCursorException, decode_cursor, encode_cursor
+
+THREAD_CACHE_NAMESPACE = "thread"
 
 
 class ThreadOwnershipService:
     def __init__(self, connection_handler: ConnectionHandler):
         self.thread_service = ThreadService(connection_handler=connection_handler)
 
+    # Ownership only depends on the owner and the deleted flag, thread deletion invalidates it
+    @cache_aside(THREAD_CACHE_NAMESPACE, Thread, key=lambda self, thread_id: str(thread_id))
+    async def get_thread(self, thread_id: uuid.UUID):
+        return await self.thread_service.thread_dao.get_thread_by_id(thread_id)
+
     async def check_ownership(self, thread_id: uuid.UUID, user_data: UserData):
         if not user_data:
             raise HTTPException(status_code=403, detail="Unauthorized access to this thread.")
 
-        thread = await self.thread_service.thread_dao.get_thread_by_id(thread_id)
+        thread = await self.get_thread(thread_id)
 
         if not thread or not self._is_user_authorized(thread, user_data):
             raise HTTPException(status_code=404, detail="Unauthorized access to this thread.")
@@ -25,3 +39,92 @@ class ThreadOwnershipService:
     @staticmethod
     def _is_user_authorized(thread, user_data):
         return thread.user_email == user_data.email
+
+
+class ThreadListService:
+    def __init__(self, connection_handler: ConnectionHandler):
+        self.thread_list_dao = ThreadListDao(session=connection_handler.session)
+
+    async def get_threads_page(self, thread_query_params: ThreadQueryParams, org_id: Optional[str] = None) -> dict:
+        """
+        One page of the user's threads in keyset order, with the cursor of the next page.
+
+        Unlike page numbers, the cost of a page does not grow with its depth, and threads
+        updated while paging shift no rows between pages. With ``search`` the threads
+        matching it are ranked, best first, and each carries its ``rank``.
+        """
+        filters = dict(
+            user_email=thread_query_params.user_email,
+            product=thread_query_params.product,
+            limit=thread_query_params.page_size,
+            org_id=org_id,
+            slim=thread_query_params.fields == "slim"
+        )
+        cursor = thread_query_params.cursor
+        if thread_query_params.search:
+            threads = await self.thread_list_dao.search_threads_after(
+                search=thread_query_params.search, after=self._decode_search_after(cursor) if cursor else None,
+                **filters)
+            sort_key = ("rank", "uuid")
+        else:
+            threads = await self.thread_list_dao.get_threads_after(
+                after=self._decode_after(cursor) if cursor else None, **filters)
+            sort_key = ("updated_at", "uuid")
+
+        next_cursor = None
+        if len(threads) > thread_query_params.page_size:
+            threads = threads[:thread_query_params.page_size]
+            next_cursor = encode_cursor(*(threads[-1][key] for key in sort_key))
+        return {"threads": threads, "next_cursor": next_cursor}
+
+    @staticmethod
+    def _decode_after(cursor: str):
+        updated_at, thread_uuid = decode_cursor(cursor, size=2)
+        try:
+            return datetime.fromisoformat(updated_at), uuid.UUID(thread_uuid)
+        except (TypeError, ValueError):
+            raise InvalidCursorException()
+
+    @staticmethod
+    def _decode_search_after(cursor: str):
+        rank, thread_uuid = decode_cursor(cursor, size=2)
+        try:
+            return float(rank), uuid.UUID(thread_uuid)
+        except (TypeError, ValueError):
+            raise InvalidCursorException()
+
+
+def serialize_thread_message(message) -> dict:
+    return {
+        "id": message.id,
+        "role": getattr(message.role, "value", message.role),
+        "content": message.content,
+        "display_text": message.display_text,
+        "thread_uuid": message.thread_uuid,
+        "parent_message_id": message.parent_message_id,
+        "is_json": message.is_json,
+        "question_config": message.question_config,
+        "is_disliked": message.is_disliked,
+        "prompt_details": message.prompt_details or {},
+        "created_at": message.created_at
+    }
+
+
+class ThreadMessagePageService:
+    def __init__(self, connection_handler: ConnectionHandler):
+        self.thread_message_list_dao = ThreadMessageListDao(session=connection_handler.session)
+
+    async def get_messages_page(self, thread_id: uuid.UUID, limit: int, cursor: Optional[str] = None) -> dict:
+        """One page of the thread's messages in id order, with the cursor of the next page."""
+        after_id = self.decode_after_id(cursor) if cursor else None
+        messages = await self.thread_message_list_dao.get_messages_after(thread_id, limit=limit, after_id=after_id)
+        next_cursor = encode_cursor(messages[limit - 1].id) if len(messages) > limit else None
+        return {"thread_messages": [serialize_thread_message(message) for message in messages[:limit]],
+                "next_cursor": next_cursor}
+
+    @staticmethod
+    def decode_after_id(cursor: str) -> int:
+        after_id, = decode_cursor(cursor, size=1)
+        if not isinstance(after_id, int):
+            raise InvalidCursorException()
+        return after_id
@@ -1,30 +1,57 @@
-from typing import List, Tuple, Optional
+import asyncio
+import json
+from typing import AsyncIterator, Dict, List, Tuple, Optional
 from uuid import UUID
 
+from chat_threads.threads.models import Thread, ThreadMessage
 from chat_threads.threads.services import ThreadService
+from sqlalchemy import select
 
+from config.settings import loaded_config
+
+from threads.dao import ThreadMessageListDao
+from threads.retrieval import thread_history_retriever
+from threads.services import serialize_thread_message
 from utils.base_view import BaseView
-from utils.connection_handler import execute_read_db_operation
+from utils.connection_handler import execute_read_db_operation, gandalf_connection_handler, \
+    gandalf_read_connection_handler
+from utils.read_routing import read_router
 
 
-async def append_thread_data(threads, data):
+async def append_thread_data(threads, data, query: Optional[str] = None):
     """
     Append thread data using a generic database operation.
 
     Args:
         threads (list): A list of thread information dictionaries.
         data (dict): The data structure to which thread messages will be appended.
+        query (str): The current user query, when given only the turns of the threads
+            most relevant to it are appended.
 
     Returns:
         dict: The updated data with appended thread messages.
     """
     try:
-        for thread in threads:
-            thread_id = thread["uuid"]
-            last_message_id = thread["last_message_id"]
-            thread_messages = await get_current_thread_messages(thread_id=thread_id, last_message_id=last_message_id)
-            # Append processed messages to data
-            data["messages"] = thread_messages + data["messages"]
+        # Threads are prepended one after the other, so the last referenced thread comes first.
+        # A thread referenced more than once is only included once.
+        unique_threads = {}
+        for thread in reversed(threads):
+            unique_threads.setdefault(UUID(str(thread["uuid"])), thread)
+        loaded_threads = await load_threads(list(unique_threads))
+
+        threads, thread_messages = [], []
+        for thread_id, thread in unique_threads.items():
+            if thread_id not in loaded_threads:
+                continue
+            messages, thread_row = loaded_threads[thread_id]
+            threads.append(thread)
+            thread_messages.append(
+                build_current_thread_messages(messages, thread_row, thread_id, last_message_id=thread["last_message_id"])
+            )
+
+        # Append processed messages to data
+        relevant_messages = await thread_history_retriever.select(threads, thread_messages, query)
+        data["messages"] = relevant_messages + data["messages"]
 
         return data
     except Exception as e:
@@ -49,9 +76,78 @@ async def append_thread_data_operation(connection_handler, thread_id: UUID) -> T
     return thread_messages, thread
 
 
+async def load_threads_operation(connection_handler, thread_ids: List[UUID]) -> Dict[UUID, Tuple]:
+    """
+    Operation to fetch several threads and all their messages in two queries.
+
+    Args:
+        connection_handler: The connection handler for database access.
+        thread_ids (list): The IDs of the threads to fetch.
+
+    Returns:
+        dict: Thread ID to a tuple of its messages and the thread, for threads that exist and are not deleted.
+    """
+    session = connection_handler.session
+    threads = (await session.execute(
+        select(Thread).where(Thread.uuid.in_(thread_ids), Thread.is_deleted.isnot(True))
+    )).scalars().all()
+    messages = (await session.execute(
+        select(ThreadMessage)
+        .where(ThreadMessage.thread_uuid.in_(thread_ids), ThreadMessage.is_deleted.isnot(True))
+        .order_by(ThreadMessage.id)
+    )).scalars().all()
+
+    loaded = {thread.uuid: ([], thread) for thread in threads}
+    for message in messages:
+        if message.thread_uuid in loaded:
+            loaded[message.thread_uuid][0].append(message)
+    return loaded
+
+
+async def load_threads(thread_ids: List[UUID]) -> Dict[UUID, Tuple]:
+    """Load threads in batches of ids, running a bounded number of batches concurrently."""
+    batch_size = max(loaded_config.thread_reference_batch_size, 1)
+    semaphore = asyncio.Semaphore(max(loaded_config.thread_reference_max_concurrency, 1))
+
+    async def load_batch(batch: List[UUID]) -> Dict[UUID, Tuple]:
+        async with semaphore:
+            # Each batch runs in its own task and therefore gets its own read session
+            return await execute_read_db_operation(load_threads_operation, batch)
+
+    batches = [thread_ids[i:i + batch_size] for i in range(0, len(thread_ids), batch_size)]
+    loaded = {}
+    for result in await asyncio.gather(*(load_batch(batch) for batch in batches)):
+        loaded.update(result)
+    return loaded
+
+
 async def get_current_thread_messages(thread_id: UUID, last_message_id: Optional[int] = None,
                                       last_question_id: Optional[int] = None):
     thread_messages, thread = await execute_read_db_operation(append_thread_data_operation, thread_id)
+    return build_current_thread_messages(thread_messages, thread, thread_id, last_message_id, last_question_id)
+
+
+async def stream_thread_messages(thread_id: UUID, after_id: Optional[int] = None) -> AsyncIterator[bytes]:
+    """
+    The thread's messages as NDJSON, one message per line, read through a server-side cursor.
+
+    The connection is opened by the generator itself, request dependencies are closed
+    before a streamed body is sent. It is held until the client has read the last line.
+    """
+    handler_context = gandalf_connection_handler if await read_router.use_primary() else gandalf_read_connection_handler
+
+    async def lines():
+        async with handler_context() as connection_handler:
+            dao = ThreadMessageListDao(session=connection_handler.session)
+            async for message in dao.stream_messages(thread_id, loaded_config.thread_message_stream_batch_size,
+                                                     after_id=after_id):
+                yield json.dumps(serialize_thread_message(message), default=str).encode("utf-8") + b"\n"
+
+    return lines()
+
+
+def build_current_thread_messages(thread_messages, thread, thread_id: UUID, last_message_id: Optional[int] = None,
+                                  last_question_id: Optional[int] = None):
     if last_question_id:
         latest_message_id = last_question_id
     elif last_message_id:
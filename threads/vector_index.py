@@ -0,0 +1,179 @@
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class Embedder(ABC):
+    """Turns texts into L2-normalized float32 vectors of a fixed dimension."""
+
+    dimension: int
+
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic feature-hashing embedder with no model to load.
+
+    Word unigrams and bigrams are hashed into ``dimension`` signed buckets, so equal
+    texts always produce equal vectors and results are reproducible in tests.
+    """
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_PATTERN.findall(text.lower())
+            features = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = zlib.crc32(feature.encode())
+                vectors[row, digest % self.dimension] += 1.0 if digest & 0x80000000 else -1.0
+        return normalize_rows(vectors)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Embedder backed by a sentence-transformers model, loaded on first use."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            # Imported lazily, loading torch costs seconds and hundreds of MB at startup
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32, copy=False)
+
+
+class FlatIndex:
+    """Exact inner-product index over normalized vectors, grown in place as vectors are added."""
+
+    def __init__(self, dimension: int, initial_capacity: int = 64):
+        self.dimension = dimension
+        self._vectors = np.zeros((initial_capacity, dimension), dtype=np.float32)
+        self._ids = np.zeros(initial_capacity, dtype=np.int64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, vectors: np.ndarray, ids: Sequence[int]) -> None:
+        count = len(vectors)
+        if self._size + count > len(self._vectors):
+            capacity = max(self._size + count, 2 * len(self._vectors))
+            self._vectors = np.resize(self._vectors, (capacity, self.dimension))
+            self._ids = np.resize(self._ids, capacity)
+        self._vectors[self._size:self._size + count] = vectors
+        self._ids[self._size:self._size + count] = ids
+        self._size += count
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if not self._size or k <= 0:
+            return []
+        scores = self._vectors[:self._size] @ query
+        return self._top_k(scores, self._ids[:self._size], k)
+
+    @staticmethod
+    def _top_k(scores: np.ndarray, ids: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        k = min(k, len(scores))
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        best = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in best]
+
+
+class IVFIndex:
+    """
+    Inverted-file index: vectors are bucketed by their nearest k-means centroid.
+
+    Until ``train_size`` vectors have been added it searches exhaustively. It then
+    trains ``n_lists`` centroids on what it holds, and from then on vectors added
+    incrementally go to the list of their nearest centroid. A search scans only the
+    ``n_probe`` lists closest to the query.
+    """
+
+    def __init__(self, dimension: int, n_lists: int = 16, n_probe: int = 4, train_size: int = 1024,
+                 iterations: int = 10, seed: int = 7):
+        self.dimension = dimension
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = None
+        self._flat = FlatIndex(dimension)
+        self._lists: List[FlatIndex] = []
+
+    def __len__(self) -> int:
+        return len(self._flat) if self.centroids is None else sum(len(bucket) for bucket in self._lists)
+
+    def add(self, vectors: np.ndarray, ids: Sequence[int]) -> None:
+        if self.centroids is None:
+            self._flat.add(vectors, ids)
+            if len(self._flat) >= self.train_size:
+                self._train()
+            return
+
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        ids = np.asarray(ids)
+        for bucket in np.unique(assignments):
+            mask = assignments == bucket
+            self._lists[bucket].add(vectors[mask], ids[mask])
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        if self.centroids is None:
+            return self._flat.search(query, k)
+
+        probes = np.argsort(-(self.centroids @ query))[:self.n_probe]
+        hits = [hit for bucket in probes for hit in self._lists[bucket].search(query, k)]
+        return sorted(hits, key=lambda hit: hit[1], reverse=True)[:k]
+
+    def _train(self) -> None:
+        vectors = self._flat._vectors[:len(self._flat)]
+        ids = self._flat._ids[:len(self._flat)]
+        rng = np.random.default_rng(self.seed)
+        centroids = vectors[rng.choice(len(vectors), size=self.n_lists, replace=False)]
+
+        # Spherical k-means, vectors and centroids are compared by inner product
+        for _ in range(self.iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            for bucket in range(self.n_lists):
+                members = vectors[assignments == bucket]
+                if len(members):
+                    centroids[bucket] = members.mean(axis=0)
+            centroids = normalize_rows(centroids)
+
+        self.centroids = centroids
+        self._lists = [FlatIndex(self.dimension) for _ in range(self.n_lists)]
+        self._flat = None
+        self.add(vectors, ids)
+
+
+def build_index(index_type: str, dimension: int):
+    if index_type == "ivf":
+        return IVFIndex(dimension)
+    return FlatIndex(dimension)
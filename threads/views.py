@@ -1,18 +1,22 @@
 import uuid
-from typing import Optional
+from typing import Literal, Optional
 
 from chat_threads.threads.serializers import CreateThreadRequest, CreateMessageRequest
 from chat_threads.threads.services import ThreadService
 from clerk_integration.utils import UserData
-from fastapi import Depends, Path
+from fastapi import Depends, Path, Query
+from starlette.responses import StreamingResponse
 
+from threads.export import ExportPosition, ThreadExporter, USER_SCOPE
 from threads.serializers import ThreadQueryParams
-from threads.services import ThreadOwnershipService
-from threads.utils import get_current_thread_messages
+from threads.services import ThreadListService, ThreadMessagePageService, ThreadOwnershipService, \
+    THREAD_CACHE_NAMESPACE
+from threads.utils import get_current_thread_messages, stream_thread_messages
 from utils.base_view import BaseView
 from utils.common import UserDataHandler
 from utils.connection_handler import ConnectionHandler, get_connection_handler_for_app, \
-    get_read_connection_handler_for_app
+    get_read_connection_handler_for_app, get_routed_read_connection_handler_for_app
+from utils.dao_cache import dao_cache
 
 THREAD_UUID_DESCRIPTION = "Thread UUID for which we are performing action"
 
@@ -21,7 +25,7 @@ THREAD_UUID_DESCRIPTION = "Thread UUID for which we are performing action"
 async def check_thread_ownership(
         thread_id: uuid.UUID = Path(description=THREAD_UUID_DESCRIPTION),
         user_data: UserData = Depends(UserDataHandler.get_user_data_from_request),
-        connection_handler: ConnectionHandler = Depends(get_connection_handler_for_app)
+        connection_handler: ConnectionHandler = Depends(get_routed_read_connection_handler_for_app)
 ):
     ownership_service = ThreadOwnershipService(connection_handler)
     return await ownership_service.check_ownership(thread_id, user_data)
@@ -49,7 +53,7 @@ class ThreadView(BaseView):
         try:
             thread_service = cls._get_thread_service(connection_handler)
             data = await cls._create_thread(thread_service, create_thread_request)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             return cls.construct_success_response(data=data, message=cls.SUCCESS_MESSAGE_THREAD_CREATED)
         except Exception as exp:
             await connection_handler.session.rollback()
@@ -65,7 +69,8 @@ class ThreadView(BaseView):
         try:
             thread_service = cls._get_thread_service(connection_handler)
             await cls._soft_delete_thread(thread_service, thread_id)
-            await connection_handler.session.commit()
+            dao_cache.invalidate_on_commit(connection_handler.session, THREAD_CACHE_NAMESPACE, [str(thread_id)])
+            await connection_handler.session_commit()
             return cls.construct_success_response(data={'thread_uuid': thread_id})
         except Exception as exp:
             await connection_handler.session.rollback()
@@ -80,6 +85,9 @@ class ThreadView(BaseView):
     ):
         UserDataHandler.validate_email_match(user_email=user_data.email, requested_by=thread_query_params.user_email)
         try:
+            if thread_query_params.pagination == "cursor":
+                thread_page = await ThreadListService(connection_handler).get_threads_page(thread_query_params)
+                return cls.construct_success_response(data=thread_page)
             thread_service = cls._get_thread_service(connection_handler)
             chat_threads = await cls._fetch_threads(thread_service, thread_query_params)
             return cls.construct_success_response(data={'threads': chat_threads.get("threads", [])})
@@ -95,6 +103,10 @@ class ThreadView(BaseView):
     ):
         UserDataHandler.validate_email_match(user_email=user_data.email, requested_by=thread_query_params.user_email)
         try:
+            if thread_query_params.pagination == "cursor":
+                thread_page = await ThreadListService(connection_handler).get_threads_page(thread_query_params,
+                                                                                          org_id=user_data.orgId)
+                return cls.construct_success_response(data=thread_page)
             thread_service = cls._get_thread_service(connection_handler)
             chat_threads = await cls._fetch_threads(thread_service, thread_query_params, org_id=user_data.orgId)
             return cls.construct_success_response(data=chat_threads)
@@ -133,6 +145,7 @@ class ThreadView(BaseView):
 class ThreadMessageView(BaseView):
     # V1 API Methods
     ERROR_CODE_GET_THREAD_MESSAGES = 4003
+    DEFAULT_MESSAGE_PAGE_SIZE = 50
 
     # v1 API Methods
     @classmethod
@@ -147,9 +160,9 @@ class ThreadMessageView(BaseView):
         try:
             thread_service = cls._get_thread_service(connection_handler)
             thread_message = await cls._create_thread_message(thread_service, create_message_request)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             await cls._update_thread_last_message(thread_service, create_message_request.thread_id, thread_message.id)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             return cls.construct_success_response(data={'thread_message': thread_message})
         except Exception as exp:
             await connection_handler.session.rollback()
@@ -168,7 +181,7 @@ class ThreadMessageView(BaseView):
         try:
             thread_service = cls._get_thread_service(connection_handler)
             thread_message = await cls._update_thread_message(thread_service, thread_id, update_message_request)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             return cls.construct_success_response(data={'thread_message': thread_message})
         except Exception as exp:
             await connection_handler.session.rollback()
@@ -180,9 +193,20 @@ class ThreadMessageView(BaseView):
             thread_id: uuid.UUID = Path(description=THREAD_UUID_DESCRIPTION),
             thread: object = Depends(check_thread_ownership),
             connection_handler: ConnectionHandler = Depends(get_read_connection_handler_for_app),
-            last_message_id: int = None
+            last_message_id: int = None,
+            limit: Optional[int] = Query(None, ge=1, le=500, description="Return pages of this many messages"),
+            cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+            stream: bool = Query(False, description="Stream every message as NDJSON, one message per line")
     ):
         try:
+            if stream:
+                after_id = ThreadMessagePageService.decode_after_id(cursor) if cursor else None
+                return StreamingResponse(await stream_thread_messages(thread_id, after_id=after_id),
+                                         media_type="application/x-ndjson")
+            if limit or cursor:
+                thread_page = await ThreadMessagePageService(connection_handler).get_messages_page(
+                    thread_id, limit=limit or cls.DEFAULT_MESSAGE_PAGE_SIZE, cursor=cursor)
+                return cls.construct_success_response(data=thread_page)
             if last_message_id:
                 thread_messages = await get_current_thread_messages(thread_id=thread_id,
                                                                     last_message_id=last_message_id)
@@ -283,3 +307,26 @@ class ThreadMessageView(BaseView):
     @staticmethod
     async def _search_thread_by_content(thread_service, query, email, product):
         return await thread_service.search_thread_by_content(query, email, product)
+
+
+class ThreadExportView(BaseView):
+
+    @classmethod
+    async def get_v1(
+            cls,
+            scope: Literal["user", "org"] = Query(USER_SCOPE, description="Export the user's threads or, for "
+                                                                        "organization admins, the organization's"),
+            product: Optional[str] = Query(None, description="Only export threads of this product"),
+            checkpoint: Optional[str] = Query(None, description="Last checkpoint of an interrupted export to resume"),
+            user_data: UserData = Depends(UserDataHandler.get_user_data_from_request)
+    ):
+        exporter = ThreadExporter.for_request(scope, user_data, product=product)
+        try:
+            after = exporter.resume_after(checkpoint) if checkpoint else ExportPosition()
+            return StreamingResponse(
+                exporter.gzip_stream(after),
+                media_type="application/gzip",
+                headers={"Content-Disposition": 'attachment; filename="threads-export.ndjson.gz"'}
+            )
+        except Exception as exp:
+            return cls.construct_error_response(exp)
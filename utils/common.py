@@ -3,6 +3,7 @@ import os
 import traceback
 from datetime import datetime
 from enum import Enum
+from typing import Optional
 from urllib.parse import urlparse
 from uuid import UUID
 
@@ -12,15 +13,15 @@ from clerk_integration.utils import UserData
 from fastapi import HTTPException, status
 from fastapi_prometheus_middleware import get_metrics
 from fastapi_prometheus_middleware.context import token_usage_context
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from sqlalchemy import inspect
 from starlette.requests import Request
-from tiktoken import encoding_for_model
 
 from config.settings import loaded_config
 from utils.base_view import BaseView
 from utils.exceptions import SessionExpiredException
+from utils.read_routing import read_router
 from utils.references_schema import ReferencesSchema
+from utils.tokenizer import count_tokens
 from wrapper.ai_models import ModelRegistry
 
 additional_rules_prompt = "\nAdditional Rules: {additional_rules}\n"
@@ -249,6 +250,8 @@ class MessageTransformer:
 
     @staticmethod
     def langchain_splitter(text):
+        # Imported lazily, langchain adds noticeably to worker start time and memory
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
         splitter = RecursiveCharacterTextSplitter(chunk_size=1600, chunk_overlap=20)
         return splitter.split_text(text)
 
@@ -258,19 +261,13 @@ class TokenCalculator:
     def calculate_tokens(message, model_name):
         """Calculate tokens for a single message."""
         if any(model_type in model_name for model_type in ["openai", "gpt", "o1", "deepseek", "claude", "anthropic"]):
-            try:
-                ENCODING = encoding_for_model(model_name)
-            except KeyError:
-                # Fallback to cl100k_base encoding which is used by most recent models
-                ENCODING = encoding_for_model("gpt-4")
-
             if isinstance(message["content"], str):
-                return len(ENCODING.encode(message["content"]))
+                return count_tokens(message["content"], model_name)
             elif isinstance(message["content"], list):
                 tokens = 0
                 for item in message["content"]:
                     if item["type"] == "text":
-                        tokens += len(ENCODING.encode(item["text"]))
+                        tokens += count_tokens(item["text"], model_name)
                 return tokens
 
         return 0
@@ -381,9 +378,12 @@ class UserDataHandler:
                     updatedAt=current_time,  # Required
                     workspace=[{}]
                 )
+                read_router.bind_user(dummy_user.userId)
                 return dummy_user
             else:
-                return await loaded_config.clerk_auth_helper.get_user_data_from_clerk(request)
+                user_data = await loaded_config.clerk_auth_helper.get_user_data_from_clerk(request)
+                read_router.bind_user(user_data.userId)
+                return user_data
         except UserDataException as e:
             try:
                 user_data: UserData = request.state.user_data
@@ -404,6 +404,13 @@ class UserDataHandler:
         if user_email != requested_by:
             raise HTTPException(status_code=403, detail="Unauthorized access to this resource.")
 
+    @staticmethod
+    def is_listed_email(user_email: Optional[str], emails: str) -> bool:
+        """Whether ``user_email`` is one of the comma separated ``emails``, never when either is empty."""
+        listed = {email.strip().lower() for email in (emails or "").split(",") if email.strip()}
+        user_email = (user_email or "").strip().lower()
+        return bool(user_email) and user_email in listed
+
 
 class SQLAlchemySerializer:
     @staticmethod
@@ -5,23 +5,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from config.settings import loaded_config
 from utils.base_view import BaseView
+from utils.read_routing import read_router
+from utils.unit_of_work import UnitOfWork, current_unit_of_work
 
 
 class ConnectionHandler:
 
-    def __init__(self, connection_manager=None, event_bridge=None):
+    def __init__(self, connection_manager=None, event_bridge=None, scoped=True):
         self._session: Optional[AsyncSession] = None
         self._connection_manager = connection_manager
+        self._scoped = scoped
 
     @property
     def session(self):
         if not self._session:
-            session_factory = self._connection_manager.get_session_factory()
+            session_factory = self._connection_manager.get_session_factory(scoped=self._scoped)
             self._session = session_factory()
         return self._session
 
     async def session_commit(self):
         await self.session.commit()
+        read_router.note_write()
 
     async def close(self):
         if self._session:
@@ -63,6 +67,18 @@ async def get_read_connection_handler_for_app():
         await connection_handler.close()
 
 
+async def get_routed_read_connection_handler_for_app():
+    """Read handler on the replica, or on the primary while the replica lags behind this user's writes."""
+    connection_manager = loaded_config.read_connection_manager
+    if await read_router.use_primary():
+        connection_manager = loaded_config.connection_manager
+    connection_handler = ConnectionHandler(connection_manager=connection_manager)
+    try:
+        yield connection_handler
+    finally:
+        await connection_handler.close()
+
+
 @asynccontextmanager
 async def gandalf_read_connection_handler():
     connection_handler = ConnectionHandler(
@@ -76,10 +92,15 @@ async def gandalf_read_connection_handler():
 
 # @db_query_latency()
 async def execute_db_operation(operation: Callable, *args, **kwargs) -> Any:
+    unit = current_unit_of_work()
+    if unit is not None:
+        return await _execute_in_unit_of_work(unit, operation, *args, **kwargs)
+
     async with gandalf_connection_handler() as connection_handler:
         try:
             result = await operation(connection_handler, *args)
             await connection_handler.session.commit()  # Commit for write operations
+            read_router.note_write()
             return result
         except Exception as e:
             await connection_handler.session.rollback()  # Rollback on error
@@ -90,9 +111,51 @@ async def execute_db_operation(operation: Callable, *args, **kwargs) -> Any:
             return return_value
 
 
+async def _execute_in_unit_of_work(unit: UnitOfWork, operation: Callable, *args, writes: bool = True,
+                                   **kwargs) -> Any:
+    session = unit.write_handler.session
+    # With earlier writes pending, a failure must only undo this operation
+    savepoint = await session.begin_nested() if unit.pending_writes else None
+    try:
+        result = await operation(unit.write_handler, *args)
+        if savepoint is not None and savepoint.is_active:
+            await savepoint.commit()
+        if writes:
+            unit.pending_writes = True
+        return result
+    except Exception as e:
+        if savepoint is not None and savepoint.is_active:
+            await savepoint.rollback()
+        else:
+            await unit.rollback()
+        raise_exc = kwargs.get("raise_exc", True)
+        return_value = kwargs.get("return_value", None)
+        BaseView.construct_error_response(e)
+        if raise_exc: raise
+        return return_value
+
+
 # @db_query_latency()
 async def execute_read_db_operation(operation: Callable, *args, **kwargs) -> Any:
-    async with gandalf_read_connection_handler() as connection_handler:
+    unit = current_unit_of_work()
+    if unit is not None:
+        # Uncommitted writes are only visible to the write transaction
+        if unit.pending_writes or await read_router.use_primary():
+            return await _execute_in_unit_of_work(unit, operation, *args, writes=False, **kwargs)
+        try:
+            return await operation(unit.read_handler, *args)
+        except Exception as e:
+            # An error aborts the read transaction, later reads need a fresh one
+            await unit.release_reads()
+            raise_exc = kwargs.get("raise_exc", True)
+            return_value = kwargs.get("return_value", None)
+            BaseView.construct_error_response(e)
+            if raise_exc: raise
+            return return_value
+
+    # Right after a write of this request or user, the replica may not have it yet
+    handler_context = gandalf_connection_handler if await read_router.use_primary() else gandalf_read_connection_handler
+    async with handler_context() as connection_handler:
         try:
             result = await operation(connection_handler, *args)
             return result
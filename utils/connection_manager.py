@@ -3,25 +3,59 @@ from asyncio import current_task
 from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from utils.db_pool import instrumented_pool_class, register_pool_gauges
+
 
 class ConnectionManager:
 
-    def __init__(self, db_url, db_echo, redis_url=None):
+    def __init__(self, db_url, db_echo, redis_url=None, name="primary", pool_size=10, max_overflow=10,
+                 pool_timeout=10, pool_recycle=1800, statement_timeout_ms=None, prepared_statement_cache_size=100):
         self.db_url = db_url
         self.db_echo = db_echo
+        self.name = name
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.statement_timeout_ms = statement_timeout_ms
+        self.prepared_statement_cache_size = prepared_statement_cache_size
 
         self._db_engine, self._db_session_factory = self._setup_db()
 
-    def get_session_factory(self):
-        return self._db_session_factory
+    def get_session_factory(self, scoped=True):
+        """Sessions shared by everything in the current task, or with ``scoped=False`` a new session per call."""
+        if scoped:
+            return self._db_session_factory
+        return self._db_session_factory.session_factory
+
+    @property
+    def engine(self):
+        return self._db_engine
+
+    def _connect_args(self):
+        server_settings = {"application_name": f"catalyst-{self.name}"}
+        if self.statement_timeout_ms:
+            server_settings["statement_timeout"] = str(self.statement_timeout_ms)
+        return {
+            # SQLAlchemy's own per-connection cache of asyncpg prepared statements
+            "prepared_statement_cache_size": self.prepared_statement_cache_size,
+            # asyncpg's own statement cache follows the above, so setting it to 0 disables both as pgbouncer requires
+            "statement_cache_size": self.prepared_statement_cache_size,
+            "server_settings": server_settings,
+        }
 
     def _setup_db(self):
         engine = create_async_engine(str(self.db_url),
                                      echo=self.db_echo,
-                                     pool_size=10,  # Set the maximum number of connections in the pool
-                                     max_overflow=10,  # Allow up to 10 additional connections beyond the pool size
-                                     pool_timeout=10,  # Maximum number of seconds to wait for a connection
+                                     poolclass=instrumented_pool_class(self.name),
+                                     pool_size=self.pool_size,
+                                     max_overflow=self.max_overflow,
+                                     pool_timeout=self.pool_timeout,
+                                     pool_recycle=self.pool_recycle,  # Reopen connections before the server drops them
+                                     pool_pre_ping=True,  # Replace connections that died while idle in the pool
+                                     connect_args=self._connect_args(),
                                      )
+        register_pool_gauges(engine, self.name)
         session_factory = async_scoped_session(
             sessionmaker(
                 engine,
@@ -0,0 +1,89 @@
+import base64
+from typing import Dict, Iterable, Optional
+
+import zstandard
+
+# Encoded values look like "<prefix><dictionary id, 0 for none>:<base64 zstd frame>". The prefix starts with a
+# control character that chat text does not contain, so plain contents are never mistaken for encoded ones.
+ENCODED_PREFIX = "\x1fzstd:"
+DEFAULT_DICTIONARY_SIZE = 112_640
+
+
+class ContentDecodingError(ValueError):
+    pass
+
+
+def train_dictionary(samples: Iterable[str], dictionary_size: int = DEFAULT_DICTIONARY_SIZE) -> bytes:
+    """Train a zstd dictionary on sample contents, e.g. large message contents of the same kind."""
+    return zstandard.train_dictionary(dictionary_size, [sample.encode("utf-8") for sample in samples]).as_bytes()
+
+
+class ContentCodec:
+    """
+    Compress large text values with zstd so they can stay in a text column.
+
+    Values shorter than ``threshold`` bytes are stored as is. Longer values are
+    compressed, with the encoding dictionary when one is set, and base64 encoded
+    behind ``ENCODED_PREFIX``. A value that does not get smaller is kept plain.
+    Dictionaries are identified by their id, which is part of every encoded value,
+    so a value can be decoded as long as its dictionary is registered.
+    """
+
+    def __init__(self, threshold: int, level: int = 3):
+        self.threshold = threshold
+        self.level = level
+        self.encoding_dictionary_id: Optional[int] = None
+        self._dictionaries: Dict[int, zstandard.ZstdCompressionDict] = {}
+        self._compressors: Dict[int, zstandard.ZstdCompressor] = {}
+        self._decompressors: Dict[int, zstandard.ZstdDecompressor] = {}
+
+    @property
+    def dictionary_ids(self):
+        return set(self._dictionaries)
+
+    def add_dictionary(self, dictionary_id: int, data: bytes) -> None:
+        if dictionary_id <= 0:
+            raise ValueError("Dictionary ids start at 1, 0 means no dictionary")
+        self._dictionaries[dictionary_id] = zstandard.ZstdCompressionDict(data)
+
+    def _compressor(self, dictionary_id: int) -> zstandard.ZstdCompressor:
+        if dictionary_id not in self._compressors:
+            self._compressors[dictionary_id] = zstandard.ZstdCompressor(
+                level=self.level, dict_data=self._dictionaries.get(dictionary_id))
+        return self._compressors[dictionary_id]
+
+    def _decompressor(self, dictionary_id: int) -> zstandard.ZstdDecompressor:
+        if dictionary_id not in self._decompressors:
+            self._decompressors[dictionary_id] = zstandard.ZstdDecompressor(
+                dict_data=self._dictionaries.get(dictionary_id))
+        return self._decompressors[dictionary_id]
+
+    @staticmethod
+    def is_encoded(content) -> bool:
+        return isinstance(content, str) and content.startswith(ENCODED_PREFIX)
+
+    def encode(self, content: Optional[str]) -> Optional[str]:
+        if content is None or self.is_encoded(content):
+            return content
+        raw = content.encode("utf-8")
+        if len(raw) < self.threshold:
+            return content
+        dictionary_id = self.encoding_dictionary_id or 0
+        frame = self._compressor(dictionary_id).compress(raw)
+        encoded = f"{ENCODED_PREFIX}{dictionary_id}:{base64.b64encode(frame).decode('ascii')}"
+        # e.g. contents that are compressed data already
+        return encoded if len(encoded) < len(raw) else content
+
+    def decode(self, content: Optional[str]) -> Optional[str]:
+        if not self.is_encoded(content):
+            return content
+        header, _, payload = content[len(ENCODED_PREFIX):].partition(":")
+        if not header.isdigit():
+            raise ContentDecodingError("Encoded content has no dictionary id")
+        dictionary_id = int(header)
+        if dictionary_id and dictionary_id not in self._dictionaries:
+            raise ContentDecodingError(f"Compression dictionary {dictionary_id} is not loaded")
+        try:
+            return self._decompressor(dictionary_id).decompress(base64.b64decode(payload)).decode("utf-8")
+        except (zstandard.ZstdError, ValueError) as e:
+            raise ContentDecodingError(f"Encoded content is corrupt: {e}") from e
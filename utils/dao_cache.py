@@ -0,0 +1,331 @@
+import asyncio
+import enum
+import functools
+import hashlib
+import inspect
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import attributes
+
+from config.logging import logger
+from config.settings import loaded_config
+from utils.ttl_cache import TTLCache
+
+REDIS_KEY_PREFIX = "catalyst:dao"
+
+
+@functools.lru_cache(maxsize=None)
+def model_fingerprint(model) -> str:
+    """Short hash of the mapped columns of ``model``, it changes with any column change."""
+    columns = sorted(f"{column.key}:{column.type!r}" for column in sa_inspect(model).columns)
+    return hashlib.sha1(",".join(columns).encode("utf-8")).hexdigest()[:12]
+
+
+def to_columns(model, value):
+    """Plain column dicts of a ``model`` row or list of rows, other values as they are."""
+    if isinstance(value, model):
+        return {column.key: getattr(value, column.key) for column in sa_inspect(model).column_attrs}
+    if isinstance(value, (list, tuple)):
+        return [to_columns(model, item) for item in value]
+    return value
+
+
+def from_columns(model, value):
+    """Rebuild the rows ``to_columns`` flattened, as objects not attached to any session."""
+    if isinstance(value, dict):
+        row = sa_inspect(model).class_manager.new_instance()
+        for key, column_value in value.items():
+            attributes.set_committed_value(row, key, column_value)
+        return row
+    if isinstance(value, list):
+        return [from_columns(model, item) for item in value]
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def column_python_types(model) -> Dict[str, Optional[type]]:
+    """Python type of every mapped column of ``model``, None where the column type does not tell."""
+    python_types = {}
+    for column_attr in sa_inspect(model).column_attrs:
+        try:
+            python_types[column_attr.key] = column_attr.columns[0].type.python_type
+        except NotImplementedError:
+            python_types[column_attr.key] = None
+    return python_types
+
+
+def _dump_value(value):
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _load_value(python_type: Optional[type], value):
+    if value is None or python_type is None:
+        return value
+    if issubclass(python_type, enum.Enum):
+        return python_type[value]
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    if python_type in (UUID, Decimal):
+        return python_type(value)
+    return value
+
+
+def dump_columns(model, value) -> bytes:
+    """JSON payload of ``to_columns(model, value)``, with UUIDs, timestamps, decimals and enums as strings."""
+    value = to_columns(model, value)
+    if isinstance(value, dict):
+        value = {key: _dump_value(column_value) for key, column_value in value.items()}
+    elif isinstance(value, list):
+        value = [{key: _dump_value(column_value) for key, column_value in row.items()} for row in value]
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def load_columns(model, payload: bytes):
+    """
+    Rows of a ``dump_columns`` payload, converting values back by the type of their column.
+
+    Payloads may come from a shared Redis, so they are plain JSON and only ever turned
+    into the column types of ``model``, never into arbitrary objects.
+    """
+    python_types = column_python_types(model)
+
+    def load_row(row: dict) -> dict:
+        return {key: _load_value(python_types[key], column_value) for key, column_value in row.items()}
+
+    value = json.loads(payload)
+    if isinstance(value, dict):
+        value = load_row(value)
+    elif isinstance(value, list):
+        value = [load_row(row) for row in value]
+    return from_columns(model, value)
+
+
+class DaoCache:
+    """
+    Two-level cache-aside store for DAO point lookups.
+
+    Rows are flattened to their column values and serialized to JSON once when loaded.
+    The in-process L1 and the optional Redis L2 hold the same bytes, and every hit
+    builds fresh objects from them, so a cached ORM row is never shared between
+    sessions or requests. Redis keys carry a fingerprint of the model's columns, so
+    after a schema change workers only read back rows cached with the same columns.
+    L2 payloads that do not decode into those columns are treated as misses.
+
+    Concurrent misses for the same key share one database load (single-flight).
+    Invalidation drops the key from both levels right away and again when the writing
+    session commits. For ``invalidation_grace`` seconds after that, loaded values are
+    returned but not stored, so a lagging replica cannot put the old row back.
+    Redis errors are logged and the cache falls back to L1 and the database.
+    """
+
+    def __init__(self, enabled: bool, l1_ttl: float, l2_ttl: float, max_entries: int, invalidation_grace: float,
+                 redis_url: Optional[str] = None):
+        self.enabled = enabled
+        self.l1_ttl = l1_ttl
+        self.l2_ttl = l2_ttl
+        self.redis_url = redis_url
+        self._l1 = TTLCache(max_entries=max_entries, default_ttl=l1_ttl)
+        self._recently_invalidated = TTLCache(max_entries=max_entries, default_ttl=invalidation_grace)
+        self._generations: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._models: Dict[str, Any] = {}
+        self._redis = None
+
+    def register(self, namespace: str, model) -> None:
+        """Declare the model whose rows are cached in ``namespace``."""
+        self._models[namespace] = model
+
+    @staticmethod
+    def _key(namespace: str, key: Hashable) -> str:
+        return f"{namespace}:{key}"
+
+    def _redis_key(self, cache_key: str) -> str:
+        namespace = cache_key.split(":", 1)[0]
+        return f"{REDIS_KEY_PREFIX}:{model_fingerprint(self._models[namespace])}:{cache_key}"
+
+    def _loads(self, namespace: str, payload: bytes):
+        return load_columns(self._models[namespace], payload)
+
+    @property
+    def redis(self):
+        if self._redis is None and self.redis_url:
+            # Imported lazily, most workers run without an L2
+            import redis.asyncio as redis
+            self._redis = redis.from_url(self.redis_url)
+        return self._redis
+
+    async def get_or_load(self, namespace: str, key: Hashable, load: Callable[[], Awaitable[Any]],
+                          cache_none: bool = False) -> Any:
+        cache_key = self._key(namespace, key)
+        payload = self._l1.get(cache_key)
+        if payload is not None:
+            return self._loads(namespace, payload)
+
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            return self._loads(namespace, await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            value, payload = await self._load(namespace, cache_key, load, cache_none)
+            future.set_result(payload)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved, there may be no follower to do it
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def _load(self, namespace: str, cache_key: str, load: Callable[[], Awaitable[Any]], cache_none: bool):
+        recently_invalidated = cache_key in self._recently_invalidated
+        payload = None if recently_invalidated else await self._l2_get(cache_key)
+        if payload is not None:
+            try:
+                value = self._loads(namespace, payload)
+            except (ValueError, TypeError, KeyError, AttributeError) as e:
+                logger.warning(f"DAO cache L2 value for {cache_key} is unreadable: {e}")
+            else:
+                self._l1.set(cache_key, payload)
+                return value, payload
+
+        generation = self._generations.get(cache_key, 0)
+        value = await load()
+        payload = dump_columns(self._models[namespace], value)
+        storable = value is not None or cache_none
+        # Skip storing when the key was invalidated before or while loading, the replica may still lag
+        if storable and not recently_invalidated and generation == self._generations.get(cache_key, 0):
+            self._l1.set(cache_key, payload)
+            await self._l2_set(cache_key, payload)
+        return value, payload
+
+    def invalidate(self, namespace: str, keys: Iterable[Hashable]) -> None:
+        cache_keys = [self._key(namespace, key) for key in keys]
+        for cache_key in cache_keys:
+            self._generations[cache_key] = self._generations.get(cache_key, 0) + 1
+            self._recently_invalidated.set(cache_key, True)
+            self._l1.delete(cache_key)
+        if cache_keys and self.redis is not None:
+            asyncio.get_running_loop().create_task(self._l2_delete(cache_keys))
+
+    def invalidate_on_commit(self, session, namespace: str, keys: Iterable[Hashable]) -> None:
+        """Invalidate now and once more when the session commits, after which readers see the write."""
+        keys = [key for key in keys if key is not None]
+        if not keys:
+            return
+        self.invalidate(namespace, keys)
+        sync_session = getattr(session, "sync_session", session)
+        event.listen(sync_session, "after_commit", lambda _: self.invalidate(namespace, keys), once=True)
+
+    async def _l2_get(self, cache_key: str) -> Optional[bytes]:
+        if self.redis is None:
+            return None
+        try:
+            return await self.redis.get(self._redis_key(cache_key))
+        except Exception as e:
+            logger.warning(f"DAO cache L2 read failed for {cache_key}: {e}")
+            return None
+
+    async def _l2_set(self, cache_key: str, payload: bytes) -> None:
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(self._redis_key(cache_key), payload, ex=int(self.l2_ttl))
+        except Exception as e:
+            logger.warning(f"DAO cache L2 write failed for {cache_key}: {e}")
+
+    async def _l2_delete(self, cache_keys) -> None:
+        try:
+            await self.redis.delete(*(self._redis_key(cache_key) for cache_key in cache_keys))
+        except Exception as e:
+            logger.warning(f"DAO cache L2 invalidation failed for {cache_keys}: {e}")
+
+    async def close(self) -> None:
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
+def _as_keys(keys) -> list:
+    if keys is None:
+        return []
+    if isinstance(keys, (list, tuple, set)):
+        return list(keys)
+    return [keys]
+
+
+def cache_aside(namespace: str, model, key: Callable[..., Hashable], cache_none: bool = False):
+    """
+    Cache the result of an async DAO method in ``dao_cache``.
+
+    The method returns a ``model`` row, a list of them or ``None``. ``key`` is called
+    with the arguments of the method, ``self`` included, and returns the cache key
+    within ``namespace``. ``None`` results are only cached with ``cache_none``, for
+    lookups whose rows are created through an ``invalidates`` method.
+    """
+    dao_cache.register(namespace, model)
+
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            if not dao_cache.enabled:
+                return await method(*args, **kwargs)
+            return await dao_cache.get_or_load(namespace, key(*args, **kwargs), lambda: method(*args, **kwargs),
+                                               cache_none=cache_none)
+        return wrapper
+    return decorator
+
+
+def invalidates(namespace: str, key: Callable[..., Any]):
+    """
+    Invalidate ``namespace`` keys when a DAO write method runs and when its session commits.
+
+    ``key`` is called with the arguments of the method, ``self`` included, before the
+    method runs. It returns a key or a list of keys, or an awaitable of those for async
+    methods, e.g. to look up the owner of a row that is about to be deleted.
+    """
+    def decorator(method):
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(self, *args, **kwargs):
+                if not dao_cache.enabled:
+                    return await method(self, *args, **kwargs)
+                keys = key(self, *args, **kwargs)
+                if inspect.isawaitable(keys):
+                    keys = await keys
+                result = await method(self, *args, **kwargs)
+                dao_cache.invalidate_on_commit(self.session, namespace, _as_keys(keys))
+                return result
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            result = method(self, *args, **kwargs)
+            if dao_cache.enabled:
+                dao_cache.invalidate_on_commit(self.session, namespace, _as_keys(key(self, *args, **kwargs)))
+            return result
+        return wrapper
+    return decorator
+
+
+dao_cache = DaoCache(
+    enabled=not loaded_config.dao_cache_disabled,
+    l1_ttl=loaded_config.dao_cache_l1_ttl,
+    l2_ttl=loaded_config.dao_cache_l2_ttl,
+    max_entries=loaded_config.dao_cache_max_entries,
+    invalidation_grace=loaded_config.dao_cache_invalidation_grace,
+    redis_url=loaded_config.dao_cache_redis_url
+)
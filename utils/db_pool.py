@@ -0,0 +1,43 @@
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+POOL_SIZE = Gauge("catalyst_db_pool_size", "Configured connection pool size", ["engine"])
+POOL_CHECKED_OUT = Gauge("catalyst_db_pool_checked_out", "Connections currently checked out of the pool", ["engine"])
+POOL_OVERFLOW = Gauge("catalyst_db_pool_overflow", "Connections open beyond the pool size", ["engine"])
+POOL_CHECKOUT_SECONDS = Histogram(
+    "catalyst_db_pool_checkout_seconds", "Time spent waiting for a pooled connection", ["engine"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+POOL_TIMEOUTS = Counter("catalyst_db_pool_timeouts_total", "Checkouts that timed out waiting for a connection",
+                        ["engine"])
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout wait time and timeouts per engine."""
+
+    engine_name = "default"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.labels(self.engine_name).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.labels(self.engine_name).observe(time.perf_counter() - started)
+
+
+def instrumented_pool_class(engine_name: str):
+    # A subclass per engine keeps the label when SQLAlchemy recreates the pool on dispose
+    return type(f"InstrumentedQueuePool_{engine_name}", (InstrumentedQueuePool,), {"engine_name": engine_name})
+
+
+def register_pool_gauges(engine, engine_name: str) -> None:
+    """Report pool occupancy of the engine; read on scrape so the pool can be recreated."""
+    POOL_SIZE.labels(engine_name).set_function(lambda: engine.sync_engine.pool.size())
+    POOL_CHECKED_OUT.labels(engine_name).set_function(lambda: engine.sync_engine.pool.checkedout())
+    POOL_OVERFLOW.labels(engine_name).set_function(lambda: max(engine.sync_engine.pool.overflow(), 0))
@@ -1,5 +1,12 @@
 from config.settings import loaded_config
+from integrations.http_client import ingestion_http_client
+from integrations.kb_search_cache import kb_search_cache
+from mcp_client.stdio_pool import stdio_server_pool
+from request_logger.partitions import request_log_partition_manager
+from threads.content_compression import thread_message_content_compression
 from utils.connection_manager import ConnectionManager
+from utils.dao_cache import dao_cache
+from utils.read_routing import read_router
 from wrapper.ai_models import initialize_models
 
 
@@ -13,17 +20,43 @@ async def run_on_startup():
 async def run_on_exit():
     await loaded_config.connection_manager.close_connections()
     await loaded_config.read_connection_manager.close_connections()
+    await read_router.shutdown()
+    await request_log_partition_manager.shutdown()
+    await thread_message_content_compression.shutdown()
+    await stdio_server_pool.shutdown()
+    await ingestion_http_client.close()
+    await kb_search_cache.close()
+    await dao_cache.close()
 
 
 async def init_connections():
     connection_manager = ConnectionManager(
         db_url=loaded_config.db_url,
-        db_echo=loaded_config.db_echo
+        db_echo=loaded_config.db_echo,
+        name="primary",
+        pool_size=loaded_config.db_pool_size,
+        max_overflow=loaded_config.db_max_overflow,
+        pool_timeout=loaded_config.db_pool_timeout,
+        pool_recycle=loaded_config.db_pool_recycle,
+        statement_timeout_ms=loaded_config.db_statement_timeout_ms,
+        prepared_statement_cache_size=loaded_config.db_prepared_statement_cache_size
     )
     read_connection_manager = ConnectionManager(
         db_url=loaded_config.read_db_url,
-        db_echo=loaded_config.db_echo
+        db_echo=loaded_config.db_echo,
+        name="replica",
+        pool_size=loaded_config.read_db_pool_size,
+        max_overflow=loaded_config.read_db_max_overflow,
+        pool_timeout=loaded_config.read_db_pool_timeout,
+        pool_recycle=loaded_config.read_db_pool_recycle,
+        statement_timeout_ms=loaded_config.read_db_statement_timeout_ms,
+        prepared_statement_cache_size=loaded_config.read_db_prepared_statement_cache_size
     )
     loaded_config.connection_manager = connection_manager
     loaded_config.read_connection_manager = read_connection_manager
     await initialize_models()
+    read_router.start()
+    request_log_partition_manager.start()
+    await thread_message_content_compression.start()
+    stdio_server_pool.start()
+    ingestion_http_client.start()
@@ -0,0 +1,31 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from utils.exceptions import InvalidInputException
+
+
+class InvalidCursorException(InvalidInputException):
+    DEFAULT_MESSAGE = "The pagination cursor is invalid, request the first page again."
+
+
+def _as_string(value: Any) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque cursor holding the sort key of the last row of a page, e.g. a timestamp and a UUID."""
+    payload = json.dumps([value if isinstance(value, (int, float)) else _as_string(value) for value in values])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """Values of a cursor made by ``encode_cursor``, as ints or strings for the caller to convert."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidCursorException()
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursorException()
+    return values
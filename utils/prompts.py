@@ -40,11 +40,18 @@ $summaries
 ~~~~~~~~~~~~~~~~~
 """)
 
+workspace_search_system_prompt = """
+You are a coding assistant integrated with VSCode.
+Answer the user's question using the knowledge base context in their message. The context is a list of numbered
+snippets, each headed by its source. Refer to snippets by their number when you rely on them, and say so when the
+context does not contain the answer.
+"""
+
 workspace_search_prompt = Template("""
-You are a coding assistant integrated with VSCode, . 
 **Question:** $query
 
-**Context:** $files
+**Context:**
+$files
 """)
 
 workspace_query_generator_prompt = Template("""
@@ -0,0 +1,145 @@
+import asyncio
+import math
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import text
+
+from config.logging import logger
+from config.settings import loaded_config
+from utils.ttl_cache import TTLCache
+
+PRIMARY_LSN_QUERY = text("SELECT pg_current_wal_lsn()::text")
+# NULL when the "replica" is not in recovery, i.e. it is a primary itself
+REPLICA_LSN_QUERY = text("SELECT pg_last_wal_replay_lsn()::text")
+
+# A user committed a write whose WAL position has not been looked up yet
+PENDING_LSN = -1
+
+
+def parse_lsn(lsn: str) -> int:
+    """Convert a Postgres LSN such as ``16/B374D848`` into a comparable integer."""
+    high, low = lsn.split("/")
+    return (int(high, 16) << 32) | int(low, 16)
+
+
+class RequestConsistency:
+    __slots__ = ("user_id", "write_lsn", "pending")
+
+    def __init__(self):
+        self.user_id: Optional[str] = None
+        self.write_lsn: Optional[int] = None
+        self.pending = False
+
+
+class ReadRouter:
+    """
+    Route reads to the read replica unless that would hide the caller's own writes.
+
+    A commit on the primary pins the request, and the user for ``pin_ttl`` seconds,
+    to the primary. The WAL position of the write is looked up lazily, on the first
+    read that follows it. A background task polls the replay position of the replica,
+    and once the replica has replayed past the write, reads go back to it.
+
+    Requests are identified by a context variable, users by ``bind_user``, which the
+    user data dependency calls. Routing is off when primary and replica are the same.
+    """
+
+    def __init__(self, enabled: bool, poll_interval: float, pin_ttl: float, max_entries: int):
+        self.enabled = enabled
+        self.poll_interval = poll_interval
+        self._user_writes = TTLCache(max_entries=max_entries, default_ttl=pin_ttl)
+        self._replica_lsn: Optional[float] = None
+        self._context: ContextVar[Optional[RequestConsistency]] = ContextVar("read_consistency", default=None)
+        self._poller: Optional[asyncio.Task] = None
+
+    def _state(self) -> RequestConsistency:
+        state = self._context.get()
+        if state is None:
+            state = RequestConsistency()
+            self._context.set(state)
+        return state
+
+    def bind_user(self, user_id) -> None:
+        """Attach the request to a user, so it sees writes from that user's earlier requests."""
+        if not self.enabled or user_id is None:
+            return
+        state = self._state()
+        state.user_id = str(user_id)
+        lsn = self._user_writes.get(state.user_id)
+        if lsn == PENDING_LSN:
+            state.pending = True
+        elif lsn is not None:
+            state.write_lsn = max(state.write_lsn or 0, lsn)
+
+    def note_write(self) -> None:
+        """Record that the current request committed to the primary."""
+        if not self.enabled:
+            return
+        state = self._state()
+        state.pending = True
+        if state.user_id is not None:
+            self._user_writes.set(state.user_id, PENDING_LSN)
+
+    async def use_primary(self) -> bool:
+        """Whether the next read of the current request has to go to the primary."""
+        if not self.enabled:
+            return False
+        state = self._context.get()
+        if state is None or (state.write_lsn is None and not state.pending):
+            return False
+
+        if state.pending:
+            lsn = await self._primary_lsn()
+            if lsn is None:
+                return True
+            # The current position is at or past the commit, a safe upper bound for it
+            state.write_lsn = max(state.write_lsn or 0, lsn)
+            state.pending = False
+            if state.user_id is not None:
+                self._user_writes.set(state.user_id, state.write_lsn)
+
+        if self._replica_lsn is not None and self._replica_lsn >= state.write_lsn:
+            state.write_lsn = None
+            return False
+        return True
+
+    @staticmethod
+    async def _primary_lsn() -> Optional[int]:
+        try:
+            async with loaded_config.connection_manager.engine.connect() as connection:
+                return parse_lsn(await connection.scalar(PRIMARY_LSN_QUERY))
+        except Exception as e:
+            logger.warning(f"Failed to read the primary WAL position: {e}")
+            return None
+
+    async def _poll_replica(self) -> None:
+        while True:
+            try:
+                async with loaded_config.read_connection_manager.engine.connect() as connection:
+                    lsn = await connection.scalar(REPLICA_LSN_QUERY)
+                self._replica_lsn = parse_lsn(lsn) if lsn else math.inf
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Unknown lag, keep pinned requests on the primary
+                self._replica_lsn = None
+                logger.warning(f"Failed to read the replica replay position: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self.enabled and self._poller is None:
+            self._poller = asyncio.create_task(self._poll_replica())
+
+    async def shutdown(self) -> None:
+        if self._poller:
+            self._poller.cancel()
+            self._poller = None
+
+
+read_router = ReadRouter(
+    enabled=loaded_config.read_your_writes_enabled and loaded_config.read_db_url != loaded_config.db_url,
+    poll_interval=loaded_config.replica_lag_poll_interval,
+    pin_ttl=loaded_config.read_your_writes_pin_ttl,
+    max_entries=loaded_config.read_your_writes_max_users
+)
@@ -0,0 +1,53 @@
+from functools import lru_cache
+
+from tiktoken import encoding_for_model
+
+DEFAULT_ENCODING_MODEL = "gpt-4o"
+
+# Upper bound on characters per token used to avoid encoding text that can never fit
+MAX_CHARS_PER_TOKEN = 10
+
+
+@lru_cache(maxsize=16)
+def get_model_encoding(model_name: str = DEFAULT_ENCODING_MODEL):
+    """Encoding of the model, cached. Every token count of the app goes through here."""
+    try:
+        return encoding_for_model(model_name)
+    except KeyError:
+        # Fallback to cl100k_base encoding which is used by most recent models
+        return encoding_for_model("gpt-4")
+
+
+def count_tokens(text: str, model_name: str = DEFAULT_ENCODING_MODEL) -> int:
+    """Count the tokens of a text for the given model."""
+    if not text:
+        return 0
+    return len(get_model_encoding(model_name).encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str = DEFAULT_ENCODING_MODEL) -> str:
+    """Return the longest prefix of the text that fits in max_tokens."""
+    if max_tokens <= 0 or not text:
+        return ""
+    if len(text) <= max_tokens:
+        # Every token covers at least one character
+        return text
+
+    encoding = get_model_encoding(model_name)
+    tokens = encoding.encode(text[:max_tokens * MAX_CHARS_PER_TOKEN], disallowed_special=())
+    if len(tokens) <= max_tokens and len(text) <= max_tokens * MAX_CHARS_PER_TOKEN:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def fits_in_tokens(text: str, max_tokens: int, model_name: str = DEFAULT_ENCODING_MODEL) -> int:
+    """
+    Return the token count of the text if it fits in max_tokens, otherwise -1.
+
+    Texts longer than MAX_CHARS_PER_TOKEN characters per allowed token are treated as
+    not fitting without being encoded, so checking a multi-megabyte text stays cheap.
+    """
+    if len(text) > max_tokens * MAX_CHARS_PER_TOKEN:
+        return -1
+    tokens = count_tokens(text, model_name)
+    return tokens if tokens <= max_tokens else -1
@@ -0,0 +1,76 @@
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire after a per-entry TTL.
+
+    The cache is bounded by entry count and, when ``max_bytes`` is set, by the summed
+    ``sizeof`` of the cached values. It is not thread-safe and is meant to be used from
+    a single event loop.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None, default_ttl: float = 300.0,
+                 sizeof: Callable[[Any], int] = sys.getsizeof):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sizeof = sizeof
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, _, value = entry
+        if expires_at <= time.monotonic():
+            self.delete(key)
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        size = self.sizeof(value) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            # A single value larger than the whole cache would evict everything else
+            return
+
+        self.delete(key)
+        self._entries[key] = (time.monotonic() + ttl, size, value)
+        self._bytes += size
+        self._evict()
+
+    def delete(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _evict(self) -> None:
+        while self._entries and (
+                len(self._entries) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_MISSING = object()
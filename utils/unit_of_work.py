@@ -0,0 +1,124 @@
+from asyncio import current_task
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from config.settings import loaded_config
+from utils.read_routing import read_router
+
+
+class UnitOfWork:
+    """
+    One write and one read connection handler shared by every database operation of a request.
+
+    ``execute_db_operation`` and ``execute_read_db_operation`` run on these handlers
+    while a unit of work is active, instead of checking out a connection and committing
+    per call. Writes are committed at ``checkpoint`` and when the unit of work ends.
+    A failing write rolls back only its own savepoint when earlier writes are pending.
+
+    A SQLAlchemy session must not be used by two tasks at once, so the unit of work is
+    only handed out to the task that opened it. Tasks spawned from it, for example by
+    ``asyncio.gather``, fall back to their own connection handlers. Its sessions are
+    not the task scoped ones, so closing another handler of the task, such as a view's
+    dependency, cannot close them or drop their pending writes.
+    """
+
+    def __init__(self):
+        self.owner = current_task()
+        self.pending_writes = False
+        self._write_handler = None
+        self._read_handler = None
+
+    @property
+    def write_handler(self):
+        if self._write_handler is None:
+            self._write_handler = self._create_handler(loaded_config.connection_manager)
+        return self._write_handler
+
+    @property
+    def read_handler(self):
+        if self._read_handler is None:
+            self._read_handler = self._create_handler(loaded_config.read_connection_manager)
+        return self._read_handler
+
+    @staticmethod
+    def _create_handler(connection_manager):
+        # Imported here, connection_handler itself looks up the active unit of work
+        from utils.connection_handler import ConnectionHandler
+        return ConnectionHandler(connection_manager=connection_manager, scoped=False)
+
+    async def commit(self) -> None:
+        if self._write_handler is not None and self.pending_writes:
+            await self._write_handler.session.commit()
+            read_router.note_write()
+        self.pending_writes = False
+
+    async def rollback(self) -> None:
+        if self._write_handler is not None:
+            await self._write_handler.session.rollback()
+        self.pending_writes = False
+
+    async def release_reads(self) -> None:
+        # Ending the read transaction returns its connection to the pool
+        if self._read_handler is not None:
+            await self._read_handler.session.rollback()
+
+    async def checkpoint(self) -> None:
+        """Commit pending writes and release both connections, e.g. before a long LLM stream."""
+        await self.commit()
+        await self.release_reads()
+
+    async def close(self) -> None:
+        for handler in (self._write_handler, self._read_handler):
+            if handler is not None:
+                await handler.close()
+
+
+_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar("unit_of_work", default=None)
+
+
+def current_unit_of_work() -> Optional[UnitOfWork]:
+    """Return the unit of work of the running task, if one is active."""
+    unit = _unit_of_work.get()
+    if unit is None or unit.owner is not current_task():
+        return None
+    return unit
+
+
+@asynccontextmanager
+async def unit_of_work():
+    """Run the enclosed database operations in one unit of work, committed on success."""
+    existing = current_unit_of_work()
+    if existing is not None:
+        yield existing
+        return
+
+    unit = UnitOfWork()
+    token = _unit_of_work.set(unit)
+    try:
+        yield unit
+        await unit.commit()
+    except BaseException:
+        await unit.rollback()
+        raise
+    finally:
+        try:
+            _unit_of_work.reset(token)
+        except ValueError:
+            # A stream closed from another context, e.g. on client disconnect
+            _unit_of_work.set(None)
+        await unit.close()
+
+
+async def checkpoint() -> None:
+    """Commit and release the connections of the active unit of work, a no-op without one."""
+    unit = current_unit_of_work()
+    if unit is not None:
+        await unit.checkpoint()
+
+
+async def stream_with_unit_of_work(generator):
+    """Iterate an async generator inside a unit of work opened by the task that streams it."""
+    async with unit_of_work():
+        async for item in generator:
+            yield item
@@ -261,7 +261,9 @@ class UnifiedModel(ModelInterface, BaseMessageProcessor):
             "messages": messages,
             "stream": stream,
             "stream_options": {"include_usage": True} if stream else None,
-            "user_data": user_data
+            "user_data": user_data,
+            "max_turns": loaded_config.mcp_max_turns,
+            "token_budget": loaded_config.mcp_token_budget
         }
 
         # Only add temperature for non-O1 models
@@ -287,7 +289,9 @@ class UnifiedModel(ModelInterface, BaseMessageProcessor):
             "client": self.client,
             "stream": True,
             "max_tokens": self.config.max_tokens,
-            "user_data": user_data
+            "user_data": user_data,
+            "max_turns": loaded_config.mcp_max_turns,
+            "token_budget": loaded_config.mcp_token_budget
         }
         return MCPChatProcessor.create_anthropic_stream(**params)
 
@@ -3,8 +3,11 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from utils.dao import BaseDao
+from utils.dao_cache import cache_aside, invalidates
 from wrapper.models import LLMModelConfig
 
+MODEL_CONFIG_CACHE_NAMESPACE = "llm_model_config"
+
 
 class LLMModelConfigDAO(BaseDao):
     def __init__(self, session: AsyncSession):
@@ -21,6 +24,14 @@ class LLMModelConfigDAO(BaseDao):
         result = await self._execute_query(query)
         return result.scalars().all()
 
+    async def get_slugs(self, config_ids) -> list:
+        if not isinstance(config_ids, list):
+            config_ids = [config_ids]
+        query = select(LLMModelConfig.slug).where(LLMModelConfig.id.in_(config_ids))
+        result = await self._execute_query(query)
+        return result.scalars().all()
+
+    @cache_aside(MODEL_CONFIG_CACHE_NAMESPACE, LLMModelConfig, key=lambda self, model_name: model_name)
     async def get_config_from_model_name(self, model_name: str) -> LLMModelConfig:
         """
         Retrieve a specific configuration by its model name.
@@ -32,6 +43,11 @@ class LLMModelConfigDAO(BaseDao):
         result = await self._execute_query(query)
         return result.scalars().first()
 
+    @invalidates(MODEL_CONFIG_CACHE_NAMESPACE, key=lambda self, pk_values, *args, **kwargs: self.get_slugs(pk_values))
+    async def update_by_pk(self, pk_values, update_values_dict=None, **update_kwargs):
+        return await super().update_by_pk(pk_values, update_values_dict, **update_kwargs)
+
+    @invalidates(MODEL_CONFIG_CACHE_NAMESPACE, key=lambda self, config_id: self.get_slugs(config_id))
     async def delete_config(self, config_id: int):
         """
         Delete a specific configuration by its ID.
@@ -23,7 +23,7 @@ class LLMModelConfigView(BaseView):
         try:
             model_config_service = cls._get_model_config_service(connection_handler)
             data = await model_config_service.create_model_config(config_request=config_request)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             LLMModelConfigValidator.model_validate(data)
             return cls.construct_success_response(data=data, message=cls.SUCCESS_MESSAGE)
         except Exception as exp:
@@ -42,7 +42,7 @@ class LLMModelConfigView(BaseView):
             model_config_service = cls._get_model_config_service(connection_handler)
             update_values = config_request.dict(exclude_unset=True)
             data = await model_config_service.update_model_config(config_id, update_values)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             return cls.construct_success_response(data=data.rowcount)
         except Exception as exp:
             await connection_handler.session.rollback()
@@ -71,7 +71,7 @@ class LLMModelConfigView(BaseView):
         try:
             model_config_service = cls._get_model_config_service(connection_handler)
             await model_config_service.delete_model_config(config_id=config_id)
-            await connection_handler.session.commit()
+            await connection_handler.session_commit()
             return cls.construct_success_response(message=f"Configuration with ID {config_id} deleted successfully.")
         except Exception as exp:
             await connection_handler.session.rollback()